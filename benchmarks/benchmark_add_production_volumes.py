@@ -0,0 +1,111 @@
+""" Compare the original loop based add_production_volumes with the merge
+based version, using a synthetic field with many wellbores and intervals """
+
+import argparse
+from timeit import default_timer as timer
+import numpy as np
+import pandas as pd
+from webviz_4d._datainput.production_data import add_production_volumes
+
+
+PRODUCTION_FILES = ["BORE_OIL_VOL.csv", "BORE_GI_VOL.csv", "BORE_WI_VOL.csv"]
+
+
+def create_field(n_wellbores, n_intervals):
+    """ Return synthetic wellbore information and production files """
+    rng = np.random.default_rng(1)
+    wellbores = ["NO 25/11-G-" + str(i + 1) for i in range(n_wellbores)]
+    well_names = [
+        wellbore if i % 4 else wellbore + " H" for i, wellbore in enumerate(wellbores)
+    ]
+
+    drilled_well_info = pd.DataFrame(
+        {"wellbore.name": wellbores, "wellbore.well_name": well_names}
+    )
+    drilled_well_info.loc[::50, "wellbore.well_name"] = np.nan
+
+    intervals = pd.date_range("1995-01-01", periods=n_intervals + 1, freq="6MS")
+    intervals = intervals.strftime("%Y-%m-%d")
+    columns = [intervals[i] + "-" + intervals[i + 1] for i in range(n_intervals)]
+
+    prod_info_list = []
+    for prod_file in PRODUCTION_FILES:
+        selected = rng.choice(well_names, size=n_wellbores // 2, replace=False)
+        prod_info = pd.DataFrame(
+            {
+                "PDM well name": selected,
+                "Well name": selected,
+                "Start date": "1995-01-01",
+                "Stop date": np.nan,
+            }
+        )
+        volumes = rng.uniform(0, 1e6, (len(selected), n_intervals)).round()
+        prod_info = pd.concat(
+            [prod_info, pd.DataFrame(volumes, columns=columns)], axis=1
+        )
+        prod_info.name = prod_file
+        prod_info_list.append(prod_info)
+
+    return drilled_well_info, prod_info_list
+
+
+def add_production_volumes_loop(drilled_well_info, prod_info_list):
+    """ The original version, one lookup per file, column and wellbore """
+    wellbores = drilled_well_info["wellbore.name"].unique()
+    names = drilled_well_info[["wellbore.name", "wellbore.well_name"]]
+
+    for prod_info in prod_info_list:
+        for column in prod_info.columns:
+            values = []
+            header = prod_info.name + "_" + column
+
+            for wellbore in wellbores:
+                well_name = names[names["wellbore.name"] == wellbore][
+                    "wellbore.well_name"
+                ].values[0]
+
+                try:
+                    value = prod_info[prod_info["Well name"] == well_name][
+                        column
+                    ].values[0]
+                except:
+                    value = None
+                values.append(value)
+
+            drilled_well_info[header] = values
+
+    return drilled_well_info
+
+
+def main():
+    """ Time the original and the merge based add_production_volumes """
+    parser = argparse.ArgumentParser(description="Benchmark add_production_volumes")
+    parser.add_argument(
+        "--wellbores", help="Number of wellbores", type=int, default=400
+    )
+    parser.add_argument(
+        "--intervals", help="Number of 4D intervals", type=int, default=20
+    )
+    args = parser.parse_args()
+
+    drilled_well_info, prod_info_list = create_field(args.wellbores, args.intervals)
+
+    start = timer()
+    loop_info = add_production_volumes_loop(drilled_well_info.copy(), prod_info_list)
+    loop_time = timer() - start
+
+    start = timer()
+    merged_info = add_production_volumes(drilled_well_info.copy(), prod_info_list)
+    merge_time = timer() - start
+
+    pd.testing.assert_frame_equal(
+        loop_info.astype(object).where(loop_info.notna(), None),
+        merged_info[loop_info.columns].astype(object).where(merged_info.notna(), None),
+    )
+
+    print("Loop:  {:.2f} s".format(loop_time))
+    print("Merge: {:.2f} s".format(merge_time))
+
+
+if __name__ == "__main__":
+    main()
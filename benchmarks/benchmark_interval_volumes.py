@@ -0,0 +1,118 @@
+""" Compare the original loop based aggregation of interval volumes in
+compile_production_data with the vectorised aggregation, using synthetic daily
+production data """
+
+import argparse
+from timeit import default_timer as timer
+import numpy as np
+import pandas as pd
+from webviz_4d._datainput import common
+from webviz_4d._datainput.production_data import get_interval_volumes
+
+
+VOLUME_CODES = [
+    "BORE_OIL_VOL",
+    "BORE_GAS_VOL",
+    "BORE_WAT_VOL",
+    "BORE_GI_VOL",
+    "BORE_WI_VOL",
+]
+
+
+def create_production_data(n_wells, n_years, start_date="1995-01-01"):
+    """ Return synthetic daily production data and 4D intervals """
+    dates = pd.date_range(start_date, periods=n_years * 365, freq="D")
+    wells = ["NO 25/11-G-" + str(i + 1) for i in range(n_wells)]
+
+    rng = np.random.default_rng(1)
+    prod_data = pd.DataFrame(
+        {
+            "WELL_BORE_CODE": np.repeat(wells, len(dates)),
+            "DATEPRD": np.tile(dates.strftime("%Y-%m-%d 00:00:00"), n_wells),
+        }
+    )
+
+    for volume_code in VOLUME_CODES:
+        volumes = rng.uniform(0, 2000, len(prod_data)).round(2)
+        volumes[rng.random(len(prod_data)) < 0.3] = 0
+        prod_data[volume_code] = volumes
+
+    dates_4d = pd.date_range(start_date, dates[-1], freq="12MS").strftime("%Y-%m-%d")
+    intervals = [
+        dates_4d[i] + "-" + dates_4d[i + 1] for i in range(len(dates_4d) - 1)
+    ]
+
+    return prod_data, wells, intervals
+
+
+def get_interval_volumes_loop(prod_data, wells, intervals, volume_code):
+    """ The original aggregation, one boolean filter per well and interval """
+    volumes = np.zeros((len(wells), len(intervals) + 2))
+
+    index = 0
+    for pdm_well in wells:
+        well_prod_data = prod_data[prod_data["WELL_BORE_CODE"] == pdm_well]
+        well_prod_data = well_prod_data[["WELL_BORE_CODE", "DATEPRD", volume_code]]
+        well_prod_data = well_prod_data.replace(" 00:00:00", "", regex=True)
+
+        for i in range(0, len(intervals)):
+            date1, date2 = common.get_dates(intervals[i])
+
+            volumes[index, i] = well_prod_data.loc[
+                (well_prod_data["DATEPRD"] >= date1)
+                & (well_prod_data["DATEPRD"] < date2),
+                volume_code,
+            ].sum()
+
+        volumes[index, i + 1] = well_prod_data.loc[
+            (well_prod_data["DATEPRD"] >= date2), volume_code,
+        ].sum()
+
+        date1_first, _date2_first = common.get_dates(intervals[0])
+        volumes[index, i + 2] = well_prod_data.loc[
+            (well_prod_data["DATEPRD"] >= date1_first), volume_code,
+        ].sum()
+
+        index = index + 1
+
+    return volumes
+
+
+def main():
+    """ Time the original and the vectorised interval volume aggregation """
+    parser = argparse.ArgumentParser(description="Benchmark interval volumes")
+    parser.add_argument("--wells", help="Number of wells", type=int, default=50)
+    parser.add_argument("--years", help="Years of daily data", type=int, default=20)
+    args = parser.parse_args()
+
+    prod_data, wells, intervals = create_production_data(args.wells, args.years)
+    print("Daily rows:", len(prod_data), "4D intervals:", len(intervals))
+
+    start = timer()
+    loop_volumes = [
+        get_interval_volumes_loop(prod_data, wells, intervals, volume_code)
+        for volume_code in VOLUME_CODES
+    ]
+    loop_time = timer() - start
+
+    start = timer()
+    interval_volumes = get_interval_volumes(prod_data, wells, intervals, VOLUME_CODES)
+    vectorised_time = timer() - start
+
+    # The production files must be identical
+    for volume_code, volumes in zip(VOLUME_CODES, loop_volumes):
+        columns = interval_volumes[volume_code].columns
+        loop_csv = pd.DataFrame(volumes, columns=columns).to_csv(
+            index=False, float_format="%.0f"
+        )
+        csv = interval_volumes[volume_code].to_csv(index=False, float_format="%.0f")
+
+        if csv != loop_csv:
+            print("ERROR: Different volumes for", volume_code)
+
+    print("Loop:       {:.2f} s".format(loop_time))
+    print("Vectorised: {:.2f} s".format(vectorised_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+""" Compare the original PDM extraction (select * into one dataframe, written
+to csv) with the chunked extraction, using a synthetic SQLite database """
+
+import os
+import argparse
+import sqlite3
+import tempfile
+import tracemalloc
+from timeit import default_timer as timer
+import numpy as np
+import pandas as pd
+from webviz_4d._datainput import omnia_pdm, production_data
+
+
+def create_database(database_file, n_wellbores, n_days, n_extra_columns):
+    """ Write a synthetic daily production table to a SQLite database """
+    rng = np.random.default_rng(1)
+    dates = pd.date_range("1995-01-01", periods=n_days).strftime("%Y-%m-%d %H:%M:%S")
+
+    with sqlite3.connect(database_file) as connection:
+        for i in range(n_wellbores):
+            prod_data = pd.DataFrame(
+                {
+                    "npd_field_name": "GRANE",
+                    "WELL_BORE_CODE": "NO 25/11-G-" + str(i + 1),
+                    "DATEPRD": dates,
+                }
+            )
+
+            for volume_code in production_data.VOLUME_CODES:
+                prod_data[volume_code] = rng.uniform(0, 1000, n_days).round()
+
+            for j in range(n_extra_columns):
+                prod_data["EXTRA_" + str(j)] = "value " + str(j)
+
+            prod_data.to_sql(
+                "DAILY_PROD_W", connection, index=False, if_exists="append"
+            )
+
+
+def extract_all(connection, production_file):
+    """ The original version, the whole query result in one dataframe """
+    sql = "select * from PDM.DAILY_PROD_W where npd_field_name like 'Grane'"
+    df = pd.read_sql(sql, connection)
+    df.to_csv(production_file)
+
+
+def measure(function, *args, **kwargs):
+    """ Return the time and the peak memory used by a function """
+    tracemalloc.start()
+    start = timer()
+    function(*args, **kwargs)
+    elapsed = timer() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak / 1e6
+
+
+def main():
+    """ Time the original and the chunked PDM extraction """
+    parser = argparse.ArgumentParser(description="Benchmark PDM extraction")
+    parser.add_argument(
+        "--wellbores", help="Number of wellbores", type=int, default=100
+    )
+    parser.add_argument("--days", help="Number of days", type=int, default=3000)
+    parser.add_argument(
+        "--extra_columns", help="Number of unused columns", type=int, default=20
+    )
+    parser.add_argument(
+        "--chunksize", help="Rows per chunk", type=int, default=50000
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_file = os.path.join(tmp_dir, "pdm.db")
+        create_database(database_file, args.wellbores, args.days, args.extra_columns)
+        connection = omnia_pdm.sqlite_connection(database_file)
+
+        all_time, all_memory = measure(
+            extract_all, connection, os.path.join(tmp_dir, "all.csv")
+        )
+        chunk_time, chunk_memory = measure(
+            omnia_pdm.extract_production_data,
+            connection,
+            "Grane",
+            tmp_dir,
+            chunksize=args.chunksize,
+        )
+        connection.close()
+
+    print("Select *: {:.2f} s, peak {:.0f} MB".format(all_time, all_memory))
+    print("Chunked:  {:.2f} s, peak {:.0f} MB".format(chunk_time, chunk_memory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+""" Compare the original REP extraction (a new wellbore handle per request, one
+wellbore at a time) with the thread pool extraction, using the fake REP client
+with a fixed latency per request """
+
+import argparse
+import tempfile
+from timeit import default_timer as timer
+from pandas import json_normalize
+from webviz_4d._datainput import rep_wellbores
+from webviz_4d.tests.data.unit_tests.data_input.fake_rep_client import FakeRepClient
+
+
+def fetch_wellbore_per_request(client, wellbore, md_inc=0):
+    """ Fetch a wellbore as the original extraction, with a new wellbore handle
+    for each request """
+    trajectory_df = json_normalize(
+        client.get_wellbore(wellbore).get_wellbore_pos_log()
+    )
+    rkb = client.get_wellbore(wellbore).get_depth_reference_elevation()
+    trajectory_df["md"] = trajectory_df["md"].values + rkb
+
+    return {
+        "wellbore": wellbore,
+        "well_df": rep_wellbores.resample_trajectory(trajectory_df, md_inc),
+        "rkb": rkb,
+        "end_date": client.get_wellbore(wellbore).get_wellbore_end_date() or "",
+        "wellbore_type": client.get_wellbore(wellbore).get_wellbore_type() or "",
+        "slot_name": client.get_wellbore(wellbore).get_well_identifier() or "",
+        "fluids": client.get_wellbore(wellbore).get_wellbore_fluids() or "",
+        "completions": rep_wellbores.get_completions(
+            wellbore,
+            client.get_wellbore(wellbore).get_wellbore_completion_data(),
+            rkb,
+        ),
+    }
+
+
+def extract_sequential(client, field, export_dir, md_inc=0):
+    """ Fetch and write the wellbores one at a time """
+    wellbores = sorted(client.get_wellbore_names())
+
+    for wellbore in wellbores:
+        wellbore_data = fetch_wellbore_per_request(client, wellbore, md_inc)
+        rep_wellbores.write_wellbore(export_dir, field, wellbore_data)
+
+    return len(wellbores)
+
+
+def main():
+    """ Time the extraction of synthetic wellbores """
+    parser = argparse.ArgumentParser(description="Benchmark REP extraction")
+    parser.add_argument("--wellbores", help="Number of wellbores", type=int, default=50)
+    parser.add_argument(
+        "--points", help="Number of trajectory points", type=int, default=500
+    )
+    parser.add_argument(
+        "--latency", help="Time used per request (s)", type=float, default=0.02
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of worker threads",
+        type=int,
+        default=rep_wellbores.WORKERS,
+    )
+    args = parser.parse_args()
+
+    results = []
+
+    for label in ["Sequential", "Thread pool"]:
+        client = FakeRepClient("Grane", args.wellbores, args.points, args.latency)
+
+        with tempfile.TemporaryDirectory() as export_dir:
+            export_dir = export_dir + "/"
+            start = timer()
+
+            if label == "Sequential":
+                extract_sequential(client, "Grane", export_dir)
+            else:
+                rep_wellbores.extract_wellbores(
+                    client, "Grane", export_dir, workers=args.workers
+                )
+
+            results.append((label, timer() - start, client.requests))
+
+    for label, elapsed, requests in results:
+        print("{:12s} {:.2f} s, {} requests".format(label + ":", elapsed, requests))
+
+
+if __name__ == "__main__":
+    main()
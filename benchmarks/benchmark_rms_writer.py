@@ -0,0 +1,116 @@
+""" Compare the original RMS well writer (one write per value, and the well file
+read again with xtgeo to get the short well name) with the vectorised writer,
+using synthetic wellbore trajectories """
+
+import os
+import argparse
+import tempfile
+from timeit import default_timer as timer
+import numpy as np
+import pandas as pd
+from webviz_4d._datainput import rep_wellbores
+from webviz_4d._datainput.well import load_well, get_short_wellname
+
+
+def write_rms_wellbore_per_value(wellbore_name, wellbore_df, rkb, export_dir):
+    """ Write a wellbore as the original writer, one row at a time """
+    wellbore_df.fillna(rep_wellbores.MISSING_VALUE, inplace=True)
+
+    name = rep_wellbores.get_rms_name(wellbore_name)
+    xutm = wellbore_df["EASTING"].values[0]
+    yutm = wellbore_df["NORTHING"].values[0]
+    outfile = os.path.join(export_dir, name + ".w")
+
+    file_object = open(outfile, "w")
+    file_object.write("1.0\n")
+    file_object.write("LOCATION\n")
+    file_object.write("%-15s %10.2f %12.2f %5.2f\n" % (name, xutm, yutm, rkb))
+
+    n_columns = len(wellbore_df.columns)
+    file_object.write(str(n_columns - 3) + "\n")
+
+    columns = wellbore_df.columns
+    file_object.write(columns[0] + "   UNK    lin\n")
+
+    for i in range(4, n_columns):
+        file_object.write("%10s" % (columns[i] + "   UNK    lin\n"))
+
+    for _index, row in wellbore_df.iterrows():
+        file_object.write("%12.2f" % (row.iloc[2]))
+        file_object.write("%12.2f" % (row.iloc[3]))
+        file_object.write("%12.2f" % (row.iloc[1]))
+        file_object.write("%12.2f" % (row.iloc[0]))
+
+        for i in range(4, n_columns):
+            file_object.write("%12.2f" % (row.iloc[i]))
+
+        file_object.write("\n")
+
+    file_object.close()
+
+    return outfile
+
+
+def create_wellbores(n_wellbores, n_points):
+    """ Return synthetic wellbore trajectories """
+    rng = np.random.default_rng(1)
+    wellbores = {}
+
+    for i in range(n_wellbores):
+        md = np.linspace(0.0, 4000.0, n_points)
+        wellbores["NO 25/11-G-" + str(i + 1)] = pd.DataFrame(
+            {
+                "MD": md,
+                "TVDMSL": md * 0.8,
+                "EASTING": 456000.0 + np.cumsum(rng.uniform(-5, 5, n_points)),
+                "NORTHING": 6785000.0 + np.cumsum(rng.uniform(-5, 5, n_points)),
+            }
+        )
+
+    return wellbores
+
+
+def main():
+    """ Time writing synthetic wellbores """
+    parser = argparse.ArgumentParser(description="Benchmark the RMS well writer")
+    parser.add_argument(
+        "--wellbores", help="Number of wellbores", type=int, default=200
+    )
+    parser.add_argument(
+        "--points", help="Number of trajectory points", type=int, default=2000
+    )
+    parser.add_argument(
+        "--reload",
+        help="Read each original well file with xtgeo to get the short name",
+        action="store_true",
+    )
+    args = parser.parse_args()
+
+    wellbores = create_wellbores(args.wellbores, args.points)
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        start = timer()
+
+        for wellbore, wellbore_df in wellbores.items():
+            outfile = write_rms_wellbore_per_value(
+                wellbore, wellbore_df.copy(), 30.0, export_dir
+            )
+
+            if args.reload:
+                load_well(outfile).shortwellname
+
+        original_time = timer() - start
+        start = timer()
+
+        for wellbore, wellbore_df in wellbores.items():
+            rep_wellbores.write_rms_wellbore(wellbore, wellbore_df, 30.0, export_dir)
+            get_short_wellname(rep_wellbores.get_rms_name(wellbore))
+
+        vectorised_time = timer() - start
+
+    print("Original:   {:.2f} s".format(original_time))
+    print("Vectorised: {:.2f} s".format(vectorised_time))
+
+
+if __name__ == "__main__":
+    main()
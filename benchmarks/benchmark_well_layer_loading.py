@@ -0,0 +1,151 @@
+""" Compare loading well layers from pickle files with loading them from a well
+layer archive, using synthetic well layers """
+
+import os
+import argparse
+import pickle
+import tempfile
+from timeit import default_timer as timer
+import numpy as np
+from webviz_4d.wells.well_layer_archive import (
+    WellLayerArchive,
+    WELL_LAYER_ARCHIVE,
+    PICKLE_FILE,
+    read_pickle_file,
+)
+
+
+LAYER_TYPES = [
+    "production",
+    "production_start",
+    "production_completed",
+    "injection",
+    "injection_start",
+    "injection_completed",
+]
+
+
+def create_well_layers(n_wells, n_points, n_intervals):
+    """ Return synthetic well layers for a number of 4D intervals """
+    rng = np.random.default_rng(1)
+    well_layers = {}
+
+    for i in range(n_intervals):
+        interval = "{}-10-01-{}-10-01".format(2001 + i, 2000 + i)
+
+        for layer_type in LAYER_TYPES:
+            data = []
+
+            for j in range(n_wells):
+                positions = np.cumsum(rng.uniform(-10, 10, (n_points, 2)), axis=0)
+                data.append(
+                    {
+                        "type": "polyline",
+                        "color": "green",
+                        "positions": positions + [456000.0, 6785000.0],
+                        "tooltip": "A-{} : production (oil {} [kSm3])".format(j, i),
+                        "wellbore": "A-" + str(j),
+                        "fluid": "oil",
+                        "volume": float(rng.uniform(0, 1000)),
+                        "unit": "kSm3",
+                        "start_date": "2000-01-01",
+                        "stop_date": None,
+                    }
+                )
+
+            well_layers[(layer_type, interval)] = {
+                "name": layer_type,
+                "checked": False,
+                "base_layer": False,
+                "data": data,
+            }
+
+    return well_layers
+
+
+def read_positions(well_layer):
+    """ Read all well positions in a layer, as when the layer is sent to the
+    browser. The archive positions are only read from the file here. """
+    for item in well_layer["data"]:
+        item["positions"].max()
+
+
+def load_pickle_files(wellfolder, intervals):
+    """ Load the layers for all intervals from pickle files """
+    for interval in intervals:
+        for layer_type in LAYER_TYPES:
+            read_positions(
+                read_pickle_file(
+                    os.path.join(wellfolder, PICKLE_FILE.format(layer_type, interval))
+                )
+            )
+
+
+def load_archive(archive_file, intervals):
+    """ Open an archive and load the layers for all intervals """
+    archive = WellLayerArchive(archive_file)
+
+    for interval in intervals:
+        for well_layer in archive.get_layers(LAYER_TYPES, interval):
+            read_positions(well_layer)
+
+
+def measure(function, *args):
+    """ Return the time used by a function """
+    start = timer()
+    function(*args)
+
+    return timer() - start
+
+
+def main():
+    """ Time loading the well layers for all 4D intervals """
+    parser = argparse.ArgumentParser(description="Benchmark well layer loading")
+    parser.add_argument("--wells", help="Number of wells", type=int, default=100)
+    parser.add_argument(
+        "--points", help="Number of points per well", type=int, default=200
+    )
+    parser.add_argument(
+        "--intervals", help="Number of 4D intervals", type=int, default=20
+    )
+    parser.add_argument(
+        "--repeat",
+        help="Number of repetitions (the best is shown)",
+        type=int,
+        default=5,
+    )
+    args = parser.parse_args()
+
+    well_layers = create_well_layers(args.wells, args.points, args.intervals)
+    intervals = sorted(set(interval for _layer_type, interval in well_layers))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pickle_size = 0
+
+        for (layer_type, interval), well_layer in well_layers.items():
+            pickle_file = os.path.join(
+                tmp_dir, PICKLE_FILE.format(layer_type, interval)
+            )
+
+            with open(pickle_file, "wb") as stream:
+                pickle.dump(well_layer, stream)
+
+            pickle_size = pickle_size + os.path.getsize(pickle_file)
+
+        archive_file = os.path.join(tmp_dir, WELL_LAYER_ARCHIVE)
+        WellLayerArchive.write(archive_file, well_layers)
+        archive_size = os.path.getsize(archive_file)
+
+        pickle_time = min(
+            measure(load_pickle_files, tmp_dir, intervals) for _i in range(args.repeat)
+        )
+        archive_time = min(
+            measure(load_archive, archive_file, intervals) for _i in range(args.repeat)
+        )
+
+    print("Pickle:  {:.3f} s, {:.1f} MB".format(pickle_time, pickle_size / 1e6))
+    print("Archive: {:.3f} s, {:.1f} MB".format(archive_time, archive_size / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,25 @@
+import os
 import argparse
 import pickle
 import glob
 from webviz_4d._datainput import common
+from webviz_4d.wells.well_layer_archive import WellLayerArchive, WELL_LAYER_ARCHIVE
+
+
+def print_tooltips(well_layer):
+    """ Print the tooltip info for all wells in a well layer """
+    data = well_layer["data"]
+
+    if len(data) > 0:
+        for item in data:
+            print(item["tooltip"])
+
+    print("")
+
 
 # Main program
 def main():
-    """ Display the tooltip info found in all well list (pickle) files found in a folder
+    """ Display the tooltip info found in all well lists found in a folder
     
     Parameters
     ----------
@@ -32,20 +46,24 @@ def main():
     wellfolder = common.get_full_path(wellfolder)
     print("Reading well lists in", wellfolder)
 
-    pickle_files = glob.glob(wellfolder + "/*.pkl")
+    archive_file = os.path.join(wellfolder, WELL_LAYER_ARCHIVE)
 
-    for pickle_file in pickle_files:
-        file_object = open(pickle_file, "rb")
-        info = pickle.load(file_object)
+    if os.path.isfile(archive_file):
+        archive = WellLayerArchive(archive_file)
 
-        print(pickle_file)
-        data = info["data"]
+        for layer_type, interval in archive.keys():
+            print(layer_type, interval)
+            print_tooltips(archive.get_layer(layer_type, interval))
+    else:
+        # Well lists stored as pickle files (older versions of create_well_lists)
+        pickle_files = glob.glob(wellfolder + "/*.pkl")
 
-        if len(data) > 0:
-            for item in data:
-                print(item["tooltip"])
+        for pickle_file in pickle_files:
+            with open(pickle_file, "rb") as file_object:
+                info = pickle.load(file_object)
 
-        print("")
+            print(pickle_file)
+            print_tooltips(info)
 
 
 if __name__ == "__main__":
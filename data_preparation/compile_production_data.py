@@ -2,42 +2,22 @@
 # -*- coding: utf-8 -*-
 
 import os
-from time import strptime
 from datetime import date
-import calendar
 import argparse
 import numpy as np
 import pandas as pd
-from webviz_4d._datainput import common, _metadata
+from webviz_4d._datainput import common, _metadata, production_data
+from webviz_4d.wells.production_cube import ProductionCube, PRODUCTION_CUBE_FILE
 
 
 def get_prod_dates(well_prod_data):
     """ Get first and last production dates """
-    first_date = well_prod_data["DATEPRD"].values.min()
-    last_date = well_prod_data["DATEPRD"].values.max()
+    first_date = str(well_prod_data["DATEPRD"].values.min())[0:10]
+    last_date = str(well_prod_data["DATEPRD"].values.max())[0:10]
 
     return first_date, last_date
 
 
-def get_start_stop_dates(well_prod_data, prod_file_update, volume_code):
-    """ Get start and stop production dates """
-    well_prod_data.replace(" 00:00:00", "", regex=True, inplace=True)
-    # print("prod_file_update", prod_file_update)
-
-    start_date = well_prod_data.loc[well_prod_data[volume_code] > 0, "DATEPRD"].min()
-    stop_date = well_prod_data.loc[well_prod_data[volume_code] > 0, "DATEPRD"].max()
-
-    if not common.is_nan(start_date):
-        stop_utc_time = strptime(stop_date, "%Y-%m-%d")
-        epoch_time = calendar.timegm(stop_utc_time)
-        # print(stop_date,prod_file_update - epoch_time)
-
-        if prod_file_update - epoch_time < 87000 * 3:
-            stop_date = np.nan
-
-    return start_date, stop_date
-
-
 def check_production_wells(sorted_production_wells, well_info, pdm_names_file):
     """ Check if a the name of a production well is included in the well list from REP """
     well_names = []
@@ -65,6 +45,92 @@ def check_production_wells(sorted_production_wells, well_info, pdm_names_file):
     return well_names
 
 
+def write_csv_if_changed(volume_df, csv_file):
+    """ Write the volumes to a csv file, unless the file has the same content.
+    Returns True if the file was written """
+    content = volume_df.to_csv(index=False, float_format="%.0f")
+
+    if os.path.isfile(csv_file):
+        with open(csv_file, "r") as stream:
+            if stream.read() == content:
+                return False
+
+    with open(csv_file, "w") as stream:
+        stream.write(content)
+
+    return True
+
+
+def get_recent_intervals(intervals, last_date):
+    """ Return the 4D intervals ending after the last date of the previous
+    update, or the last interval if none (the volumes after the last 4D date
+    are always updated) """
+    recent_intervals = [
+        interval for interval in intervals if common.get_dates(interval)[1] > last_date
+    ]
+
+    return recent_intervals or intervals[-1:]
+
+
+def read_previous_volumes(production_data_dir, volume_codes, intervals):
+    """ Return the volumes from the production files of the previous update,
+    indexed by PDM well name. None if a file or an interval is missing. """
+    previous_volumes = {}
+
+    for volume_code in volume_codes:
+        csv_file = os.path.join(production_data_dir, volume_code + ".csv")
+
+        if not os.path.isfile(csv_file):
+            return None
+
+        volumes = pd.read_csv(csv_file).set_index("PDM well name")
+
+        if not all(interval in volumes.columns for interval in intervals):
+            return None
+
+        previous_volumes[volume_code] = volumes
+
+    return previous_volumes
+
+
+def get_updated_volumes(
+    prod_data,
+    production_cube,
+    wells,
+    intervals,
+    recent_intervals,
+    volume_codes,
+    previous_volumes,
+):
+    """ Return the interval volumes (see production_data.get_interval_volumes)
+    after an incremental update. Only the recent intervals and the volumes
+    after the last 4D date are summed from the daily data, which must contain
+    all rows from the start of the first recent interval. The other intervals
+    are copied from the previous production files. The total volumes are the
+    cumulative volumes before the first recent interval plus the recent
+    volumes. """
+    recent_volumes = production_data.get_interval_volumes(
+        prod_data, wells, recent_intervals, volume_codes
+    )
+    recent_start, _date = common.get_dates(recent_intervals[0])
+    first_date, _date = common.get_dates(intervals[0])
+    rows = [production_cube.get_well_index(well) for well in wells]
+
+    interval_volumes = {}
+
+    for volume_code in volume_codes:
+        recent = recent_volumes[volume_code]
+        volumes = previous_volumes[volume_code].reindex(index=wells, columns=intervals)
+        volumes = volumes.fillna(0)
+        volumes[recent.columns[:-1]] = recent[recent.columns[:-1]]
+
+        earlier = production_cube.get_volumes(first_date, recent_start, volume_code)
+        volumes[first_date + "-now"] = earlier[rows] + recent[recent.columns[-1]]
+        interval_volumes[volume_code] = volumes
+
+    return interval_volumes
+
+
 ## Main program
 def main():
     """ Compile production data """
@@ -73,6 +139,11 @@ def main():
     parser.add_argument(
         "config_file", help="Enter path to the WebViz-4D configuration file"
     )
+    parser.add_argument(
+        "--incremental",
+        help="Only read the production data after the last update",
+        action="store_true",
+    )
 
     args = parser.parse_args()
 
@@ -93,10 +164,10 @@ def main():
     metadata_file = common.get_config_item(config, "surface_metadata")
 
     try:
-        production_data = common.get_config_item(config, "production_data")
-        production_data = common.get_full_path(production_data)
+        production_data_dir = common.get_config_item(config, "production_data")
+        production_data_dir = common.get_full_path(production_data_dir)
     except:
-        production_data = None
+        production_data_dir = None
 
     try:
         well_directory = common.get_config_item(config, "wellfolder")
@@ -104,31 +175,25 @@ def main():
     except:
         well_directory = None
 
-    if production_data:
-        production_file = os.path.join(production_data, "prod_data.csv")
+    if production_data_dir:
+        production_file = os.path.join(production_data_dir, "prod_data.csv")
 
         surface_metadata = _metadata.get_metadata(
             shared_settings, map_suffix, delimiter, metadata_file
         )
         # print(surface_metadata)
 
-        prod_data = pd.read_csv(production_file)
-        prod_file_update = os.path.getmtime(production_file)
-        first_date, last_date = get_prod_dates(prod_data)
-
-        # print(prod_data)
-        prod_data_wells = prod_data["WELL_BORE_CODE"].unique()
-
-        sorted_production_wells = common.sort_wellbores(prod_data_wells)
-
         well_info_file = os.path.join(well_directory, WELLBORE_INFO_FILE)
         well_info = pd.read_csv(well_info_file)
 
         pdm_names_file = os.path.join(well_directory, "wrong_pdm_well_names.csv")
 
-        all_well_names = check_production_wells(
-            sorted_production_wells, well_info, pdm_names_file
-        )
+        prod_file_update = os.path.getmtime(production_file)
+        volume_codes = production_data.VOLUME_CODES
+        cube_file = os.path.join(production_data_dir, PRODUCTION_CUBE_FILE)
+
+        update_dates = common.get_update_dates(well_directory)
+        previous_last_date = update_dates.get("production_last_date")
 
         _all_4d, incremental_4d = _metadata.get_all_intervals(
             surface_metadata, "normal"
@@ -142,100 +207,136 @@ def main():
             if date2 < today_str:
                 actual_intervals.append(interval)
 
-        volume_codes = [
-            "BORE_OIL_VOL",
-            "BORE_GAS_VOL",
-            "BORE_WAT_VOL",
-            "BORE_GI_VOL",
-            "BORE_WI_VOL",
+        previous_volumes = None
+
+        if (
+            args.incremental
+            and previous_last_date
+            and actual_intervals
+            and os.path.isfile(cube_file)
+        ):
+            recent_intervals = get_recent_intervals(actual_intervals, previous_last_date)
+            previous_volumes = read_previous_volumes(
+                production_data_dir,
+                volume_codes,
+                [
+                    interval
+                    for interval in actual_intervals
+                    if interval not in recent_intervals
+                ],
+            )
+
+        if previous_volumes is not None:
+            # Only the daily rows for the recent 4D intervals are read, and the
+            # last day of the previous run is read again, since its volumes may
+            # have been incomplete
+            recent_start, _date = common.get_dates(recent_intervals[0])
+            read_date = min(previous_last_date, recent_start)
+            print("Reading production data from", read_date)
+            prod_data = production_data.load_production_data(
+                production_file, volume_codes, start_date=read_date
+            )
+            new_data = prod_data[
+                prod_data["DATEPRD"].values >= np.datetime64(previous_last_date)
+            ]
+            production_cube = ProductionCube.load(cube_file)
+
+            # Only wells not found in the previous run are checked
+            known_wells = set(production_cube.wells)
+            new_wells = common.sort_wellbores(
+                [
+                    well
+                    for well in new_data["WELL_BORE_CODE"].unique()
+                    if well not in known_wells
+                ]
+            )
+            new_well_names = check_production_wells(
+                new_wells, well_info, pdm_names_file
+            )
+
+            production_cube.update(
+                new_data, previous_last_date, dict(zip(new_wells, new_well_names))
+            )
+            first_date = update_dates["production_first_date"]
+            last_date = str(production_cube.last_date)
+        else:
+            prod_data = production_data.load_production_data(production_file)
+            first_date, last_date = get_prod_dates(prod_data)
+
+            # Cumulative volumes for all wells and days, stored for later
+            # queries of arbitrary time intervals
+            wells = common.sort_wellbores(prod_data["WELL_BORE_CODE"].unique())
+            production_cube = ProductionCube.from_daily(
+                prod_data,
+                volume_codes,
+                wells,
+                check_production_wells(wells, well_info, pdm_names_file),
+            )
+
+        production_cube.save(cube_file)
+        print("Cumulative volumes exported to file " + cube_file)
+
+        sorted_production_wells = common.sort_wellbores(production_cube.wells)
+        all_well_names = [
+            production_cube.get_well_name(well) for well in sorted_production_wells
         ]
 
-        for volume_code in volume_codes:
-            pdm_names = []
-            well_names = []
-            start_dates = []
-            stop_dates = []
-            intervals = []
-            volumes = np.zeros(
-                (len(sorted_production_wells), len(actual_intervals) + 2)
+        # Volumes for all volume codes, wells and 4D intervals
+        if previous_volumes is not None:
+            interval_volumes = get_updated_volumes(
+                prod_data,
+                production_cube,
+                sorted_production_wells,
+                actual_intervals,
+                recent_intervals,
+                volume_codes,
+                previous_volumes,
+            )
+        else:
+            interval_volumes = production_data.get_interval_volumes(
+                prod_data, sorted_production_wells, actual_intervals, volume_codes,
             )
 
+        for volume_code in volume_codes:
             print(volume_code)
-            volume_df = pd.DataFrame()
+            volumes = interval_volumes[volume_code]
+            total = volumes.columns[-1]
 
-            index = 0
-            for pdm_well in sorted_production_wells:
-                well_prod_data = prod_data[prod_data["WELL_BORE_CODE"] == pdm_well]
-                well_prod_data = well_prod_data[
-                    ["WELL_BORE_CODE", "DATEPRD", volume_code]
-                ]
+            start_dates, stop_dates = production_data.get_production_dates(
+                production_cube, sorted_production_wells, volume_code, prod_file_update
+            )
 
-                start_date, stop_date = get_start_stop_dates(
-                    well_prod_data, prod_file_update, volume_code
-                )
-
-                pdm_names.append(pdm_well)
-                well_names.append(all_well_names[index])
-                start_dates.append(start_date)
-                stop_dates.append(stop_date)
-
-                for i in range(0, len(actual_intervals)):
-                    intervals.append(actual_intervals[i])
-                    date1, date2 = common.get_dates(actual_intervals[i])
-
-                    volumes[index, i] = well_prod_data.loc[
-                        (well_prod_data["DATEPRD"] >= date1)
-                        & (well_prod_data["DATEPRD"] < date2),
-                        volume_code,
-                    ].sum()
-                
-                # Add a last incremental interval - from last to now     
-                last_interval = date2 + "-now"
-                intervals.append(last_interval)
-                volumes[index, i+1] = well_prod_data.loc[
-                        (well_prod_data["DATEPRD"] >= date2),
-                        volume_code,
-                ].sum()
-                
-                # Add a column with accumulated total production
-                date1_first, _date2_first = common.get_dates(actual_intervals[0])
-                total = date1_first + "-now"
-                intervals.append(total)
-                volumes[index, i + 2] = well_prod_data.loc[
-                    (well_prod_data["DATEPRD"] >= date1_first), volume_code,
-                ].sum()
-
-                index = index + 1
-                
-
-            volume_df["PDM well name"] = pdm_names
-            volume_df["Well name"] = well_names
+            volume_df = pd.DataFrame()
+            volume_df["PDM well name"] = sorted_production_wells
+            volume_df["Well name"] = all_well_names
             volume_df["Start date"] = start_dates
             volume_df["Stop date"] = stop_dates
 
             pd.set_option("display.max_columns", None)
             pd.set_option("display.max_rows", None)
 
-            for i in range(0, len(actual_intervals) + 2):
-                volume_df[intervals[i]] = volumes[:, i]
-                print(intervals[i])
+            for interval in volumes.columns:
+                volume_df[interval] = volumes[interval].values
+                print(interval)
 
             volume_df_actual = volume_df[volume_df[total] > 0]
 
-            csv_file = os.path.join(production_data, volume_code + ".csv")
-            volume_df_actual.to_csv(csv_file, index=False, float_format="%.0f")
-            print("Data exported to file " + csv_file)
+            csv_file = os.path.join(production_data_dir, volume_code + ".csv")
+            if write_csv_if_changed(volume_df_actual, csv_file):
+                print("Data exported to file " + csv_file)
+            else:
+                print("No changes in file " + csv_file)
 
-            print("Production start and last date:", first_date, last_date)
+        print("Production start and last date:", first_date, last_date)
 
-            outfile = os.path.join(well_directory, ".production_update.yaml")
-            file_object = open(outfile, "w")
-            file_object.write("- production:\n")
-            file_object.write("   start_date: " + first_date[0:10] + "\n")
-            file_object.write("   last_date: " + last_date[0:10] + "\n")
-            file_object.close()
+        outfile = os.path.join(well_directory, ".production_update.yaml")
+        file_object = open(outfile, "w")
+        file_object.write("- production:\n")
+        file_object.write("   start_date: " + first_date[0:10] + "\n")
+        file_object.write("   last_date: " + last_date[0:10] + "\n")
+        file_object.close()
 
-            print("Metadata exported to file " + outfile)
+        print("Metadata exported to file " + outfile)
     else:
         print("No production information found in configuration file")
 
@@ -1,44 +1,20 @@
 #!/usr/bin/env python3
 import os
-import glob
 import argparse
-import yaml
 import pandas as pd
-from pandas import json_normalize
 from webviz_4d._datainput import common
+from webviz_4d._datainput import well
 from webviz_4d._datainput.surface import load_surface
-from webviz_4d._datainput.well import load_well
+from webviz_4d.wells.well_trajectories import WellTrajectories
 
 
 def extract_metadata(directory):
     """ Read and compile well metadata (from yaml files) """
-    well_info = []
-    interval_info = []
-
     print("Reading metadata in", directory)
-    yaml_files = glob.glob(directory + "/.*.w.yaml", recursive=True)
-
-    for yaml_file in yaml_files:
-        # print(yaml_file)
-        with open(yaml_file, "r") as stream:
-            data = yaml.safe_load(stream)
-            # print('data',data)
-
-            well_info.append(data[0])
-
-            if len(data) > 1 and data[1]:
-                for item in data[1:]:
-                    interval_info.append(item)
-
-    well_info_df = json_normalize(well_info)
-    interval_df = json_normalize(interval_info)
-
-    if not interval_df.empty:
-        interval_df.sort_values(
-            by=["interval.wellbore", "interval.mdTop"], inplace=True
-        )
 
-    return well_info_df, interval_df
+    return well.extract_well_metadata(
+        directory, "/.*.w.yaml", parallel=True, update_cache=True
+    )
 
 
 def compile_data(surface, well_directory, wellbore_info, well_suffix):
@@ -49,33 +25,37 @@ def compile_data(surface, well_directory, wellbore_info, well_suffix):
     depth_surfaces = []
     depth_picks = []
 
-    points = None
     pick_name = None
-    wellbore_pick_md = None
+    picks = {}
 
     if surface:
         pick_name = surface.name
 
+    # Load all trajectories once and intersect them with the surface in one go
+    wells_df = well.load_wellbore_trajectories(well_directory, well_suffix)
+
+    if wells_df is not None:
+        trajectories = WellTrajectories(wells_df)
+        wellbores = list(trajectories.wellbores)
+
+        if surface:
+            picks = well.get_surface_picks(trajectories, surface)
+    else:
+        wellbores = []
+
     if not wellbore_info.empty:
-        for _index, item in wellbore_info.iterrows():
-            wellbore_name = item["wellbore.name"]
+        for wellbore_name in wellbore_info["wellbore.name"].values:
             rms_name = (
                 wellbore_name.replace("/", "_").replace("NO ", "").replace(" ", "_")
             )
             well_name = common.get_wellname(wellbore_info, wellbore_name)
             well_names.append(well_name)
 
-            wellbore_file = os.path.join(well_directory, rms_name) + well_suffix
-            wellbore = load_well(wellbore_file)
-            short_name = wellbore.shortwellname
-
-            if surface:
-                points = wellbore.get_surface_picks(surface)
-                pick_name = surface.name
+            short_name = well.get_short_wellname(rms_name)
+            wellbore_pick_md = picks.get(rms_name)
 
-            if points and hasattr(points, "dataframe"):
-                print(points.dataframe)
-                wellbore_pick_md = points.dataframe["MD"].values[0]
+            if wellbore_pick_md is not None:
+                print(rms_name, pick_name, wellbore_pick_md)
 
             depth_surfaces.append(pick_name)
             depth_picks.append(wellbore_pick_md)
@@ -87,12 +67,9 @@ def compile_data(surface, well_directory, wellbore_info, well_suffix):
         wellbore_names = []
         wellbore_types = []
         wellbore_fluids = []
-        wellbore_files = glob.glob(str(well_directory) + "/*.w")
-        # print("wellbore_files", wellbore_files)
 
-        for wellbore_file in wellbore_files:
-            wellbore = load_well(wellbore_file)
-            wellbore_name = wellbore.name.split("/")[0]
+        for wellbore in wellbores:
+            wellbore_name = wellbore.split("/")[0]
             wellbore_names.append(wellbore_name)
             well_names.append(wellbore_name)
             short_names.append(wellbore_name)
@@ -100,12 +77,10 @@ def compile_data(surface, well_directory, wellbore_info, well_suffix):
             wellbore_types.append("planned")
             wellbore_fluids.append("")
 
-            if surface:
-                points = wellbore.get_surface_picks(surface)
+            wellbore_pick_md = picks.get(wellbore)
 
-            if points and hasattr(points, "dataframe"):
-                print(points.dataframe)
-                wellbore_pick_md = points.dataframe["MD"].values[0]
+            if wellbore_pick_md is not None:
+                print(wellbore_name, pick_name, wellbore_pick_md)
 
             depth_surfaces.append(pick_name)
             depth_picks.append(wellbore_pick_md)
@@ -0,0 +1,76 @@
+""" Convert the well layers stored as pickle files by older versions of
+create_well_lists to a well layer archive """
+
+import os
+import re
+import argparse
+import glob
+from webviz_4d._datainput import common
+from webviz_4d.wells.well_layer_archive import (
+    WellLayerArchive,
+    WELL_LAYER_ARCHIVE,
+    read_pickle_file,
+)
+
+
+PICKLE_FILE_PATTERN = re.compile(r"^(\w+?)_well_layer_(.+)\.pkl$")
+
+
+def read_pickle_files(wellfolder):
+    """ Return the well layers stored as pickle files in a folder, with
+    (layer type, interval) as keys, and the pickle files """
+    well_layers = {}
+    pickle_files = []
+
+    for pickle_file in sorted(glob.glob(os.path.join(wellfolder, "*.pkl"))):
+        match = PICKLE_FILE_PATTERN.match(os.path.basename(pickle_file))
+
+        if match:
+            well_layers[(match.group(1), match.group(2))] = read_pickle_file(
+                pickle_file
+            )
+            pickle_files.append(pickle_file)
+
+    return well_layers, pickle_files
+
+
+def main():
+    """ Convert well layer pickle files to a well layer archive """
+    description = "Convert well layer pickle files to a well layer archive"
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "config_file", help="Enter path to the WebViz-4D configuration file"
+    )
+    parser.add_argument(
+        "--remove",
+        help="Remove the pickle files after the conversion",
+        action="store_true",
+    )
+
+    args = parser.parse_args()
+    print(description)
+    print(args)
+
+    config = common.read_config(args.config_file)
+    wellfolder = common.get_config_item(config, "wellfolder")
+    wellfolder = common.get_full_path(wellfolder)
+
+    well_layers, pickle_files = read_pickle_files(wellfolder)
+
+    if not well_layers:
+        print("No well layer pickle files found in", wellfolder)
+        return
+
+    archive_file = os.path.join(wellfolder, WELL_LAYER_ARCHIVE)
+    WellLayerArchive.write(archive_file, well_layers)
+    print(len(well_layers), "well layers stored to", archive_file)
+
+    if args.remove:
+        for pickle_file in pickle_files:
+            os.remove(pickle_file)
+
+        print(len(pickle_files), "pickle files removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,55 @@
 import os
+import numpy as np
 import pandas as pd
 import argparse
 from webviz_4d._datainput import common
 
 
-def write_data(prod_df, fluid, scale, file_object):
-    """ Wite production data to file (fluid) """
-    columns = list(prod_df)
+def get_fluid_table(prod_df, fluid, scale):
+    """ Return production data (fluid) in long format, with one row per well
+    and 4D interval """
+    columns = [column for column in prod_df.columns if "-" in column]
 
-    for _index, row in prod_df.iterrows():
-        well_name = row["PDM well name"]
-        well_name = well_name.replace(" ", "")
+    table = prod_df.melt(
+        id_vars=["PDM well name"],
+        value_vars=columns,
+        var_name="4D_interval",
+        value_name="Volumes",
+        ignore_index=False,
+    )
+
+    # Keep the order of the production file (all intervals for each well)
+    table = table.sort_index(kind="mergesort")
+
+    return pd.DataFrame(
+        {
+            "Well_name": table["PDM well name"].str.replace(" ", "").values,
+            "4D_interval": (
+                table["4D_interval"].str[0:7] + table["4D_interval"].str[10:18]
+            ).values,
+            "Volumes": np.trunc(table["Volumes"].values / scale),
+            "Fluid": fluid,
+        }
+    ).astype({"Volumes": "Int64"})
+
+
+def write_data(tables, table_file, parquet=False, verbose=False):
+    """ Write production data tables (see get_fluid_table) to file """
+    table = pd.concat(tables, ignore_index=True)
+
+    if verbose:
+        print(table.to_string(index=False))
+
+    table.to_csv(table_file, index=False)
+
+    if parquet:
+        parquet_file = os.path.splitext(table_file)[0] + ".parquet"
 
-        for column in columns:
-            if "-" in column:
-                interval = column[0:7] + column[10:18]
-                value = row[column] / scale
-                print(well_name, interval, value)
-                file_object.write(well_name + "," + interval + ",")
-                file_object.write("%d" % value)
-                file_object.write("," + fluid + "\n")
+        try:
+            table.to_parquet(parquet_file, index=False)
+            print("Table stored to file", parquet_file)
+        except ImportError as error:
+            print("ERROR: Parquet file not written:", error)
 
 
 # Main program
@@ -30,6 +60,15 @@ def main():
     parser.add_argument(
         "config_file", help="Enter path to the WebViz-4D configuration file"
     )
+    parser.add_argument(
+        "--verbose", help="Print the tables", action="store_true", default=False
+    )
+    parser.add_argument(
+        "--parquet",
+        help="Store the tables also as parquet files",
+        action="store_true",
+        default=False,
+    )
 
     args = parser.parse_args()
     print(description)
@@ -61,16 +100,12 @@ def main():
     print("Loading water volumes from file", bore_water_file)
     bore_water = pd.read_csv(bore_water_file)
 
-    with open(production_table_file, "w") as file_object:
-        file_object.write("Well_name,4D_interval,Volumes,Fluid\n")
-        fluid = "Oil_[Sm3]"
-        write_data(bore_oil, fluid, 1, file_object)
-
-        fluid = "Gas_[kSm3]"
-        write_data(bore_gas, fluid, 1000, file_object)
-
-        fluid = "Water_[Sm3]"
-        write_data(bore_water, fluid, 1, file_object)
+    tables = [
+        get_fluid_table(bore_oil, "Oil_[Sm3]", 1),
+        get_fluid_table(bore_gas, "Gas_[kSm3]", 1000),
+        get_fluid_table(bore_water, "Water_[Sm3]", 1),
+    ]
+    write_data(tables, production_table_file, args.parquet, args.verbose)
 
     print("Production volumes table stored to file", production_table_file)
 
@@ -83,13 +118,11 @@ def main():
     print("Loading injected water volumes from file", inject_water_file)
     inject_water = pd.read_csv(inject_water_file)
 
-    with open(injection_table_file, "w") as file_object:
-        file_object.write("Well_name,4D_interval,Volumes,Fluid\n")
-        fluid = "Injected_Gas_[kSm3]"
-        write_data(inject_gas, fluid, 1000, file_object)
-
-        fluid = "Injected_Water_[Sm3]"
-        write_data(inject_water, fluid, 1, file_object)
+    tables = [
+        get_fluid_table(inject_gas, "Injected_Gas_[kSm3]", 1000),
+        get_fluid_table(inject_water, "Injected_Water_[Sm3]", 1),
+    ]
+    write_data(tables, injection_table_file, args.parquet, args.verbose)
 
     print("Injection volumes table stored to file", injection_table_file)
 
@@ -2,382 +2,96 @@
 
 import os
 import argparse
-import pickle
-import math
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from timeit import default_timer as timer
 from webviz_4d._datainput import common
 from webviz_4d._datainput import well
+from webviz_4d._datainput.production_data import add_production_volumes
+from webviz_4d._datainput.production_layers import (
+    PRODUCTION_LAYERS,
+    ACTIVE_LAYER,
+    read_production_info,
+    get_last_interval,
+    get_volume_columns,
+    make_interval_well_layers,
+)
 from webviz_4d._datainput._metadata import (
     get_metadata,
     get_all_intervals,
 )
-from webviz_4d.wells.well_data_frame import WellDataFrame
+from webviz_4d.wells.well_trajectories import WellTrajectories
+from webviz_4d.wells.production_cube import ProductionCube, PRODUCTION_CUBE_FILE
+from webviz_4d.wells.completion_intervals import CompletionIntervals
+from webviz_4d.wells.well_layer_archive import WellLayerArchive, WELL_LAYER_ARCHIVE
+
+
+# Data used to make the well layers, see init_well_layer_data
+WELL_LAYER_DATA = None
+
+
+def init_well_layer_data(*well_layer_data):
+    """ Store the data used to make the well layers in a (worker) process.
+    The data is only read, and it is inherited from the parent process
+    when the workers are forked. """
+    global WELL_LAYER_DATA
+    WELL_LAYER_DATA = well_layer_data
+
+
+def make_interval_layers(interval_4d):
+    """ Return the production and injection layers for a 4D interval, and the
+    time used to make them """
+    start = timer()
+    (
+        drilled_well_df,
+        drilled_well_info,
+        completions,
+        colors,
+        production_cube,
+        screens,
+        volume_columns,
+        trajectories,
+    ) = WELL_LAYER_DATA
+    well_layers = make_interval_well_layers(
+        interval_4d,
+        drilled_well_df,
+        drilled_well_info,
+        completions,
+        colors,
+        production_cube,
+        screens=screens,
+        volume_columns=volume_columns,
+        trajectories=trajectories,
+        verbose=True,
+    )
+    well_layers = {
+        (selection, interval_4d): well_layer
+        for (selection, _label), well_layer in zip(PRODUCTION_LAYERS, well_layers)
+    }
 
+    return interval_4d, well_layers, timer() - start
 
-OIL_PRODUCTION_FILE = "BORE_OIL_VOL.csv"
-GAS_INJECTION_FILE = "BORE_GI_VOL.csv"
-WATER_INJECTION_FILE = "BORE_WI_VOL.csv"
 
+def make_all_interval_layers(intervals, well_layer_data, workers=None):
+    """ Return the layers for all 4D intervals, made in parallel by a pool of
+    worker processes unless only one worker is selected """
+    if workers == 1 or len(intervals) < 2:
+        init_well_layer_data(*well_layer_data)
 
-def check_interval(interval):
-    """ Flip start and end date if needed """
-    dates = [interval[0:10], interval[11:21]]
+        return [make_interval_layers(interval) for interval in intervals]
 
-    if dates[0] > dates[1]:
-        selected_interval = dates[1] + "-" + dates[0]
-    else:
-        selected_interval = interval
-
-    return selected_interval
-
-
-def get_column_list(columns, pdm_column, interval):
-    """ Return a list of incremental intervals given a larger interval """
-    split_string = pdm_column.split(".")
-    selected_csv = split_string[0]
-    column_list = []
-    start_index = None
-    stop_index = None
-    first_date = interval[0:10]
-    last_date = interval[11:21]
-
-    i = 0
-    for column in columns:
-        # print(column, selected_csv in column)
-
-        if selected_csv in column:
-            # print(column[-21:-11], column[-10:])
-            if first_date == column[-21:-11]:
-                start_index = i
-
-            if last_date == column[-10:]:
-                stop_index = i
-
-        i = i + 1
-
-    # print("start_index, stop_index ", start_index, stop_index)
-
-    for j in range(start_index, stop_index + 1):
-        column_list.append(columns[j])
-
-    return column_list
-
-
-def extract_production_info(well_prod_info, interval, selection):
-    """ Return well and production information/status for a selected 
-    interval for production/injection wells """
-    well_type = None
-    fluid = None
-    start_date = None
-    stop_date = None
-    info = None
-    plot = False
-    
-    production_selections = ["production", "production_start", "production_completed", "active"]
-    injection_selections = ["injection", "injection_start", "injection_completed", "active"]
-
-    if selection in production_selections:
-        column = OIL_PRODUCTION_FILE + "_" + interval
-        pd.set_option("display.max_columns", None)
-
-        try:
-            volume = well_prod_info[column].values[0] / 1000
-
-            if math.isnan(volume):
-                volume = None
-
-        except:
-            columns = well_prod_info.columns
-            selected_columns = get_column_list(columns, column, interval)
-            selected_df = well_prod_info[selected_columns].copy()
-            volume = selected_df.sum(axis=1).values
-
-            volume = volume[0] / 1000
-
-        if volume and volume > 0:
-            well_type = "production"
-            fluid = "oil"
-            start_date = well_prod_info[OIL_PRODUCTION_FILE + "_Start date"].values[0]
-            stop_date = well_prod_info[OIL_PRODUCTION_FILE + "_Stop date"].values[0]
-            
-            if isinstance(stop_date,float):
-                stop_date = "---"
-            else:
-                stop_date = str(stop_date[0:-3])
-                    
-            #print(start_date, stop_date)
-            info = (
-                fluid
-                + " {:.0f}".format(volume)
-                + " [kSm3] Start: "
-                + str(start_date[0:-3])
-                + " Stop: "
-                + stop_date
-            )
-            plot = True
-
-    elif selection in injection_selections:
-        column = GAS_INJECTION_FILE + "_" + interval
-
-        try:
-            volume_gas = well_prod_info[column].values[0] / 1000000
-
-            if math.isnan(volume_gas):
-                volume_gas = None
-
-        except:
-            columns = well_prod_info.columns
-            selected_columns = get_column_list(columns, column, interval)
-            selected_df = well_prod_info[selected_columns].copy()
-            volume_gas = selected_df.sum(axis=1).values
-
-            volume_gas = volume_gas[0] / 1000000
-
-        if volume_gas and volume_gas > 0:
-            well_type = "injection"
-            fluid = "gas"
-            start_date = well_prod_info[GAS_INJECTION_FILE + "_Start date"].values[0]
-            stop_date = well_prod_info[GAS_INJECTION_FILE + "_Stop date"].values[0]
-            
-            if isinstance(stop_date,float):
-                stop_date = "---"
-            else:
-                stop_date = str(stop_date[0:-3])
-                    
-            #print(start_date, stop_date)
-            info = (
-                fluid
-                + " {:.0f}".format(volume_gas)
-                + " [MSm3] Start: "
-                + str(start_date[0:-3])
-                + " Stop: "
-                + stop_date
-            )
-            plot = True
-        column = WATER_INJECTION_FILE + "_" + interval
-
-        try:
-            volume_water = well_prod_info[column].values[0] / 1000
-        except:
-            columns = well_prod_info.columns
-            selected_columns = get_column_list(columns, column, interval)
-            selected_df = well_prod_info[selected_columns].copy()
-
-            volume_water = selected_df.sum(axis=1).values
-
-            volume_water = volume_water[0] / 1000
-
-        if volume_water and volume_water > 0:
-            well_type = "injection"
-            fluid = "water"
-            start_date = well_prod_info[WATER_INJECTION_FILE + "_Start date"].values[0]
-            stop_date = well_prod_info[WATER_INJECTION_FILE + "_Stop date"].values[0]
-            
-            if isinstance(stop_date,float):
-                stop_date = "---"
-            else:
-                stop_date = str(stop_date[0:-3])
-                    
-            #print(start_date, stop_date)
-            info = (
-                fluid
-                + " {:.0f}".format(volume_water)
-                + " [kSm3] Start: "
-                + str(start_date[0:-3])
-                + " Stop: "
-                + stop_date
-            )
-            plot = True
-
-    return well_type, fluid, start_date, stop_date, info, plot
-
-
-def make_new_well_layer(
-    interval_4d,
-    wells_df,
-    metadata_df,
-    completion_df,
-    prod_info_list,
-    colors=None,
-    selection=None,
-    label="Drilled wells",
-):
-    """Make layeredmap wells layer"""
-    interval_start = interval_4d[11:]
-    interval_end = interval_4d[0:10]
-    
-    data = []
-
-    # print(interval_4d,wells_df,metadata_df,interval_df,prod_info_list,colors,selection,label)
-
-    wellbores = wells_df["WELLBORE_NAME"].values
-    list_set = set(wellbores)
-    # convert the set to the list
-    unique_wellbores = list(list_set)
-
-    for wellbore in unique_wellbores:
-        plot = True
-        md_start = 0
-        md_end = None
-        polyline_data = None
-
-        well_dataframe = wells_df[wells_df["WELLBORE_NAME"] == wellbore]
-        well_metadata = metadata_df[metadata_df["wellbore.rms_name"] == wellbore]
-
-        wellbore_name = well_metadata["wellbore.name"].values[0]
-
-        md_top_res = well_metadata["wellbore.pick_md"].values
-        if selection and len(md_top_res) > 0:
-            md_start = min(md_top_res)
-
-        short_name = well_metadata["wellbore.short_name"].values
-        if short_name:
-            short_name = short_name[0]
-
-        well_type = well_metadata["wellbore.type"].values
-        if well_type:
-            well_type = well_type[0]
-
-        if well_type == "planned":
-            # info = well_metadata["wellbore.list_name"].values
-            fluid = ""
-            info = ""
-            start_date = None
-            stop_date = None
-
-        elif selection in ["reservoir_section", "planned"]:
-            polyline_data = well.get_well_polyline(
-                wellbore,
-                short_name,
-                well_dataframe,
-                well_type,
-                fluid,
-                info,
-                md_start,
-                selection,
-                colors,
-            )
-        elif not selection:
-            polyline_data = well.get_well_polyline(
-                wellbore,
-                short_name,
-                well_dataframe,
-                well_type,
-                fluid,
-                info,
-                md_start,
-                selection,
-                colors,
-            )
-
-        else:  # Production and injection layers
-            plot = False
-            interval = check_interval(interval_4d)
-
-            (
-                well_type,
-                fluid,
-                start_date,
-                stop_date,
-                info,
-                plot,
-            ) = extract_production_info(well_metadata, interval, selection)
-            
-            if selection == "active":
-                if stop_date == "---":
-                    plot = True
-                else:
-                    plot = False  
-                            
-            if start_date and (selection == "production_start" or selection == "injection_start"):
-                # print(wellbore, start_date, interval_start, selection)
-                if start_date >= interval_start and start_date < interval_end:
-                    plot = True
-                else:                   
-                    plot = False
-                    
-            if plot and (selection == "production_completed" or selection == "injection_completed"):
-                try:
-                    top_md = completion_df[completion_df["interval.wellbore"] == wellbore_name][
-                        "interval.mdTop"
-                    ].values[0]
-                except:
-                    top_md = None   
-                
-                try:
-                    base_md = completion_df[completion_df["interval.wellbore"] == wellbore_name][
-                        "interval.mdBottom"
-                    ].values[-1]
-                except:
-                    base_md = None
-                    
-                #print(top_md, base_md)
-                    
-                if top_md and base_md:     
-                    md_start = top_md
-                    md_end =  base_md
-                    plot = True
-                else:
-                    plot = False
-                    
-        if plot:
-            print(short_name, info, selection)
-            polyline_data = well.get_well_polyline(
-                wellbore,
-                short_name,
-                well_dataframe,
-                well_type,
-                fluid,
-                info,
-                md_start,
-                md_end,
-                selection,
-                colors,
-            )
-            
-        if polyline_data:
-            data.append(polyline_data)
-
-    return {"name": label, "checked": False, "base_layer": False, "data": data}
-
-
-def add_production_volumes(drilled_well_info, prod_info_list):
-    wellbores = drilled_well_info["wellbore.name"].unique()
-    names = drilled_well_info[["wellbore.name", "wellbore.well_name"]]
-
-    print("Looping through all production information ...")
-    for prod_info in prod_info_list:
-        for column in prod_info.columns:
-            values = []
-            header = prod_info.name + "_" + column
-
-            for wellbore in wellbores:
-                well_name = names[names["wellbore.name"] == wellbore][
-                    "wellbore.well_name"
-                ].values[0]
-
-                try:
-                    value = prod_info[prod_info["Well name"] == well_name][
-                        column
-                    ].values[0]
-                except:
-                    value = None
-                # print(wellbore,value)
-                values.append(value)
-
-            # Add column with volume in 4D interval to dataframe
-            drilled_well_info[header] = values
-
-    return drilled_well_info
-
-
-def store_well_layer(well_layer, well_directory, label, interval_4d):
-    well_layer_file = os.path.join(well_directory, label + interval_4d + ".pkl")
-
-    dbfile = open(well_layer_file, "wb")
-    pickle.dump(well_layer, dbfile)
-    dbfile.close()
-    print("Well layer stored to " + well_layer_file)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_well_layer_data,
+        initargs=well_layer_data,
+    ) as executor:
+        return list(executor.map(make_interval_layers, intervals))
+
+
+def store_well_layers(well_layers, well_directory):
+    """ Store all well layers in the well layer archive in the well folder """
+    archive_file = os.path.join(well_directory, WELL_LAYER_ARCHIVE)
+    WellLayerArchive.write(archive_file, well_layers)
+    print("Well layers stored to " + archive_file)
 
 
 def main():
@@ -388,6 +102,18 @@ def main():
         "config_file", help="Enter path to the WebViz-4D configuration file"
     )
 
+    parser.add_argument(
+        "--workers",
+        help="Number of worker processes (default: number of CPUs)",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--screens",
+        help="Show each screen in the completed layers (or screens in the config)",
+        action="store_true",
+    )
+
     args = parser.parse_args()
     print(description)
     print(args)
@@ -404,6 +130,9 @@ def main():
     well_directory = common.get_config_item(config, "wellfolder")
     well_directory = common.get_full_path(well_directory)
 
+    well_layer_source = common.get_config_item(config, "well_layers") or "archive"
+    screens = args.screens or bool(common.get_config_item(config, "screens"))
+
     prod_info_dir = common.get_config_item(config, "production_data")
     prod_info_dir = common.get_full_path(prod_info_dir)
     update_metadata_file = os.path.join(prod_info_dir, ".production_update.yaml")
@@ -430,134 +159,83 @@ def main():
     intervals_4d, incremental = get_all_intervals(metadata, "reverse")
     colors = common.get_well_colors(settings)
 
-    prod_info_files = [os.path.join(prod_info_dir, OIL_PRODUCTION_FILE)]
-    prod_info_files.append(os.path.join(prod_info_dir, GAS_INJECTION_FILE))
-    prod_info_files.append(os.path.join(prod_info_dir, WATER_INJECTION_FILE))
+    prod_info_list = read_production_info(prod_info_dir)
 
-    prod_info_list = []
-    for prod_info_file in prod_info_files:
-        print("Reading production info from file " + str(prod_info_file))
-        prod_info = pd.read_csv(prod_info_file)
-        prod_info.name = os.path.basename(str(prod_info_file))
+    # Cumulative volumes, used for intervals not included in the production files
+    cube_file = os.path.join(prod_info_dir, PRODUCTION_CUBE_FILE)
 
-        prod_info_list.append(prod_info)
+    if os.path.isfile(cube_file):
+        print("Reading cumulative volumes from file " + cube_file)
+        production_cube = ProductionCube.load(cube_file)
+    else:
+        production_cube = None
 
     drilled_well_df, drilled_well_info, interval_df = well.load_all_wells(
-        well_directory, well_suffix
+        well_directory, well_suffix, parallel=True, update_cache=True
     )
 
     drilled_well_info = add_production_volumes(drilled_well_info, prod_info_list)
-    #well_info = WellDataFrame(drilled_well_info)
-
-    wellbores = drilled_well_info["wellbore.name"].unique()
 
     # print("well_info.data_frame")
 
     print("Last production update", production_update)
     print("Looping through all 4D intervals ...")
-    for interval_4d in intervals_4d:
-        print("4D interval:", interval_4d)
+    well_layers = {}
+    selected_intervals = []
 
+    for interval_4d in intervals_4d:
         if interval_4d[0:10] <= production_update:
-            well_layer = make_new_well_layer(
-                interval_4d,
-                drilled_well_df,
-                drilled_well_info,
-                interval_df,
-                prod_info_list,
-                colors,
-                selection="production",
-                label="Producers",
-            )
-            label = "production_well_layer_"
-            store_well_layer(well_layer, well_directory, label, interval_4d)
-            
-            well_layer = make_new_well_layer(
-                interval_4d,
-                drilled_well_df,
-                drilled_well_info,
-                interval_df,
-                prod_info_list,
-                colors,
-                selection="production_start",
-                label="Producers - started",
-            )
-            label = "production_start_well_layer_"
-            store_well_layer(well_layer, well_directory, label, interval_4d)
-            
-            well_layer = make_new_well_layer(
-                interval_4d,
-                drilled_well_df,
-                drilled_well_info,
-                interval_df,
-                prod_info_list,
-                colors,
-                selection="production_completed",
-                label="Producers - completed",
-            )
-            label = "production_completed_well_layer_"
-            store_well_layer(well_layer, well_directory, label, interval_4d)
-
-            well_layer = make_new_well_layer(
-                interval_4d,
-                drilled_well_df,
-                drilled_well_info,
-                interval_df,
-                prod_info_list,
-                colors,
-                selection="injection",
-                label="Injectors",
-            )
-
-            label = "injection_well_layer_"
-            store_well_layer(well_layer, well_directory, label, interval_4d)
-            
-            well_layer = make_new_well_layer(
-                interval_4d,
-                drilled_well_df,
-                drilled_well_info,
-                interval_df,
-                prod_info_list,
-                colors,
-                selection="injection_start",
-                label="Injectors - started",
-            )
-            label = "injection_start_well_layer_"
-            store_well_layer(well_layer, well_directory, label, interval_4d)
-            
-            well_layer = make_new_well_layer(
-                interval_4d,
-                drilled_well_df,
-                drilled_well_info,
-                interval_df,
-                prod_info_list,
-                colors,
-                selection="injection_completed",
-                label="Injectors - completed",
-            )
-            label = "injection_completed_well_layer_"
-            store_well_layer(well_layer, well_directory, label, interval_4d)
+            selected_intervals.append(interval_4d)
         else:
+            print("4D interval:", interval_4d)
             print("  - no production data for this time interval")
-    
-    prod_headers = prod_info.columns
-    last_header = prod_headers[-1]
-    interval_4d = last_header
- 
-    well_layer = make_new_well_layer(
-                interval_4d,
-                drilled_well_df,
-                drilled_well_info,
-                interval_df,
-                prod_info_list,
-                colors,
-                selection="active",
-                label="Active wells",
-            )      
-    
-    if well_layer:
-        label = "active_well_layer_"
-        store_well_layer(well_layer, well_directory, label, interval_4d)        
+
+    # Completion intervals indexed by wellbore, shared by all layers
+    completions = CompletionIntervals(interval_df)
+
+    well_layer_data = (
+        drilled_well_df,
+        drilled_well_info,
+        completions,
+        colors,
+        production_cube,
+        screens,
+        get_volume_columns(drilled_well_info),
+        WellTrajectories(drilled_well_df),
+    )
+    start = timer()
+
+    for interval_4d, interval_layers, elapsed in make_all_interval_layers(
+        selected_intervals, well_layer_data, args.workers
+    ):
+        print("4D interval:", interval_4d, "{:.2f} s".format(elapsed))
+        well_layers.update(interval_layers)
+
+    print("All 4D intervals: {:.2f} s".format(timer() - start))
+
+    # Active wells, selected from the last interval in the production files
+    interval_4d = get_last_interval(prod_info_list)
+    well_layer = make_interval_well_layers(
+        interval_4d,
+        drilled_well_df,
+        drilled_well_info,
+        completions,
+        colors,
+        production_cube,
+        selections=[ACTIVE_LAYER],
+        trajectories=well_layer_data[-1],
+        verbose=True,
+    )[0]
+    well_layers[("active", interval_4d)] = well_layer
+
+    if well_layer_source != "archive":
+        print(
+            "NOTE: The viewer makes the well layers from the production data",
+            "(well_layers: " + str(well_layer_source) + ")",
+        )
+
+    store_well_layers(well_layers, well_directory)
+
 
 if __name__ == "__main__":
     main()
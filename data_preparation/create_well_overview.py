@@ -7,11 +7,13 @@ import math
 import pandas as pd
 from webviz_4d._datainput import common
 from webviz_4d._datainput import well
+from webviz_4d._datainput.production_data import add_production_volumes
 from webviz_4d._datainput._metadata import (
     get_metadata,
     get_all_intervals,
 )
 from webviz_4d.wells.well_data_frame import WellDataFrame
+from webviz_4d.wells.completion_intervals import CompletionIntervals
 
 
 OIL_PRODUCTION_FILE = "BORE_OIL_VOL.csv"
@@ -19,36 +21,6 @@ GAS_INJECTION_FILE = "BORE_GI_VOL.csv"
 WATER_INJECTION_FILE = "BORE_WI_VOL.csv"
 
 
-def add_production_volumes(drilled_well_info, prod_info_list):
-    wellbores = drilled_well_info["wellbore.name"].unique()
-    names = drilled_well_info[["wellbore.name", "wellbore.well_name"]]
-
-    print("Looping through all production information ...")
-    for prod_info in prod_info_list:
-        for column in prod_info.columns:
-            values = []
-            header = prod_info.name + "_" + column
-
-            for wellbore in wellbores:
-                well_name = names[names["wellbore.name"] == wellbore][
-                    "wellbore.well_name"
-                ].values[0]
-
-                try:
-                    value = prod_info[prod_info["Well name"] == well_name][
-                        column
-                    ].values[0]
-                except:
-                    value = None
-                # print(wellbore,value)
-                values.append(value)
-
-            # Add column with volume in 4D interval to dataframe
-            drilled_well_info[header] = values
-
-    return drilled_well_info
-
-
 def main():
     # Main
     description = "Create a well overview file (.csv) with relevant metadata"
@@ -91,7 +63,7 @@ def main():
 
     
     _drilled_well_df, drilled_well_info, interval_df = well.load_all_wells(
-        well_directory, well_suffix)
+        well_directory, well_suffix, parallel=True, update_cache=True)
     print(interval_df)
         
     drilled_well_info = add_production_volumes(drilled_well_info, prod_info_list)
@@ -116,25 +88,13 @@ def main():
     
     wellbores = wellbore_overview["wellbore.name"].unique()
     
+    completions = CompletionIntervals(interval_df)
     top_completion = []
     end_completion = []
     
     for wellbore in wellbores:
-        try:
-            top_md = interval_df[interval_df["interval.wellbore"] == wellbore][
-                "interval.mdTop"
-            ].values[0]
-        except:
-            top_md = None
-            
+        top_md, base_md = completions.get_interval(wellbore)
         top_completion.append(top_md)
-        
-        try:
-            base_md = interval_df[interval_df["interval.wellbore"] == wellbore][
-                "interval.mdBottom"
-            ].values[-1]
-        except:
-            base_md = None
         print(wellbore,top_md, base_md)
         end_completion.append(base_md)
         
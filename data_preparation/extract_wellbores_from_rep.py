@@ -4,104 +4,12 @@ import sys
 import os
 import glob
 import argparse
-import math
 import datetime
-import pandas as pd
-from pandas import json_normalize
-import yaml
-import numpy as np
-from reper import wrappers
-from webviz_4d._datainput.well import load_well
-
-
-def write_rms_wellbore(wellbore_name, wellbore_df, rkb, export_dir):
-    """ Write the wellbore trajectory and log values to a file (RMS Aascii format) """
-    MISSING_VALUE = -999
-
-    wellbore_df.fillna(MISSING_VALUE, inplace=True)
-    # print(well_df)
-
-    name = wellbore_name.replace("/", "_").replace("NO ", "").replace(" ", "_")
-    xutm = wellbore_df["EASTING"].values[0]
-    yutm = wellbore_df["NORTHING"].values[0]
-
-    if not os.path.exists(export_dir):
-        os.mkdir(export_dir)
-
-    outfile = os.path.join(export_dir, name + ".w")
-
-    file_object = open(outfile, "w")
-    file_object.write("1.0\n")
-    file_object.write("LOCATION\n")
-    file_object.write("%-15s %10.2f %12.2f %5.2f\n" % (name, xutm, yutm, rkb))
-
-    n_columns = len(wellbore_df.columns)
-    n_logs = n_columns - 3
-    file_object.write(str(n_logs) + "\n")
-
-    columns = wellbore_df.columns
-
-    file_object.write(columns[0] + "   UNK    lin\n")  # MD column (first "log")
-
-    for i in range(4, n_columns):
-        file_object.write("%10s" % (columns[i] + "   UNK    lin\n"))
-
-    for _index, row in wellbore_df.iterrows():
-
-        file_object.write("%12.2f" % (row[2]))  # XUTM
-        file_object.write("%12.2f" % (row[3]))  # YUTM
-        file_object.write("%12.2f" % (row[1]))  # TVDMSL
-        file_object.write("%12.2f" % (row[0]))  # MD
-
-        for i in range(4, len(wellbore_df.columns)):
-            file_object.write("%12.2f" % (row[i]))
-
-        file_object.write("\n")
-
-    file_object.close()
-
-    # print("Well data exported to ", outfile)
-
-
-def write_metadata(
-    export_dir,
-    wellbore_name,
-    short_name,
-    slot_name,
-    field,
-    wellbore_type,
-    rkb,
-    end_date,
-    fluids,
-    intervals,
-):
-    """ Write the extracted metadata for the wellbore to a yaml file """
-    if not os.path.isdir(export_dir):
-        os.mkdir(export_dir)
-
-    rms_name = wellbore_name.replace("/", "_").replace("NO ", "").replace(" ", "_")
-    
-    if end_date:
-        end_date = end_date[0:10]
-        
-    outfile = os.path.join(export_dir, "." + rms_name + ".w.yaml")
-
-    file_object = open(outfile, "w")
-    file_object.write("- wellbore:\n")
-    file_object.write("   name: " + wellbore_name + "\n")
-    file_object.write("   rms_name: " + rms_name + "\n")
-    file_object.write("   short_name: " + short_name + "\n")
-    file_object.write("   slot_name: " + slot_name + "\n")
-    file_object.write("   field: " + field + "\n")
-    file_object.write("   type: " + wellbore_type + "\n")
-    file_object.write("   rkb: " + str(rkb) + "\n")
-    file_object.write("   drilling_end_date: " + end_date + "\n")
-    file_object.write("   fluids: " + fluids + "\n")
-    file_object.close()
-
-    if intervals:
-        with open(outfile, "a") as yamlfile:
-            yaml.dump(intervals, yamlfile, default_flow_style=False)
+from webviz_4d._datainput.rep_wellbores import (
+    RepClient,
+    extract_wellbores,
+    WORKERS,
+)
 
 
 # Main program
@@ -148,6 +56,12 @@ def main():
         type=int,
         default=0,
     )
+    parser.add_argument(
+        "--workers",
+        help="Number of worker threads fetching wellbores",
+        type=int,
+        default=WORKERS,
+    )
 
     args = parser.parse_args()
 
@@ -156,8 +70,6 @@ def main():
 
     print(field, "Depth increment:", md_inc)
 
-    EQUIPMENT_NAMES = ["Screen", "Perforations"]
-
     export_dir = field.lower().replace(" ", "_") + "/well_data/"
 
     if os.path.isdir(export_dir):
@@ -171,8 +83,8 @@ def main():
             print("ERROR: Well directory", export_dir, "not found")
             sys.exit()
 
-    wellbores = sorted(wrappers.Field(field).get_wellbore_names())
-    
+    client = RepClient(field)
+
     # Remove existing wells (not planned wells) and all metadata
     if os.path.isdir(export_dir):
         files = glob.glob(export_dir + "*.w")
@@ -186,119 +98,8 @@ def main():
             os.remove(file_object)
 
 
-    i = 1
-    for wellbore in wellbores:
-        trajectory = wrappers.Wellbore(field, wellbore).get_wellbore_pos_log()
-        df_trajectory = json_normalize(trajectory)
-
-        rkb = wrappers.Wellbore(field, wellbore).get_depth_reference_elevation()
-        df_trajectory["md"] = df_trajectory["md"].values + rkb
-
-        end_date = wrappers.Wellbore(field, wellbore).get_wellbore_end_date()
-        if end_date is None:
-            end_date = ""
-
-        wellbore_type = wrappers.Wellbore(field, wellbore).get_wellbore_type()
-        if wellbore_type is None:
-            wellbore_type = ""
-
-        facility = wrappers.Wellbore(field, wellbore).get_wellbore_drilling_facility()
-        if facility is None:
-            facility = ""
-
-        slot_name = wrappers.Wellbore(field, wellbore).get_well_identifier()
-        if slot_name is None:
-            slot_name = ""
-
-        fluids = wrappers.Wellbore(field, wellbore).get_wellbore_fluids()
-        if fluids is None:
-            fluids = ""
-
-        completion_list = wrappers.Wellbore(
-            field, wellbore
-        ).get_wellbore_completion_data()
-
-        completions = []
-
-        if completion_list:
-            for item in completion_list:
-                for equipment in EQUIPMENT_NAMES:
-                    if equipment in item["symbolName"]:
-                        completion = {
-                            "wellbore": wellbore,
-                            "equipment": item["symbolName"],
-                            "mdTop": item["mdTop"] + rkb,
-                            "mdBottom": item["mdBottom"] + rkb,
-                        }
-                        completion_dict = {"interval": completion}
-                        completions.append(completion_dict)
-        
-        if wellbore == "NO 16/2-E-1 H":                
-            casing_list = wrappers.Wellbore(
-                field, wellbore
-            ).get_wellbore_casing_data() 
-            for item in casing_list:
-                print(item)       
-
-        md_wellbore = df_trajectory["md"]
-        tvd_wellbore = df_trajectory["tvd"]
-        easting = df_trajectory["easting"]
-        northing = df_trajectory["northing"]
-        total_depth = md_wellbore.values[-1]
-
-        # Resample well trajectory if wanted
-        if md_inc > 0:
-            start_md = md_wellbore[0]
-            end_md = math.floor(total_depth)
-
-            md_reg = np.arange(start_md, end_md, md_inc)
-
-            tvd_reg = np.interp(md_reg, md_wellbore, tvd_wellbore)
-            easting_reg = np.interp(md_reg, md_wellbore, easting)
-            northing_reg = np.interp(md_reg, md_wellbore, northing)
-
-            md_reg = np.append(md_reg, md_wellbore.values[-1])
-            tvd_reg = np.append(tvd_reg, tvd_wellbore.values[-1])
-            easting_reg = np.append(easting_reg, easting.values[-1])
-            northing_reg = np.append(northing_reg, northing.values[-1])
-        else:
-            md_reg = md_wellbore
-            tvd_reg = tvd_wellbore
-            easting_reg = easting
-            northing_reg = northing
-
-        print(i, wellbore)
-
-        well_df = pd.DataFrame()
-        well_df["MD"] = md_reg
-        well_df["TVDMSL"] = tvd_reg
-        well_df["EASTING"] = easting_reg
-        well_df["NORTHING"] = northing_reg
-
-        # print(df)
-
-        name = wellbore.replace("/", "_").replace("NO ", "").replace(" ", "_")
-
-        write_rms_wellbore(wellbore, well_df, rkb, export_dir)
-        rms_file = name + ".w"
-
-        xtgeo_wellbore = load_well(os.path.join(export_dir, rms_file))
-        wellbore_short_name = xtgeo_wellbore.shortwellname
-        # print(xtgeo_well)
-
-        write_metadata(
-            export_dir,
-            wellbore,
-            wellbore_short_name,
-            slot_name,
-            field,
-            wellbore_type,
-            rkb,
-            end_date,
-            fluids,
-            completions,
-        )
-        i = i + 1
+    n_wellbores = extract_wellbores(client, field, export_dir, md_inc, args.workers)
+    print(n_wellbores, "wellbores extracted")
 
     now = datetime.datetime.now()
     print("Update time", now.strftime("%Y-%m-%d %H:%M:%S"))
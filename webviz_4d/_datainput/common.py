@@ -4,6 +4,8 @@ import os
 import io
 import glob
 import re
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 import json
 import yaml
@@ -11,6 +13,7 @@ import numpy as np
 import pandas as pd
 from pandas import json_normalize
 import xtgeo
+from webviz_4d.wells.well_hierarchy import WellHierarchy
 
 defaults = {
     "well_suffix": ".w",
@@ -19,6 +22,9 @@ defaults = {
     "surface_metadata": "surface_metadata.csv",
 }
 
+# The well hierarchy for the last used wellbore info dataframe
+well_hierarchy_cache = {"well_info_df": None, "well_hierarchy": None}
+
 
 def read_config(config_file):
     """ Return the content of a configuration file as a dict """
@@ -226,144 +232,86 @@ def get_update_dates(wellfolder):
     return update_dates
 
 
-def get_well_metadata(metadata_df, wellbore_name, item):
-    """ Return selected metadata for a selected wellbore """
-    value = None
+def get_well_hierarchy(well_info_df):
+    """ Return the well hierarchy index for a wellbore info dataframe. The index
+    is reused as long as the same dataframe is used. """
+    if well_hierarchy_cache["well_info_df"] is not well_info_df:
+        well_hierarchy_cache["well_info_df"] = well_info_df
+        well_hierarchy_cache["well_hierarchy"] = WellHierarchy(well_info_df)
 
-    well_metadata = metadata_df[metadata_df["wellbore.name"] == wellbore_name]
+    return well_hierarchy_cache["well_hierarchy"]
 
-    if not well_metadata.empty:
-        value = well_metadata[item].values[0]
 
-    return value
+def get_well_metadata(metadata_df, wellbore_name, item):
+    """ Return selected metadata for a selected wellbore """
+    return get_well_hierarchy(metadata_df).get_well_metadata(wellbore_name, item)
 
 
 def get_wellbores(metadata_df, well_name):
     """ Return all possible wellbores for a selected well """
-    wellbores = metadata_df[metadata_df["wellbore.slot_name"] == well_name]
-    wellbore_names = wellbores["wellbore.name"].values
-
-    return sorted(wellbore_names)
+    return get_well_hierarchy(metadata_df).get_wellbores(well_name)
 
 
 def get_mother_wells(metadata_df, slot_name):
     """ Returns a list of possible mother wells - excluding sidetracks"""
-    mother_well = slot_name
-    mother_wells = [slot_name]
-
-    wellbores = get_wellbores(metadata_df, slot_name)  # All wellbores with same slot
-
-    for wellbore in wellbores:
-        if not wellbore == mother_well and not wellbore[-2] == "T":
-            if wellbore[-1] in "123456789":
-                last = len(wellbore) - 1
-            else:
-                last = len(wellbore)
-            name = wellbore[:last]
-
-            if not name == mother_well:
-                mother_well = name
-                mother_wells.append(mother_well)
-
-    list_set = set(mother_wells)
-    unique_list = sorted(list(list_set))
-
-    return unique_list
+    return get_well_hierarchy(metadata_df).get_mother_wells(slot_name)
 
 
 def get_branches(well_info_df, mother_well):
     """ Get all branches for a well """
-    branches = []
-    i = mother_well.rfind(" ")
+    return get_well_hierarchy(well_info_df).get_branches(mother_well)
 
-    possible_branches = well_info_df[
-        well_info_df["wellbore.name"].str.contains(mother_well, regex=False)
-    ]["wellbore.name"].values
 
-    for branch in possible_branches:
-        i_branch = branch.rfind(" ")
-        last = len(branch)
+def get_wellname(well_info_df, wellbore):
+    """ Return well name for a selected wellbore """
+    return get_well_hierarchy(well_info_df).get_wellname(wellbore)
 
-        if (
-            branch == mother_well or branch[: last - 1] == mother_well + " T"
-        ):  # Sidetracked mother wells
-            branches.append(branch)
 
-        elif mother_well[:i] == branch[:i_branch] and not i == 2:
-            branches.append(branch)
+WELLBORE_NAME_PATTERN = (
+    r"^(?P<Block_name>[^-]*)-(?P<Slot_name>[^-\s]*)"
+    r"(?:-(?P<Slot_number>[^\s]*))?\s*(?P<Branch_name>.*)$"
+)
 
-    return sorted(branches)
 
+def parse_wellbore_names(well_names):
+    """ Return a dataframe with block name, slot name, slot number and branch
+    name for a list of wellbore names, e.g. 'NO 25/11-G-5 AH' gives
+    'NO 25/11', 'G', 5 and 'AH' """
+    names = pd.Series(well_names, dtype=object).astype(str)
+    parsed = names.str.extract(WELLBORE_NAME_PATTERN)
 
-def get_wellname(well_info_df, wellbore):
-    """ Return well name for a selected wellbore """
-    slot_name = get_well_metadata(well_info_df, wellbore, "wellbore.slot_name")
+    parsed["Slot_number"] = pd.to_numeric(parsed["Slot_number"], errors="coerce")
+    parsed = parsed.fillna({"Block_name": "", "Slot_name": "", "Branch_name": ""})
+    parsed.insert(0, "Well_name", names)
 
-    if slot_name:
-        mother_wells = get_mother_wells(well_info_df, slot_name)
+    return parsed
 
-        for mother_well in mother_wells:
-            branches = get_branches(well_info_df, mother_well)
 
-            for branch in branches:
-                if branch == wellbore:
-                    return mother_well
+@lru_cache(maxsize=16)
+def get_wellbore_order(well_names):
+    """ Return a set of wellbore names (frozenset) as a tuple, sorted by block
+    name, slot name, slot number and branch name """
+    parsed = parse_wellbore_names(sorted(well_names))
+    parsed.sort_values(
+        by=["Block_name", "Slot_name", "Slot_number", "Branch_name"],
+        kind="mergesort",
+        inplace=True,
+    )
 
-    return None
+    return tuple(parsed["Well_name"].values)
 
 
 def sort_wellbores(well_names):
     """ Return a sorted list of wellbore names given a list of well names """
-    block_names = []
-    slot_names = []
-    slot_numbers = []
-    branch_names = []
-
-    for well_name in well_names:
-        # print(well_name)
-        slot_number = ""
-        branch_name = ""
-
-        index1 = well_name.find("-")
-        index2 = well_name[index1 + 1 :].find("-") + index1 + 1
-
-        if index2 > index1 + 1:
-            slot_name = well_name[index1 + 1 : index2]
-            ind = well_name[3:].find(" ")
-
-            if ind > 0:
-                slot_number = int(well_name[index2 + 1 : ind + 4])
-            else:
-                slot_number = int(well_name[index2 + 1 :])
-        else:
-            ind = well_name[3:].find(" ")
-            if ind > 0:
-                slot_name = well_name[index1 + 1 : ind + 4]
-            else:
-                slot_name = well_name[index1 + 1 :]
-
-        if ind > 0:
-            branch_name = well_name[ind + 3 :]
-
-        block_name = well_name[:index1]
-
-        block_names.append(block_name)
-        slot_names.append(slot_name)
-        slot_numbers.append(slot_number)
-        branch_names.append(branch_name)
-
-    new_df = pd.DataFrame(
-        zip(well_names, block_names, slot_names, slot_numbers, branch_names),
-        columns=["Well_name", "Block_name", "Slot_name", "Slot_number", "Branch_name"],
-    )
-
-    # pd.set_option('display.max_rows', None)
-    new_df.sort_values(
-        by=["Block_name", "Slot_name", "Slot_number", "Branch_name"], inplace=True
-    )
-    sorted_wellbores = new_df["Well_name"].values
+    well_names = [str(well_name) for well_name in well_names]
+    counts = Counter(well_names)
+    sorted_wellbores = [
+        well_name
+        for well_name in get_wellbore_order(frozenset(counts))
+        for _count in range(counts[well_name])
+    ]
 
-    return sorted_wellbores
+    return np.array(sorted_wellbores, dtype=object)
 
 
 def is_nan(string):
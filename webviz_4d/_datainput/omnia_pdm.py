@@ -1,18 +1,203 @@
-import pyodbc
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+""" Extract daily production data for a field from the PDM database, in chunks,
+to the production file (prod_data.csv) and the production table used by
+compile_production_data. The Azure SQL database is used by default, a SQLite
+database with the same table can be used instead (tests and benchmarks). """
+
+import os
+import argparse
+import sqlite3
+import numpy as np
 import pandas as pd
+from webviz_4d._datainput import production_data
+
+
+SERVER = "productionoptimizationprod.database.windows.net"
+DRIVER = "ODBC Driver 17 for SQL Server"
+DATABASE = "pdm"
+PDM_TABLE = "PDM.DAILY_PROD_W"
+PRODUCTION_FILE = "prod_data.csv"
+
+
+def azure_connection(server=SERVER, database=DATABASE, driver=DRIVER):
+    """ Return a connection to the PDM database in Azure SQL """
+    import pyodbc
+
+    return pyodbc.connect(
+        "DRIVER="
+        + driver
+        + ";SERVER="
+        + server
+        + ";PORT=1443;DATABASE="
+        + database
+        + ";Authentication=ActiveDirectoryIntegrated"
+    )
+
+
+def sqlite_connection(database_file):
+    """ Return a connection to a SQLite database with the PDM tables. The
+    database is attached as PDM, so the tables have the same names as in the
+    PDM database. """
+    connection = sqlite3.connect(database_file)
+    connection.execute("ATTACH DATABASE ? AS PDM", (database_file,))
+
+    return connection
+
+
+def get_query(field_name, volume_codes=None, start_date=None, table=PDM_TABLE):
+    """ Return the query (and its parameters) for the daily production data
+    for a field, optionally from a start date """
+    if volume_codes is None:
+        volume_codes = production_data.VOLUME_CODES
+
+    columns = ["WELL_BORE_CODE", "DATEPRD"] + list(volume_codes)
+    sql = "select " + ", ".join(columns) + " from " + table
+    sql = sql + " where npd_field_name like ?"
+    params = [field_name]
+
+    if start_date is not None:
+        sql = sql + " and DATEPRD >= ?"
+        params.append(str(start_date)[0:10])
+
+    return sql, params
+
+
+def read_production_chunks(
+    connection,
+    field_name,
+    volume_codes=None,
+    start_date=None,
+    chunksize=production_data.CHUNKSIZE,
+    table=PDM_TABLE,
+):
+    """ Return an iterator over the daily production data for a field, with
+    at most chunksize rows in each chunk """
+    sql, params = get_query(field_name, volume_codes, start_date, table)
+
+    return pd.read_sql(sql, connection, params=params, chunksize=chunksize)
+
+
+def extract_production_data(
+    connection,
+    field_name,
+    production_dir,
+    volume_codes=None,
+    start_date=None,
+    chunksize=production_data.CHUNKSIZE,
+    table=PDM_TABLE,
+):
+    """ Extract the daily production data for a field to the production file
+    and the production table in a directory. Each chunk is appended to the
+    production file and only kept as typed columns, so the memory use does not
+    depend on the width of the query result, but it still grows with the number
+    of rows (see concat_production_chunks). If a start date is given, only
+    the rows from that date are extracted. They are appended to the production
+    file (rows already in the file are skipped, the columns are ordered as in
+    the file header) and merged into the existing production table, replacing
+    the rows for the same wellbore and date. """
+    production_file = os.path.join(production_dir, PRODUCTION_FILE)
+    table_file = os.path.join(production_dir, production_data.PRODUCTION_TABLE_FILE)
+
+    if volume_codes is None:
+        volume_codes = production_data.VOLUME_CODES
+
+    existing = None
+
+    if start_date is not None and os.path.isfile(production_file):
+        header = pd.read_csv(production_file, nrows=0).columns.tolist()
+        existing = production_data.load_production_data(production_file, volume_codes)
+        overlap = existing["DATEPRD"].values >= np.datetime64(str(start_date)[0:10])
+        known_rows = production_data.get_production_keys(existing[overlap])
+
+    def write_chunks(chunks):
+        n_rows = 0
+
+        for chunk in chunks:
+            new_rows = chunk
+
+            if existing is not None:
+                if sorted(chunk.columns) != sorted(header):
+                    raise ValueError(
+                        "The extracted columns "
+                        + str(chunk.columns.tolist())
+                        + " do not match the columns in "
+                        + production_file
+                        + ": "
+                        + str(header)
+                    )
+
+                found = production_data.get_production_keys(chunk).isin(known_rows)
+                new_rows = chunk.loc[~found, header]
+
+            new_rows.to_csv(
+                production_file,
+                mode="a" if n_rows or existing is not None else "w",
+                header=not n_rows and existing is None,
+                index=False,
+            )
+            n_rows = n_rows + len(chunk)
+            print("  rows extracted:", n_rows)
+
+            yield chunk
+
+    chunks = read_production_chunks(
+        connection, field_name, volume_codes, start_date, chunksize, table
+    )
+    prod_data = production_data.concat_production_chunks(
+        write_chunks(chunks), volume_codes
+    )
+    print("Data exported to file " + production_file)
+
+    if existing is not None:
+        prod_data = production_data.merge_production_data(existing, prod_data)
+
+    # The production table is written last, so that it is newer than the
+    # production file and used by load_production_data
+    production_data.write_production_table(prod_data, table_file)
+    print("Production data exported to file " + table_file)
+
+    return prod_data
+
+
+def main():
+    """ Extract daily production data from PDM """
+    parser = argparse.ArgumentParser(description="Extract production data from PDM")
+    parser.add_argument("field_name", help="Field name, e.g. Grane")
+    parser.add_argument("production_dir", help="Output folder for production data")
+    parser.add_argument(
+        "--sqlite", help="SQLite database to use instead of the PDM database"
+    )
+    parser.add_argument(
+        "--chunksize",
+        help="Number of rows read at a time",
+        type=int,
+        default=production_data.CHUNKSIZE,
+    )
+    parser.add_argument(
+        "--start_date",
+        help="Only extract the data from this date (YYYY-MM-DD), added to the "
+        "existing production data",
+    )
+    args = parser.parse_args()
+
+    if args.sqlite:
+        connection = sqlite_connection(args.sqlite)
+    else:
+        connection = azure_connection()
+
+    try:
+        extract_production_data(
+            connection,
+            args.field_name,
+            args.production_dir,
+            start_date=args.start_date,
+            chunksize=args.chunksize,
+        )
+    finally:
+        connection.close()
+
 
-server = "productionoptimizationprod.database.windows.net"
-driver = "ODBC Driver 17 for SQL Server"
-cnxn = pyodbc.connect(
-    "DRIVER="
-    + driver
-    + ";SERVER="
-    + server
-    + ";PORT=1443;DATABASE=pdm;Authentication=ActiveDirectoryIntegrated"
-)
-
-sql = "select * from PDM.DAILY_PROD_W where npd_field_name like 'Grane'"
-df = pd.read_sql(sql, cnxn)
-
-df.to_csv("grane_prod_data.csv")
-print(df)
+if __name__ == "__main__":
+    main()
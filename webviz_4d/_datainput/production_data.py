@@ -2,31 +2,329 @@
 # -*- coding: utf-8 -*-
 
 import os
-from time import strptime
-import calendar
 import argparse
 import numpy as np
 import pandas as pd
 from webviz_4d._datainput import common
+from webviz_4d.wells.production_cube import ProductionCube
+
+
+VOLUME_CODES = [
+    "BORE_OIL_VOL",
+    "BORE_GAS_VOL",
+    "BORE_WAT_VOL",
+    "BORE_GI_VOL",
+    "BORE_WI_VOL",
+]
+PRODUCTION_TABLE_FILE = "prod_data.npz"
+CHUNKSIZE = 500000
+
+
+def read_production_file(
+    production_file, volume_codes=None, chunksize=CHUNKSIZE, start_date=None
+):
+    """ Read the daily production volumes in chunks, keeping only the wellbore
+    names, the dates and the selected volume codes. The wellbore names are
+    returned as a categorical column and the dates as datetime64. If a start
+    date is given, only the rows from that date are kept. """
+    if volume_codes is None:
+        volume_codes = VOLUME_CODES
+
+    dtypes = {volume_code: np.float64 for volume_code in volume_codes}
+    dtypes["WELL_BORE_CODE"] = str
+    dtypes["DATEPRD"] = str
+
+    chunks = pd.read_csv(
+        production_file, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize
+    )
+
+    if start_date is not None:
+        # The dates are stored as YYYY-MM-DD (hh:mm:ss)
+        chunks = (
+            chunk[chunk["DATEPRD"].values >= str(start_date)[0:10]]
+            for chunk in chunks
+        )
+
+    return concat_production_chunks(chunks, volume_codes)
+
+
+def concat_production_chunks(chunks, volume_codes=None):
+    """ Return one dataframe with typed columns from chunks of daily production
+    data, converting each chunk before the next one is read. Only one raw chunk
+    is kept at a time, but the typed columns of all the rows are kept (about 8
+    bytes per row for the date and each volume code), so the memory use still
+    grows with the number of rows. """
+    if volume_codes is None:
+        volume_codes = VOLUME_CODES
+
+    wellbores = []
+    dates = []
+    volumes = {volume_code: [] for volume_code in volume_codes}
+
+    for chunk in chunks:
+        wellbores.append(pd.Categorical(chunk["WELL_BORE_CODE"].values))
+        dates.append(
+            pd.to_datetime(chunk["DATEPRD"]).values.astype("datetime64[D]")
+        )
+
+        for volume_code in volume_codes:
+            volumes[volume_code].append(chunk[volume_code].astype(np.float64).values)
+
+    if not dates:
+        wellbores = [pd.Categorical([], categories=pd.Index([], dtype=object))]
+        dates = [np.array([], dtype="datetime64[D]")]
+        volumes = {volume_code: [np.array([])] for volume_code in volume_codes}
+
+    prod_data = pd.DataFrame(
+        {
+            "WELL_BORE_CODE": pd.api.types.union_categoricals(wellbores),
+            "DATEPRD": np.concatenate(dates),
+        }
+    )
+
+    for volume_code in volume_codes:
+        prod_data[volume_code] = np.concatenate(volumes[volume_code])
+
+    return prod_data
+
+
+def write_production_table(prod_data, table_file):
+    """ Store daily production data as a columnar numpy (.npz) file """
+    wellbores = pd.Categorical(prod_data["WELL_BORE_CODE"])
+    columns = {
+        volume_code: prod_data[volume_code].values
+        for volume_code in prod_data.columns
+        if volume_code not in ["WELL_BORE_CODE", "DATEPRD"]
+    }
+
+    np.savez(
+        table_file,
+        wellbores=np.asarray(wellbores.categories).astype(str),
+        wellbore_codes=wellbores.codes.astype(np.int32),
+        dates=prod_data["DATEPRD"].values.astype("datetime64[D]"),
+        volume_codes=np.array(list(columns), dtype=str),
+        **columns
+    )
+
+
+def read_production_table(table_file, start_date=None):
+    """ Return the daily production data stored with write_production_table.
+    If a start date is given, only the rows from that date are returned. """
+    with np.load(table_file) as data:
+        dates = data["dates"]
+        rows = slice(None)
+
+        if start_date is not None:
+            rows = np.flatnonzero(dates >= np.datetime64(str(start_date)[0:10]))
+
+        prod_data = pd.DataFrame(
+            {
+                "WELL_BORE_CODE": pd.Categorical.from_codes(
+                    data["wellbore_codes"][rows], data["wellbores"].tolist()
+                ),
+                "DATEPRD": dates[rows],
+            }
+        )
+
+        for volume_code in data["volume_codes"].tolist():
+            prod_data[volume_code] = data[volume_code][rows]
+
+    if start_date is not None:
+        prod_data["WELL_BORE_CODE"] = prod_data[
+            "WELL_BORE_CODE"
+        ].cat.remove_unused_categories()
+
+    return prod_data
+
+
+def load_production_data(production_file, volume_codes=None, start_date=None):
+    """ Return the daily production data, from the columnar production table
+    if it is newer than the production file. Otherwise the production file is
+    read and the production table is updated. If a start date is given, only
+    the rows from that date are returned (and the table is not updated). """
+    table_file = os.path.join(os.path.dirname(production_file), PRODUCTION_TABLE_FILE)
+
+    if volume_codes is None:
+        volume_codes = VOLUME_CODES
+
+    if os.path.isfile(table_file) and os.path.getmtime(
+        table_file
+    ) >= os.path.getmtime(production_file):
+        prod_data = read_production_table(table_file, start_date)
+
+        if all(volume_code in prod_data.columns for volume_code in volume_codes):
+            print("Production data read from file " + table_file)
+            return prod_data
+
+    if start_date is not None:
+        return read_production_file(
+            production_file, volume_codes, start_date=start_date
+        )
+
+    prod_data = read_production_file(production_file, volume_codes)
+    write_production_table(prod_data, table_file)
+    print("Production data exported to file " + table_file)
+
+    return prod_data
+
+
+def get_production_keys(prod_data):
+    """ Return the (wellbore, date) of the daily production rows as an index """
+    return pd.MultiIndex.from_arrays(
+        [
+            np.asarray(prod_data["WELL_BORE_CODE"]).astype(str),
+            pd.to_datetime(prod_data["DATEPRD"]).values.astype("datetime64[D]"),
+        ]
+    )
+
+
+def merge_production_data(prod_data, new_prod_data):
+    """ Return the daily production data with new rows added. Rows for the same
+    wellbore and date are replaced by the new rows. Only the existing rows from
+    the first new date are compared, since the new rows are usually the last
+    days of production. """
+    if len(new_prod_data) == 0:
+        return prod_data
+
+    first_date = new_prod_data["DATEPRD"].values.min()
+    overlap = np.flatnonzero(prod_data["DATEPRD"].values >= first_date)
+    replaced = get_production_keys(prod_data.iloc[overlap]).isin(
+        get_production_keys(new_prod_data)
+    )
+    kept = prod_data.drop(index=prod_data.index[overlap[replaced]])
+
+    merged = pd.concat([kept, new_prod_data], ignore_index=True)
+    merged["WELL_BORE_CODE"] = pd.api.types.union_categoricals(
+        [
+            pd.Categorical(kept["WELL_BORE_CODE"]),
+            pd.Categorical(new_prod_data["WELL_BORE_CODE"]),
+        ]
+    )
 
+    return merged
 
-def get_start_stop_dates(well_prod_data, prod_file_update, volume_code):
-    well_prod_data.replace(" 00:00:00", "", regex=True, inplace=True)
-    # print(well_prod_data)
 
-    start_date = well_prod_data.loc[well_prod_data[volume_code] > 0, "DATEPRD"].min()
-    stop_date = well_prod_data.loc[well_prod_data[volume_code] > 0, "DATEPRD"].max()
+def get_interval_volumes(prod_data, wells, intervals, volume_codes):
+    """ Return a dataframe for each volume code, with the volumes for each well
+    (rows) in each 4D interval (columns). The intervals are followed by the
+    volumes from the end of the last interval and the total volumes from the
+    start of the first interval. The daily volumes in each interval are summed
+    directly (not as differences of cumulative volumes), in the order of the
+    daily rows, which gives the same volumes as summing each interval and well
+    separately. """
+    _first_date, last_date = common.get_dates(intervals[-1])
+    first_date, _last_date = common.get_dates(intervals[0])
+    columns = list(intervals) + [last_date + "-now", first_date + "-now"]
 
-    if not common.is_nan(start_date):
-        stop_utc_time = strptime(stop_date, "%Y-%m-%d")
-        epoch_time = calendar.timegm(stop_utc_time)
-        # print(stop_date,prod_file_update - epoch_time)
+    # Bin the daily rows between all the 4D dates in one go
+    edges = sorted(
+        {date for interval in intervals for date in common.get_dates(interval)}
+    )
+    days = pd.to_datetime(prod_data["DATEPRD"]).values.astype("datetime64[D]")
+    date_bins = np.searchsorted(np.array(edges, dtype="datetime64[D]"), days, "right")
+    well_index = pd.Index(wells).get_indexer(
+        np.asarray(prod_data["WELL_BORE_CODE"]).astype(str)
+    )
 
-        if prod_file_update - epoch_time < 130000:
-            # print(stop_date)
-            stop_date = np.nan
+    # Sort the rows by well and bin (stable), so that the rows for each well
+    # and interval are contiguous
+    n_bins = len(edges) + 1
+    keys = well_index * n_bins + date_bins
+    selected = (well_index >= 0) & (date_bins > 0)
+    order = np.flatnonzero(selected)[np.argsort(keys[selected], kind="stable")]
+    keys = keys[order]
+
+    column_bins = [
+        (edges.index(date1) + 1, edges.index(date2) + 1)
+        for date1, date2 in [common.get_dates(interval) for interval in intervals]
+    ]
+    column_bins.append((edges.index(last_date) + 1, n_bins))
+    column_bins.append((edges.index(first_date) + 1, n_bins))
+
+    limits = np.array(
+        [
+            [well * n_bins + start, well * n_bins + stop]
+            for well in range(len(wells))
+            for start, stop in column_bins
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    lower = np.searchsorted(keys, limits[:, 0], side="left")
+    upper = np.searchsorted(keys, limits[:, 1], side="left")
+
+    interval_volumes = {}
 
-    return start_date, stop_date
+    for volume_code in volume_codes:
+        values = np.nan_to_num(prod_data[volume_code].values.astype(np.float64))
+        values = values[order]
+        volumes = np.array(
+            [values[start:stop].sum() for start, stop in zip(lower, upper)]
+        ).reshape(len(wells), len(columns))
+        interval_volumes[volume_code] = pd.DataFrame(
+            volumes, index=wells, columns=columns
+        )
+
+    return interval_volumes
+
+
+def get_production_dates(
+    production_cube, wells, volume_code, prod_file_update, active_time=87000 * 3
+):
+    """ Return the first and last production dates for each well. The last
+    date is set to NaN for wells that are still producing, i.e. wells with
+    volumes less than active_time seconds before the production file update. """
+    rows = [production_cube.get_well_index(well) for well in wells]
+    start_dates, stop_dates = production_cube.get_production_dates(volume_code)
+
+    start_dates = pd.Series(start_dates[rows])
+    stop_dates = pd.Series(stop_dates[rows])
+
+    epoch_times = (stop_dates - pd.Timestamp("1970-01-01")).dt.total_seconds()
+    stop_dates[prod_file_update - epoch_times < active_time] = pd.NaT
+
+    return (
+        start_dates.dt.strftime("%Y-%m-%d").values,
+        stop_dates.dt.strftime("%Y-%m-%d").values,
+    )
+
+
+def add_production_volumes(drilled_well_info, prod_info_list):
+    """ Add all columns from the production files (see compile_production_data)
+    to the wellbore information, joined on the well name. The columns are
+    prefixed with the name of the production file. Well names without a row in
+    a production file get NaN values. If a well name is repeated in a
+    production file, the first row is used. """
+    well_names = drilled_well_info[["wellbore.well_name"]]
+    added_columns = []
+
+    print("Adding production information ...")
+    for prod_info in prod_info_list:
+        prefix = prod_info.name + "_"
+        volumes = prod_info.dropna(subset=["Well name"]).drop_duplicates(
+            subset=["Well name"], keep="first"
+        )
+        volumes = volumes.add_prefix(prefix)
+
+        merged = well_names.merge(
+            volumes,
+            how="left",
+            left_on="wellbore.well_name",
+            right_on=prefix + "Well name",
+        )
+        merged = merged.drop(columns=["wellbore.well_name"])
+        merged.index = drilled_well_info.index
+        added_columns.append(merged)
+
+    drilled_well_info = drilled_well_info.drop(
+        columns=[
+            column
+            for merged in added_columns
+            for column in merged.columns
+            if column in drilled_well_info.columns
+        ]
+    )
+
+    return pd.concat([drilled_well_info] + added_columns, axis=1)
 
 
 def check_production_wells(sorted_production_wells, well_info, pdm_names_file):
@@ -78,7 +376,7 @@ def main():
     well_info = pd.read_csv(os.path.join(well_directory, wellbore_info_file))
     # print(well_info)
 
-    prod_data = pd.read_csv(production_file)
+    prod_data = read_production_file(production_file)
     prod_file_update = os.path.getmtime(production_file)
 
     print(prod_data)
@@ -95,77 +393,40 @@ def main():
     print(dates_4d)
     # print(len(dates_4d))
 
-    volume_codes = [
-        "BORE_OIL_VOL",
-        "BORE_GAS_VOL",
-        "BORE_WAT_VOL",
-        "BORE_GI_VOL",
-        "BORE_WI_VOL",
-    ]
+    volume_codes = VOLUME_CODES
 
-    for volume_code in volume_codes:
-        pdm_names = []
-        well_names = []
-        start_dates = []
-        stop_dates = []
-        intervals = []
-        volumes = np.zeros((len(sorted_production_wells), len(dates_4d) + 2))
+    intervals = [dates_4d[i] + "-" + dates_4d[i + 1] for i in range(len(dates_4d) - 1)]
+    production_cube = ProductionCube.from_daily(
+        prod_data, volume_codes, sorted_production_wells, all_well_names
+    )
+    interval_volumes = get_interval_volumes(
+        prod_data, sorted_production_wells, intervals, volume_codes
+    )
 
+    for volume_code in volume_codes:
         print(volume_code)
-        volume_df = pd.DataFrame()
+        volumes = interval_volumes[volume_code]
+        all_intervals = volumes.columns[-1]
 
-        index = 0
-        for pdm_well in sorted_production_wells:
-            print(pdm_well)
-            well_prod_data = prod_data[prod_data["WELL_BORE_CODE"] == pdm_well]
-            well_prod_data = well_prod_data[["WELL_BORE_CODE", "DATEPRD", volume_code]]
-            # print(well_prod_data)
-            start_date, stop_date = get_start_stop_dates(
-                well_prod_data, prod_file_update, volume_code
-            )
-
-            pdm_names.append(pdm_well)
-            well_names.append(all_well_names[index])
-            start_dates.append(start_date)
-            stop_dates.append(stop_date)
-
-            for i in range(0, len(dates_4d) - 1):
-                intervals.append(dates_4d[i] + "-" + dates_4d[i + 1])
-
-                volumes[index, i] = well_prod_data.loc[
-                    (well_prod_data["DATEPRD"] >= dates_4d[i])
-                    & (well_prod_data["DATEPRD"] < dates_4d[i + 1]),
-                    volume_code,
-                ].sum()
-                # print(pdm_well, intervals[i], volumes[index, i])
-
-            last_interval = dates_4d[i + 1] + "-now"
-            intervals.append(last_interval)
-            volumes[index, i + 1] = well_prod_data.loc[
-                (well_prod_data["DATEPRD"] >= dates_4d[i + 1]), volume_code,
-            ].sum()
-
-            all_intervals = dates_4d[0] + "-now"
-            intervals.append(all_intervals)
-            volumes[index, i + 2] = well_prod_data.loc[
-                (well_prod_data["DATEPRD"] >= dates_4d[0]), volume_code,
-            ].sum()
-            # print("")
-
-            index = index + 1
-
-        volume_df["PDM well name"] = pdm_names
-        volume_df["Well name"] = well_names
+        start_dates, stop_dates = get_production_dates(
+            production_cube,
+            sorted_production_wells,
+            volume_code,
+            prod_file_update,
+            active_time=130000,
+        )
+
+        volume_df = pd.DataFrame()
+        volume_df["PDM well name"] = sorted_production_wells
+        volume_df["Well name"] = all_well_names
         volume_df["Start date"] = start_dates
         volume_df["Stop date"] = stop_dates
 
         pd.set_option("display.max_columns", None)
         pd.set_option("display.max_rows", None)
 
-        for i in range(0, len(dates_4d) + 1):
-            volume_df[intervals[i]] = volumes[:, i]
-            print(i, intervals[i])
-            print(volume_df["1993-01-01-2005-07-01"])
+        for interval in volumes.columns:
+            volume_df[interval] = volumes[interval].values
 
         volume_df_actual = volume_df[volume_df[all_intervals] > 0]
 
@@ -0,0 +1,524 @@
+""" Production and injection well layers for the 4D intervals, used both by
+create_well_lists (stored in the well layer archive) and by the surface viewers
+(made when an interval is selected, see ProductionLayerCache) """
+
+import os
+import math
+from collections import OrderedDict
+import pandas as pd
+from webviz_4d._datainput import common
+from webviz_4d._datainput import well
+from webviz_4d._datainput.production_data import add_production_volumes
+from webviz_4d.wells.well_trajectories import WellTrajectories
+from webviz_4d.wells.production_cube import ProductionCube, PRODUCTION_CUBE_FILE
+from webviz_4d.wells.volume_columns import VolumeColumns
+from webviz_4d.wells.completion_intervals import get_completion_intervals
+from webviz_4d.wells.well_layer_archive import MAX_INTERVALS
+
+
+OIL_PRODUCTION_FILE = "BORE_OIL_VOL.csv"
+GAS_INJECTION_FILE = "BORE_GI_VOL.csv"
+WATER_INJECTION_FILE = "BORE_WI_VOL.csv"
+
+PRODUCTION_FILES = [OIL_PRODUCTION_FILE, GAS_INJECTION_FILE, WATER_INJECTION_FILE]
+
+PRODUCTION_LAYERS = [
+    ("production", "Producers"),
+    ("production_start", "Producers - started"),
+    ("production_completed", "Producers - completed"),
+    ("injection", "Injectors"),
+    ("injection_start", "Injectors - started"),
+    ("injection_completed", "Injectors - completed"),
+]
+
+ACTIVE_LAYER = ("active", "Active wells")
+
+# Sources of the production and injection layers in the viewers
+WELL_LAYER_SOURCES = ["archive", "production_cube"]
+
+
+def read_production_info(prod_info_dir):
+    """ Return the production files (see compile_production_data) as a list of
+    dataframes named by the file """
+    prod_info_list = []
+
+    for prod_file in PRODUCTION_FILES:
+        prod_info_file = os.path.join(prod_info_dir, prod_file)
+        print("Reading production info from file " + str(prod_info_file))
+        prod_info = pd.read_csv(prod_info_file)
+        prod_info.name = os.path.basename(str(prod_info_file))
+
+        prod_info_list.append(prod_info)
+
+    return prod_info_list
+
+
+def get_last_interval(prod_info_list):
+    """ Return the last incremental interval in the production files, used to
+    select the active wells """
+    return prod_info_list[-1].columns[-1]
+
+
+def check_interval(interval):
+    """ Flip start and end date if needed """
+    dates = [interval[0:10], interval[11:21]]
+
+    if dates[0] > dates[1]:
+        selected_interval = dates[1] + "-" + dates[0]
+    else:
+        selected_interval = interval
+
+    return selected_interval
+
+
+def get_column_list(columns, pdm_column, interval):
+    """ Return a list of incremental intervals given a larger interval, an
+    empty list if the interval can't be made from the incremental intervals """
+    split_string = pdm_column.split(".")
+    selected_csv = split_string[0]
+    column_list = []
+    start_index = None
+    stop_index = None
+    first_date = interval[0:10]
+    last_date = interval[11:21]
+
+    i = 0
+    for column in columns:
+        # print(column, selected_csv in column)
+
+        if selected_csv in column:
+            # print(column[-21:-11], column[-10:])
+            if first_date == column[-21:-11]:
+                start_index = i
+
+            if last_date == column[-10:]:
+                stop_index = i
+
+        i = i + 1
+
+    # print("start_index, stop_index ", start_index, stop_index)
+
+    if start_index is None or stop_index is None:
+        return column_list
+
+    for j in range(start_index, stop_index + 1):
+        column_list.append(columns[j])
+
+    return column_list
+
+
+def get_summed_volume(well_prod_info, column, interval, production_cube=None):
+    """ Return the volume in an interval that is not included in the production
+    files, from the cumulative volumes if available. Without cumulative volumes
+    the volume is 0 if the interval can't be made from the incremental
+    intervals. """
+    if production_cube is not None:
+        well_name = well_prod_info["wellbore.well_name"].values[0]
+        date1, date2 = common.get_dates(interval)
+        volume_code = column.split(".")[0]
+
+        return production_cube.get_volume(well_name, date1, date2, volume_code)
+
+    columns = well_prod_info.columns
+    selected_columns = get_column_list(columns, column, interval)
+    selected_df = well_prod_info[selected_columns].copy()
+
+    return selected_df.sum(axis=1).values[0]
+
+
+def get_volume_columns(well_info):
+    """ Return the index of the interval volumes (see VolumeColumns) for each
+    production file """
+    return {
+        prod_file: VolumeColumns(well_info, prod_file) for prod_file in PRODUCTION_FILES
+    }
+
+
+def add_summed_volumes(well_info, interval, volume_columns=None):
+    """ Add the volumes for an interval that is not included in the production
+    files, summed from the incremental intervals for all wells at once. The
+    volume columns must be made from the same wellbore information. """
+    if volume_columns is None:
+        volume_columns = get_volume_columns(well_info)
+
+    added_columns = {}
+
+    for prod_file, columns in volume_columns.items():
+        column = prod_file + "_" + interval
+
+        if column not in well_info.columns:
+            volumes = columns.get_volumes(interval)
+
+            if volumes is not None:
+                added_columns[column] = volumes
+
+    if added_columns:
+        well_info = well_info.assign(**added_columns)
+
+    return well_info
+
+
+def extract_production_info(well_prod_info, interval, selection, production_cube=None):
+    """ Return well and production information/status for a selected
+    interval for production/injection wells. The properties are the fluid,
+    volume, unit and dates as separate values, see well.get_well_properties """
+    well_type = None
+    fluid = None
+    start_date = None
+    stop_date = None
+    info = None
+    plot = False
+    properties = None
+
+    production_selections = ["production", "production_start", "production_completed", "active"]
+    injection_selections = ["injection", "injection_start", "injection_completed", "active"]
+
+    if selection in production_selections:
+        column = OIL_PRODUCTION_FILE + "_" + interval
+        pd.set_option("display.max_columns", None)
+
+        try:
+            volume = well_prod_info[column].values[0] / 1000
+
+            if math.isnan(volume):
+                volume = None
+
+        except:
+            volume = get_summed_volume(well_prod_info, column, interval, production_cube)
+            volume = volume / 1000
+
+        if volume and volume > 0:
+            well_type = "production"
+            fluid = "oil"
+            start_date = well_prod_info[OIL_PRODUCTION_FILE + "_Start date"].values[0]
+            stop_date = well_prod_info[OIL_PRODUCTION_FILE + "_Stop date"].values[0]
+            properties = well.get_well_properties(
+                fluid, volume, "kSm3", start_date, stop_date
+            )
+
+            if isinstance(stop_date,float):
+                stop_date = "---"
+            else:
+                stop_date = str(stop_date[0:-3])
+
+            #print(start_date, stop_date)
+            info = (
+                fluid
+                + " {:.0f}".format(volume)
+                + " [kSm3] Start: "
+                + str(start_date[0:-3])
+                + " Stop: "
+                + stop_date
+            )
+            plot = True
+
+    elif selection in injection_selections:
+        column = GAS_INJECTION_FILE + "_" + interval
+
+        try:
+            volume_gas = well_prod_info[column].values[0] / 1000000
+
+            if math.isnan(volume_gas):
+                volume_gas = None
+
+        except:
+            volume_gas = get_summed_volume(well_prod_info, column, interval, production_cube)
+            volume_gas = volume_gas / 1000000
+
+        if volume_gas and volume_gas > 0:
+            well_type = "injection"
+            fluid = "gas"
+            start_date = well_prod_info[GAS_INJECTION_FILE + "_Start date"].values[0]
+            stop_date = well_prod_info[GAS_INJECTION_FILE + "_Stop date"].values[0]
+            properties = well.get_well_properties(
+                fluid, volume_gas, "MSm3", start_date, stop_date
+            )
+
+            if isinstance(stop_date,float):
+                stop_date = "---"
+            else:
+                stop_date = str(stop_date[0:-3])
+
+            #print(start_date, stop_date)
+            info = (
+                fluid
+                + " {:.0f}".format(volume_gas)
+                + " [MSm3] Start: "
+                + str(start_date[0:-3])
+                + " Stop: "
+                + stop_date
+            )
+            plot = True
+        column = WATER_INJECTION_FILE + "_" + interval
+
+        try:
+            volume_water = well_prod_info[column].values[0] / 1000
+        except:
+            volume_water = get_summed_volume(well_prod_info, column, interval, production_cube)
+            volume_water = volume_water / 1000
+
+        if volume_water and volume_water > 0:
+            well_type = "injection"
+            fluid = "water"
+            start_date = well_prod_info[WATER_INJECTION_FILE + "_Start date"].values[0]
+            stop_date = well_prod_info[WATER_INJECTION_FILE + "_Stop date"].values[0]
+            properties = well.get_well_properties(
+                fluid, volume_water, "kSm3", start_date, stop_date
+            )
+
+            if isinstance(stop_date,float):
+                stop_date = "---"
+            else:
+                stop_date = str(stop_date[0:-3])
+
+            #print(start_date, stop_date)
+            info = (
+                fluid
+                + " {:.0f}".format(volume_water)
+                + " [kSm3] Start: "
+                + str(start_date[0:-3])
+                + " Stop: "
+                + stop_date
+            )
+            plot = True
+
+    return well_type, fluid, start_date, stop_date, info, plot, properties
+
+
+def get_completed_segments(
+    completions, wellbore_name, trajectories, wellbore, screens=False
+):
+    """ Return the depth limits and positions of the completed parts of a
+    wellbore: the interval from the top of the first to the base of the last
+    screen, or each screen if selected. An empty list if not completed. """
+    if screens:
+        segments = completions.get_segments(wellbore_name)
+    else:
+        segments = [completions.get_interval(wellbore_name)]
+
+    segments = [(top_md, base_md) for top_md, base_md in segments if top_md and base_md]
+
+    if not segments:
+        return []
+
+    positions = trajectories.clip(
+        [wellbore] * len(segments),
+        [top_md for top_md, _base_md in segments],
+        [base_md for _top_md, base_md in segments],
+    )
+
+    return list(zip(segments, positions))
+
+
+def make_interval_well_layers(
+    interval_4d,
+    wells_df,
+    metadata_df,
+    completion_df,
+    colors=None,
+    production_cube=None,
+    selections=PRODUCTION_LAYERS,
+    screens=False,
+    volume_columns=None,
+    trajectories=None,
+    verbose=False,
+):
+    """ Make the production and injection layers for a 4D interval in one pass
+    over the wellbores. Returns one layer for each (selection, label) in
+    selections, in the same order, including the active wells (ACTIVE_LAYER).
+    If screens is True, the completed layers show each screen as a separate
+    polyline. The well trajectories (WellTrajectories) are made from wells_df
+    if not given. The selected wells are printed if verbose is True (data
+    preparation). """
+    interval_start = interval_4d[11:]
+    interval_end = interval_4d[0:10]
+    interval = check_interval(interval_4d)
+    completions = get_completion_intervals(completion_df)
+
+    if production_cube is None:
+        metadata_df = add_summed_volumes(metadata_df, interval, volume_columns)
+
+    layers = {
+        selection: {"name": label, "checked": False, "base_layer": False, "data": []}
+        for selection, label in selections
+    }
+
+    if trajectories is None:
+        trajectories = WellTrajectories(wells_df)
+
+    # Metadata for each wellbore, and the reservoir sections of all wellbores
+    # clipped in one go
+    well_metadata_dfs = dict(
+        tuple(metadata_df.groupby("wellbore.rms_name", sort=False))
+    )
+    wellbores = [
+        wellbore for wellbore in trajectories.wellbores if wellbore in well_metadata_dfs
+    ]
+    md_starts = [
+        min(well_metadata_dfs[wellbore]["wellbore.pick_md"].values)
+        for wellbore in wellbores
+    ]
+    all_positions = trajectories.clip(wellbores, md_starts)
+
+    for wellbore, md_start, positions in zip(wellbores, md_starts, all_positions):
+        well_metadata = well_metadata_dfs[wellbore]
+
+        wellbore_name = well_metadata["wellbore.name"].values[0]
+        short_name = well_metadata["wellbore.short_name"].values[0]
+        well_type = well_metadata["wellbore.type"].values[0]
+
+        completed = None
+        production_info = {}
+
+        for selection in layers:
+            segments = [((md_start, None), positions)]
+
+            if well_type == "planned":
+                selected_type, fluid, start_date, info, plot, properties = (
+                    well_type,
+                    "",
+                    None,
+                    "",
+                    True,
+                    None,
+                )
+            else:
+                # The info is the same for all production (injection) layers,
+                # and the active wells are the producers without a stop date
+                if selection.startswith("injection"):
+                    production_type = "injection"
+                else:
+                    production_type = "production"
+
+                if production_type not in production_info:
+                    production_info[production_type] = extract_production_info(
+                        well_metadata, interval, production_type, production_cube
+                    )
+
+                (
+                    selected_type,
+                    fluid,
+                    start_date,
+                    stop_date,
+                    info,
+                    plot,
+                    properties,
+                ) = production_info[production_type]
+
+                if selection == "active":
+                    plot = stop_date == "---"
+
+                if start_date and selection.endswith("_start"):
+                    plot = interval_start <= start_date < interval_end
+
+                if plot and selection.endswith("_completed"):
+                    if completed is None:
+                        completed = get_completed_segments(
+                            completions, wellbore_name, trajectories, wellbore, screens
+                        )
+
+                    segments = completed
+                    plot = len(segments) > 0
+
+            if not plot:
+                continue
+
+            if verbose:
+                print(short_name, info, selection)
+
+            for md_limits, selection_positions in segments:
+                polyline_data = well.get_well_polyline(
+                    wellbore,
+                    short_name,
+                    None,
+                    selected_type,
+                    fluid,
+                    info,
+                    md_limits[0],
+                    md_limits[1],
+                    selection,
+                    colors,
+                    positions=selection_positions,
+                    properties=properties,
+                )
+
+                if polyline_data:
+                    layers[selection]["data"].append(polyline_data)
+
+    return [layers[selection] for selection, _label in selections]
+
+
+class ProductionLayerCache(object):
+    """ Least recently used cache of the production and injection layers for
+    the 4D intervals, made from the production files and the cumulative
+    volumes in a production data folder when an interval is selected. Used
+    by the viewers instead of WellLayerCache if the well layers are made from
+    the production data, and returns the same layers. """
+
+    def __init__(
+        self,
+        prod_info_dir,
+        wells_df,
+        well_info,
+        completion_df,
+        colors,
+        screens=False,
+        max_intervals=MAX_INTERVALS,
+    ):
+        prod_info_list = read_production_info(prod_info_dir)
+        cube_file = os.path.join(prod_info_dir, PRODUCTION_CUBE_FILE)
+
+        if os.path.isfile(cube_file):
+            print("Reading cumulative volumes from file", cube_file)
+            self.production_cube = ProductionCube.load(cube_file)
+        else:
+            print(
+                "WARNING: Cumulative volumes not found in",
+                cube_file,
+                "- only intervals made from the production files have volumes",
+            )
+            self.production_cube = None
+
+        self.wells_df = wells_df
+        self.well_info = add_production_volumes(well_info, prod_info_list)
+        self.completions = get_completion_intervals(completion_df)
+        self.colors = colors
+        self.screens = screens
+        self.max_intervals = max_intervals
+        self.volume_columns = get_volume_columns(self.well_info)
+        self.trajectories = WellTrajectories(wells_df)
+
+        self._layers = OrderedDict()
+        self.active_layer = self.make_layers(
+            get_last_interval(prod_info_list), [ACTIVE_LAYER]
+        )[0]
+
+    def make_layers(self, interval, selections=PRODUCTION_LAYERS):
+        """ Return the selected layers for an interval """
+        return make_interval_well_layers(
+            interval,
+            self.wells_df,
+            self.well_info,
+            self.completions,
+            self.colors,
+            self.production_cube,
+            selections=selections,
+            screens=self.screens,
+            volume_columns=self.volume_columns,
+            trajectories=self.trajectories,
+        )
+
+    def get_layers(self, interval):
+        """ Return the layers for an interval, followed by the active wells """
+        layers = self._layers.get(interval)
+
+        if layers is not None:
+            self._layers.move_to_end(interval)
+        else:
+            layers = self.make_layers(interval)
+            self._layers[interval] = layers
+
+            if len(self._layers) > self.max_intervals:
+                self._layers.popitem(last=False)
+
+        return layers + [self.active_layer]
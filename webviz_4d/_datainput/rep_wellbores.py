@@ -0,0 +1,255 @@
+""" Extract trajectories and metadata for all drilled wellbores in a field from
+the REP database, see data_preparation/extract_wellbores_from_rep.py. The data
+for each wellbore is fetched by a pool of worker threads, while the wellbores
+are written (RMS ascii well and metadata) one at a time in the original order.
+Any client with the methods of RepClient can be used to access the wellbores.
+"""
+
+import os
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from pandas import json_normalize
+import yaml
+from webviz_4d._datainput.well import get_short_wellname
+
+
+EQUIPMENT_NAMES = ["Screen", "Perforations"]
+MISSING_VALUE = -999
+
+# Number of worker threads fetching wellbores from REP
+WORKERS = 8
+
+
+class RepClient(object):
+    """ Client for the wellbores in a field in the REP database """
+
+    def __init__(self, field):
+        from reper import wrappers
+
+        self.field = field
+        self._wrappers = wrappers
+
+    def get_wellbore_names(self):
+        """ Return the names of all wellbores in the field """
+        return self._wrappers.Field(self.field).get_wellbore_names()
+
+    def get_wellbore(self, wellbore):
+        """ Return a handle used to fetch the data for a wellbore """
+        return self._wrappers.Wellbore(self.field, wellbore)
+
+
+def get_rms_name(wellbore_name):
+    """ Return the name used for a wellbore in the RMS well files """
+    return wellbore_name.replace("/", "_").replace("NO ", "").replace(" ", "_")
+
+
+def resample_trajectory(trajectory_df, md_inc=0):
+    """ Return the wellbore trajectory (MD, TVDMSL, EASTING, NORTHING),
+    resampled with a regular depth (MD) increment if md_inc > 0 """
+    md_wellbore = trajectory_df["md"]
+    tvd_wellbore = trajectory_df["tvd"]
+    easting = trajectory_df["easting"]
+    northing = trajectory_df["northing"]
+    total_depth = md_wellbore.values[-1]
+
+    if md_inc > 0:
+        start_md = md_wellbore[0]
+        end_md = math.floor(total_depth)
+
+        md_reg = np.arange(start_md, end_md, md_inc)
+
+        tvd_reg = np.interp(md_reg, md_wellbore, tvd_wellbore)
+        easting_reg = np.interp(md_reg, md_wellbore, easting)
+        northing_reg = np.interp(md_reg, md_wellbore, northing)
+
+        md_reg = np.append(md_reg, md_wellbore.values[-1])
+        tvd_reg = np.append(tvd_reg, tvd_wellbore.values[-1])
+        easting_reg = np.append(easting_reg, easting.values[-1])
+        northing_reg = np.append(northing_reg, northing.values[-1])
+    else:
+        md_reg = md_wellbore
+        tvd_reg = tvd_wellbore
+        easting_reg = easting
+        northing_reg = northing
+
+    well_df = pd.DataFrame()
+    well_df["MD"] = md_reg
+    well_df["TVDMSL"] = tvd_reg
+    well_df["EASTING"] = easting_reg
+    well_df["NORTHING"] = northing_reg
+
+    return well_df
+
+
+def get_completions(wellbore, completion_list, rkb):
+    """ Return the screens and perforations in a wellbore, with MD shifted by
+    the depth reference elevation (as the trajectory) """
+    completions = []
+
+    for item in completion_list or []:
+        for equipment in EQUIPMENT_NAMES:
+            if equipment in item["symbolName"]:
+                completion = {
+                    "wellbore": wellbore,
+                    "equipment": item["symbolName"],
+                    "mdTop": item["mdTop"] + rkb,
+                    "mdBottom": item["mdBottom"] + rkb,
+                }
+                completions.append({"interval": completion})
+
+    return completions
+
+
+def fetch_wellbore(client, wellbore, md_inc=0):
+    """ Fetch the trajectory and metadata for a wellbore, using one wellbore
+    handle for all requests """
+    handle = client.get_wellbore(wellbore)
+
+    trajectory_df = json_normalize(handle.get_wellbore_pos_log())
+    rkb = handle.get_depth_reference_elevation()
+    trajectory_df["md"] = trajectory_df["md"].values + rkb
+
+    return {
+        "wellbore": wellbore,
+        "well_df": resample_trajectory(trajectory_df, md_inc),
+        "rkb": rkb,
+        "end_date": handle.get_wellbore_end_date() or "",
+        "wellbore_type": handle.get_wellbore_type() or "",
+        "slot_name": handle.get_well_identifier() or "",
+        "fluids": handle.get_wellbore_fluids() or "",
+        "completions": get_completions(
+            wellbore, handle.get_wellbore_completion_data(), rkb
+        ),
+    }
+
+
+def write_rms_wellbore(wellbore_name, wellbore_df, rkb, export_dir):
+    """ Write the wellbore trajectory and log values to a file (RMS Aascii format).
+    The columns are MD, TVDMSL, EASTING, NORTHING followed by the logs. """
+    name = get_rms_name(wellbore_name)
+    columns = wellbore_df.columns
+
+    # Rows of x, y, z, MD and the logs, with missing values replaced
+    values = wellbore_df.to_numpy(dtype=np.float64)
+    values = values[:, [2, 3, 1, 0] + list(range(4, len(columns)))]
+    values[np.isnan(values)] = MISSING_VALUE
+
+    if not os.path.exists(export_dir):
+        os.mkdir(export_dir)
+
+    outfile = os.path.join(export_dir, name + ".w")
+
+    with open(outfile, "w") as file_object:
+        file_object.write("1.0\n")
+        file_object.write("LOCATION\n")
+        file_object.write(
+            "%-15s %10.2f %12.2f %5.2f\n" % (name, values[0, 0], values[0, 1], rkb)
+        )
+        file_object.write(str(len(columns) - 3) + "\n")
+        file_object.write(columns[0] + "   UNK    lin\n")  # MD column (first "log")
+
+        for column in columns[4:]:
+            file_object.write("%10s" % (column + "   UNK    lin\n"))
+
+        # All rows are formatted in one operation
+        row_format = "%12.2f" * values.shape[1] + "\n"
+        file_object.write((row_format * len(values)) % tuple(values.ravel().tolist()))
+
+    # print("Well data exported to ", outfile)
+
+    return outfile
+
+
+def write_metadata(
+    export_dir,
+    wellbore_name,
+    short_name,
+    slot_name,
+    field,
+    wellbore_type,
+    rkb,
+    end_date,
+    fluids,
+    intervals,
+):
+    """ Write the extracted metadata for the wellbore to a yaml file """
+    if not os.path.isdir(export_dir):
+        os.mkdir(export_dir)
+
+    rms_name = get_rms_name(wellbore_name)
+
+    if end_date:
+        end_date = end_date[0:10]
+
+    outfile = os.path.join(export_dir, "." + rms_name + ".w.yaml")
+
+    file_object = open(outfile, "w")
+    file_object.write("- wellbore:\n")
+    file_object.write("   name: " + wellbore_name + "\n")
+    file_object.write("   rms_name: " + rms_name + "\n")
+    file_object.write("   short_name: " + short_name + "\n")
+    file_object.write("   slot_name: " + slot_name + "\n")
+    file_object.write("   field: " + field + "\n")
+    file_object.write("   type: " + wellbore_type + "\n")
+    file_object.write("   rkb: " + str(rkb) + "\n")
+    file_object.write("   drilling_end_date: " + end_date + "\n")
+    file_object.write("   fluids: " + fluids + "\n")
+    file_object.close()
+
+    if intervals:
+        with open(outfile, "a") as yamlfile:
+            yaml.dump(intervals, yamlfile, default_flow_style=False)
+
+
+def write_wellbore(export_dir, field, wellbore_data):
+    """ Write a fetched wellbore (see fetch_wellbore) to an RMS ascii well file
+    and its metadata to a yaml file """
+    wellbore = wellbore_data["wellbore"]
+    write_rms_wellbore(
+        wellbore, wellbore_data["well_df"], wellbore_data["rkb"], export_dir
+    )
+    short_name = get_short_wellname(get_rms_name(wellbore))
+
+    write_metadata(
+        export_dir,
+        wellbore,
+        short_name,
+        wellbore_data["slot_name"],
+        field,
+        wellbore_data["wellbore_type"],
+        wellbore_data["rkb"],
+        wellbore_data["end_date"],
+        wellbore_data["fluids"],
+        wellbore_data["completions"],
+    )
+
+
+def extract_wellbores(client, field, export_dir, md_inc=0, workers=WORKERS):
+    """ Fetch all wellbores in a field with a pool of worker threads and write
+    them to the export folder. At most two wellbores per worker are fetched
+    ahead of the writer, which writes them in sorted order. Returns the
+    number of wellbores written. """
+    wellbores = sorted(client.get_wellbore_names())
+    pending = deque()
+    written = []
+
+    def write_next():
+        wellbore_data = pending.popleft().result()
+        written.append(wellbore_data["wellbore"])
+        print(len(written), wellbore_data["wellbore"])
+        write_wellbore(export_dir, field, wellbore_data)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for wellbore in wellbores:
+            pending.append(executor.submit(fetch_wellbore, client, wellbore, md_inc))
+
+            if len(pending) >= 2 * workers:
+                write_next()
+
+        while pending:
+            write_next()
+
+    return len(written)
@@ -21,4 +21,40 @@ def get_surface_arr(surface, unrotate=True, flip=True):
     return [x, y, z]
 
 
+def sample_surface(surface, x, y):
+    """ Return surface values at the given positions, using bilinear
+    interpolation. Positions outside the surface or next to undefined
+    nodes get NaN. """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    values = ma.filled(ma.asarray(surface.values, dtype=np.float64), np.nan)
 
+    # Position in grid coordinates (node indices)
+    angle = math.radians(surface.rotation)
+    dx = x - surface.xori
+    dy = y - surface.yori
+    col = (dx * math.cos(angle) + dy * math.sin(angle)) / surface.xinc
+    row = (-dx * math.sin(angle) + dy * math.cos(angle)) / (
+        surface.yinc * surface.yflip
+    )
+
+    ncol, nrow = values.shape
+    inside = (col >= 0) & (col <= ncol - 1) & (row >= 0) & (row <= nrow - 1)
+    col = np.where(inside, col, 0)
+    row = np.where(inside, row, 0)
+
+    i = np.clip(np.floor(col).astype(int), 0, max(ncol - 2, 0))
+    j = np.clip(np.floor(row).astype(int), 0, max(nrow - 2, 0))
+    i_1 = np.minimum(i + 1, ncol - 1)
+    j_1 = np.minimum(j + 1, nrow - 1)
+    fi = col - i
+    fj = row - j
+
+    sampled = (
+        values[i, j] * (1 - fi) * (1 - fj)
+        + values[i_1, j] * fi * (1 - fj)
+        + values[i, j_1] * (1 - fi) * fj
+        + values[i_1, j_1] * fi * fj
+    )
+
+    return np.where(inside, sampled, np.nan)
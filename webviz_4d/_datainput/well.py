@@ -1,15 +1,27 @@
 import io
+import re
 import glob
+import datetime
 import xtgeo
 import json
 import pandas as pd
 import yaml
 import os
 import statistics
+from concurrent.futures import ProcessPoolExecutor
 from pandas import json_normalize
 from webviz_config.common_cache import CACHE
 from pathlib import Path
 from webviz_4d._datainput.common import find_files
+from webviz_4d._datainput.surface import sample_surface
+from webviz_4d.wells.well_trajectories import WellTrajectories
+
+WELL_METADATA_CACHE = ".well_metadata_cache.json"
+PARALLEL_YAML_FILES = 200
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Fluid, volume and unit in the tooltip, e.g. "(oil 125 [kSm3] Start: ..."
+TOOLTIP_VOLUME_PATTERN = re.compile(r"\((\w+) ([-+\d.]+) \[([^\]]*)\]")
 
 
 def load_well(well_path):
@@ -56,23 +68,119 @@ def load_all_wells(wellfolder, wellsuffix):
     return (all_wells_df, metadata, depths_df)
     
 
-def extract_well_metadata(directory):
-    """ Compile all metadata for wells in a given folder (+ sub-folders) """
+def read_yaml_file(yaml_file):
+    """ Return the content of a metadata (yaml) file """
+    with open(yaml_file, "r") as stream:
+        return yaml.load(stream, Loader=YAML_LOADER)
+
+
+def read_yaml_files(yaml_files, parallel=False, workers=None):
+    """ Return the content of a list of metadata (yaml) files. The files are
+    read in a process pool if parallel is set and there are many files
+    (data preparation only, not from within the webviz application) """
+    if not parallel or len(yaml_files) < PARALLEL_YAML_FILES:
+        return [read_yaml_file(yaml_file) for yaml_file in yaml_files]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(read_yaml_file, yaml_files, chunksize=50))
+
+
+def encode_metadata_value(value):
+    """ Return a metadata value that is not supported by json (dates from the
+    yaml files) as a json object, other values as strings """
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+
+    return str(value)
+
+
+def decode_metadata_value(item):
+    """ Return the dates encoded by encode_metadata_value, other json objects
+    are returned as they are """
+    if len(item) == 1 and "__datetime__" in item:
+        return datetime.datetime.fromisoformat(item["__datetime__"])
+
+    if len(item) == 1 and "__date__" in item:
+        return datetime.date.fromisoformat(item["__date__"])
+
+    return item
+
+
+def read_metadata_cache(cache_file):
+    """ Return the cached content of the metadata files in a folder """
+    try:
+        with open(cache_file, "r") as stream:
+            return json.load(stream, object_hook=decode_metadata_value)["files"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def write_metadata_cache(cache_file, cache):
+    """ Store the content of the metadata files in a folder, together with
+    the modification time of each file. The dates are stored as json objects,
+    so that they are read back as dates. """
+    temporary_file = cache_file + ".tmp"
+
+    try:
+        with open(temporary_file, "w") as stream:
+            json.dump({"files": cache}, stream, default=encode_metadata_value)
+
+        os.replace(temporary_file, cache_file)
+    except OSError:
+        print("WARNING: Metadata cache could not be stored to", cache_file)
+
+
+def extract_well_metadata(
+    directory, pattern="/**/.*.yaml", parallel=False, update_cache=False
+):
+    """ Compile all metadata for wells in a given folder (+ sub-folders).
+    The content of the yaml files is read from the cache in the folder, only
+    new or modified files are read. The cache is only stored if update_cache
+    is set (data preparation scripts). """
     well_info = []
     depth_info = []
 
-    yaml_files = glob.glob(str(directory) + "/**/.*.yaml", recursive=True)
+    yaml_files = sorted(glob.glob(str(directory) + pattern, recursive=True))
+
+    cache_file = os.path.join(directory, WELL_METADATA_CACHE)
+    cache = read_metadata_cache(cache_file)
+    cached_files = set(cache)
+
+    # Remove files that no longer exist
+    cache = {
+        name: item
+        for name, item in cache.items()
+        if os.path.isfile(os.path.join(directory, name))
+    }
 
-    for yaml_file in yaml_files:
-        with open(yaml_file, "r") as stream:
-            data = yaml.safe_load(stream)
-            # print('data',data)
+    names = [os.path.relpath(yaml_file, directory) for yaml_file in yaml_files]
+    mtimes = [os.path.getmtime(yaml_file) for yaml_file in yaml_files]
+    modified = [
+        i
+        for i, (name, mtime) in enumerate(zip(names, mtimes))
+        if name not in cache or cache[name]["mtime"] != mtime
+    ]
 
-            well_info.append(data[0])
+    all_data = read_yaml_files([yaml_files[i] for i in modified], parallel)
 
-            if len(data) > 1 and data[1]:
-                for item in data[1:]:
-                    depth_info.append(item)
+    for i, data in zip(modified, all_data):
+        cache[names[i]] = {"mtime": mtimes[i], "data": data}
+
+    if update_cache and (modified or set(cache) != cached_files):
+        write_metadata_cache(cache_file, cache)
+
+    for name in names:
+        data = cache[name]["data"]
+        # print('data',data)
+
+        well_info.append(data[0])
+
+        if len(data) > 1 and data[1]:
+            for item in data[1:]:
+                depth_info.append(item)
 
     well_info_df = json_normalize(well_info)
 
@@ -84,7 +192,8 @@ def extract_well_metadata(directory):
     return well_info_df, depth_df
 
 
-def load_all_wells(wellfolder, wellsuffix):
+def load_wellbore_trajectories(wellfolder, wellsuffix):
+    """ Return a dataframe with the trajectories of all wells in a folder """
     all_wells_list = []
 
     wellfiles = (
@@ -95,7 +204,7 @@ def load_all_wells(wellfolder, wellsuffix):
 
     if not wellfiles:
         print("ERROR: No well files found in folder", wellfolder)
-        return None, None, None
+        return None
 
     print("Loading wells from " + str(wellfolder) + " ...")
     for wellfile in wellfiles:
@@ -120,9 +229,18 @@ def load_all_wells(wellfolder, wellsuffix):
             well.dataframe["WELLBORE_NAME"] = well.name
             all_wells_list.append(well.dataframe)
 
-    all_wells_df = pd.concat(all_wells_list)
+    return pd.concat(all_wells_list)
 
-    well_info, interval_df = extract_well_metadata(wellfolder)
+
+def load_all_wells(wellfolder, wellsuffix, parallel=False, update_cache=False):
+    all_wells_df = load_wellbore_trajectories(wellfolder, wellsuffix)
+
+    if all_wells_df is None:
+        return None, None, None
+
+    well_info, interval_df = extract_well_metadata(
+        wellfolder, parallel=parallel, update_cache=update_cache
+    )
 
     try:
         metadata_file = os.path.join(wellfolder, "wellbore_info.csv")
@@ -134,6 +252,38 @@ def load_all_wells(wellfolder, wellsuffix):
     return (all_wells_df, metadata, interval_df)
 
 
+def get_short_wellname(wellname):
+    """ Return the well name on a short form, where the block name and spaces
+    are removed. Same as xtgeo.Well.shortwellname, e.g.
+    '31/2-G-5 AH' -> 'G-5AH', '6472_11-F-23_AH_T2' -> 'F-23AHT2' """
+    newname = []
+    first1 = False
+    first2 = False
+
+    for letter in wellname:
+        if first1 and first2:
+            newname.append(letter)
+            continue
+        if letter in ("_", "/"):
+            first1 = True
+            continue
+        if first1 and letter == "-":
+            first2 = True
+            continue
+
+    short_name = "".join(newname)
+
+    return short_name.replace("_", "").replace(" ", "")
+
+
+def get_surface_picks(trajectories, surface):
+    """ Return the MD of the first intersection between the trajectories
+    (WellTrajectories) and a surface, for all wellbores """
+    depths = sample_surface(surface, trajectories.xy[:, 0], trajectories.xy[:, 1])
+
+    return trajectories.get_crossings(depths)
+
+
 def get_position_data(well_dataframe, md_start, md_end):
     """ Return x- and y-values for a well between given depths """
     
@@ -147,12 +297,45 @@ def get_position_data(well_dataframe, md_start, md_end):
     return positions
 
 
+def get_well_properties(fluid, volume, unit, start_date=None, stop_date=None):
+    """ Return the production/injection properties for a well, i.e. fluid,
+    volume and unit, and the start and stop dates (YYYY-MM-DD). The stop date
+    is None for wells that are still active. """
+
+    def get_date(date):
+        if date is None or pd.isna(date) or str(date) in ["---", "NaT"]:
+            return None
+
+        return str(date)[0:10]
+
+    return {
+        "fluid": fluid,
+        "volume": float(volume),
+        "unit": unit,
+        "start_date": get_date(start_date),
+        "stop_date": get_date(stop_date),
+    }
+
+
 def get_well_polyline(
-    wellbore, short_name, well_dataframe, well_type, fluid, info, md_start, md_end, selection, colors
-): 
-    """ Extract polyline data - well trajectory, color and tooltip """
+    wellbore,
+    short_name,
+    well_dataframe,
+    well_type,
+    fluid,
+    info,
+    md_start,
+    md_end,
+    selection,
+    colors,
+    positions=None,
+    properties=None,
+):
+    """ Extract polyline data - well trajectory, color and tooltip. Precomputed
+    positions (see WellTrajectories.clip) are used if given. The properties
+    (see get_well_properties) are added to the polyline data. """
     color = "black"
-    
+
     if colors:
         color = colors["default"]
 
@@ -169,14 +352,12 @@ def get_well_polyline(
             and not pd.isna(fluid)
             and md_start > 0
         ):
-            positions = get_position_data(well_dataframe, md_start, md_end)
             status = True
 
         elif selection == "planned" and well_type == selection:
             if colors:
                 color = colors[selection]
 
-            positions = get_position_data(well_dataframe, md_start, md_end)
             status = True
 
         elif well_type == selection and not pd.isna(fluid) and md_start > 0:
@@ -188,93 +369,137 @@ def get_well_polyline(
             if colors:
                 color = colors[fluid + "_" + selection]
 
-            positions = get_position_data(well_dataframe, md_start, md_end)
             status = True
 
         elif pd.isna(fluid):
-            positions = get_position_data(well_dataframe, md_start, md_end)
             status = True
             
         elif selection == "active": 
-            positions =get_position_data(well_dataframe, md_start, md_end)
             status = True  
             
         elif selection == "production_start": 
-            positions =get_position_data(well_dataframe, md_start, md_end)
             color = colors[fluid + "_production"]
             status = True  
             
         elif selection == "production_completed": 
-            positions =get_position_data(well_dataframe, md_start, md_end)
             color = colors[fluid + "_production"]
             status = True      
             
         elif selection == "injection_start": 
-            positions =get_position_data(well_dataframe, md_start, md_end)
             color = colors[fluid + "_injection"]
             status = True  
             
         elif selection == "injection_completed": 
-            positions =get_position_data(well_dataframe, md_start, md_end)
             color = colors[fluid + "_injection"]
             status = True              
 
     else:
-        positions = get_position_data(well_dataframe, md_start, md_end)
         status = True
 
     if status:
-        return {
+        if positions is None:
+            positions = get_position_data(well_dataframe, md_start, md_end)
+
+        polyline_data = {
             "type": "polyline",
             "color": color,
             "positions": positions,
             "tooltip": tooltip,
+            "wellbore": wellbore,
         }
 
+        if properties:
+            polyline_data.update(properties)
+
+        return polyline_data
+
+
+def select_wells(well_layer, wellbores):
+    """ Return a copy of a well layer with only the selected wellbores. Well
+    layer items without wellbore information are kept. """
+    wellbores = set(wellbores)
+    data = [
+        item
+        for item in well_layer["data"]
+        if "wellbore" not in item or item["wellbore"] in wellbores
+    ]
+
+    return dict(well_layer, data=data)
+
+
+def get_well_volume(item):
+    """ Return fluid, volume and unit for a well in a well layer. Well layers
+    made by older versions only have these values in the tooltip. """
+    if "volume" in item:
+        return item.get("fluid"), item["volume"], item.get("unit")
+
+    match = TOOLTIP_VOLUME_PATTERN.search(item.get("tooltip", ""))
+
+    if match is None:
+        return None, None, None
+
+    return match.group(1), float(match.group(2)), match.group(3)
+
+
+def get_layer_fluid(well_layer):
+    """ Return the most common fluid of the wells in a well layer, None if
+    there are no wells with a volume """
+    fluids = [get_well_volume(item)[0] for item in well_layer["data"]]
+    fluids = [fluid for fluid in fluids if fluid is not None]
+
+    if not fluids:
+        return None
+
+    return max(sorted(set(fluids)), key=fluids.count)
+
+
+def filter_well_layer(well_layer, limit=None, top=None, fluid=None):
+    """ Return a copy of a well layer with only the wells with a volume above
+    a limit and/or the top wells by volume, optionally for one fluid. The mean
+    volume is used as limit if neither a limit nor top is given. The layer is
+    named from the layer and the fluid, e.g. "Producers - filtered (oil
+    200kSm3)". """
+    wells = []
+
+    for item in well_layer["data"]:
+        item_fluid, volume, unit = get_well_volume(item)
+
+        if volume is not None and (fluid is None or item_fluid == fluid):
+            wells.append((volume, unit, item))
+
+    if limit is None and top is None and wells:
+        limit = statistics.mean([volume for volume, _unit, _item in wells])
+
+    unit = wells[-1][1] if wells else ""
+
+    if limit is not None:
+        wells = [well for well in wells if well[0] > limit]
+
+    if top is not None:
+        # Keep the order of the wells in the layer
+        largest = sorted(range(len(wells)), key=lambda i: -wells[i][0])[:top]
+        wells = [wells[i] for i in sorted(largest)]
+
+    filters = []
+
+    if limit is not None:
+        filters.append(str(int(limit)) + unit)
+
+    if top is not None:
+        filters.append("top " + str(top))
+
+    label = ", ".join(filters)
+
+    if fluid is not None:
+        label = fluid + " " + label
+
+    return dict(
+        well_layer,
+        name=well_layer["name"] + " - filtered (" + label + ")",
+        checked=False,
+        data=[item for _volume, _unit, item in wells],
+    )
 
-def filter_well_layer(well_layer, limit):
-    filtered_data = []
-    data = well_layer["data"]
-    volumes = []
-    
-    for item in data:
-        tooltip = item["tooltip"]
-        content = tooltip.split(":")
-        wellbore_name = content[0]
-        index = content[1].find("oil")
-        volume_info = content[1][index:].split()
-        fluid = volume_info[0]
-        volume = float(volume_info[1])
-        unit = volume_info[2]
-        volumes.append(volume)
-    
-    limit = statistics.mean(volumes)
-    print(limit)
-        
-    for item in data:
-        tooltip = item["tooltip"]
-        content = tooltip.split(":")
-        wellbore_name = content[0]
-        index = content[1].find("oil")
-        volume_info = content[1][index:].split()
-        fluid = volume_info[0]
-        volume = float(volume_info[1])
-        unit = volume_info[2]   
-         
-        if volume > limit:
-            color = item["color"]
-            positions = item["positions"]
-            polyline_data = {
-                "type": "polyline",
-                "color": color,
-                "positions": positions,
-                "tooltip": tooltip,
-            }
-            filtered_data.append(polyline_data)
-      
-    label = "Producers - filtered (" + str(int(limit)) + unit + ")"
-                   
-    return {"name": label, "checked": False, "base_layer": False, "data": filtered_data}
 
 @CACHE.memoize(timeout=CACHE.TIMEOUT)
 def make_new_well_layer(
@@ -290,12 +515,10 @@ def make_new_well_layer(
     if colors is None:
         color = "black"
 
-    wellbores = wells_df["WELLBORE_NAME"].values
-    list_set = set(wellbores)
-    # convert the set to the list
-    unique_wellbores = list(list_set)
+    trajectories = WellTrajectories(wells_df)
+    selected_wells = []
 
-    for wellbore in unique_wellbores:
+    for wellbore in trajectories.wellbores:
         # print('wellbore ',wellbore)
         md_start = 0
         md_end = None
@@ -303,9 +526,7 @@ def make_new_well_layer(
         info = ""
         short_name = wellbore
         well_type = ""
-        polyline_data = None
-
-        well_dataframe = wells_df[wells_df["WELLBORE_NAME"] == wellbore]
+        plot = False
 
         if not metadata_df is None:
             well_metadata = metadata_df[metadata_df["wellbore.rms_name"] == wellbore]
@@ -334,7 +555,6 @@ def make_new_well_layer(
         if info:
             info = info[0]
 
-        plot = False
         if (
             selection
             and well_type == selection
@@ -350,49 +570,40 @@ def make_new_well_layer(
                 elif interval_stop >= start_date and interval_stop <= stop_date:
                     plot = True
 
-                if plot:
-
-                    polyline_data = get_well_polyline(
-                        wellbore,
-                        short_name,
-                        well_dataframe,
-                        well_type,
-                        fluid,
-                        info,
-                        md_start,
-                        md_end,
-                        selection,
-                        colors,
-                    )
         elif selection == "reservoir_section" or selection == "planned":
-            polyline_data = get_well_polyline(
-                wellbore,
-                short_name,
-                well_dataframe,
-                well_type,
-                fluid,
-                info,
-                md_start,
-                md_end,
-                selection,
-                colors,
-            )
+            plot = True
         elif not selection:
-            polyline_data = get_well_polyline(
-                wellbore,
-                short_name,
-                well_dataframe,
-                well_type,
-                fluid,
-                info,
-                md_start,
-                md_end,
-                selection,
-                colors,
+            plot = True
+
+        if plot:
+            selected_wells.append(
+                (wellbore, short_name, well_type, fluid, info, md_start, md_end)
             )
 
+    # Clip all the selected trajectories in one go
+    all_positions = trajectories.clip(
+        [item[0] for item in selected_wells],
+        [item[5] for item in selected_wells],
+        [item[6] for item in selected_wells],
+    )
+
+    for item, positions in zip(selected_wells, all_positions):
+        wellbore, short_name, well_type, fluid, info, md_start, md_end = item
+        polyline_data = get_well_polyline(
+            wellbore,
+            short_name,
+            None,
+            well_type,
+            fluid,
+            info,
+            md_start,
+            md_end,
+            selection,
+            colors,
+            positions=positions,
+        )
+
         if polyline_data:
             data.append(polyline_data)
 
     return {"name": label, "checked": False, "base_layer": False, "data": data}
-    
@@ -10,173 +10,14 @@ from datetime import datetime, timedelta
 import calendar
 import yaml
 import glob
-from pandas.io.json import json_normalize
+from webviz_4d._datainput.well import extract_well_metadata
+from webviz_4d._datainput.common import get_wellname, sort_wellbores
 
 
 def extract_wellbore_metadata(directory):
-    well_info = []
-    interval_info = []
-
     print(str(directory))
-    yaml_files = glob.glob(str(directory) + "/**/.*.yaml", recursive=True)
-
-    for yaml_file in yaml_files:
-        with open(yaml_file, "r") as stream:
-            data = yaml.safe_load(stream)
-            # print('data',data)
-
-            well_info.append(data[0])
-
-            if len(data) > 1 and data[1]:
-                for item in data[1:]:
-                    interval_info.append(item)
-
-    well_info_df = json_normalize(well_info)
-
-    interval_df = json_normalize(interval_info)
-
-    if not interval_df.empty:
-        interval_df.sort_values(
-            by=["interval.wellbore", "interval.mdTop"], inplace=True
-        )
-
-    return well_info_df, interval_df
-
-
-def get_well_metadata(metadata_df, wellbore_name, item):
-    value = None
-
-    well_metadata = metadata_df[metadata_df["wellbore.name"] == wellbore_name]
-    value = well_metadata[item].values[0]
-
-    return value
-
-
-def get_wellbores(metadata_df, well_name):
-    wellbores = metadata_df[metadata_df["wellbore.slot_name"] == well_name]
-    wellbore_names = wellbores["wellbore.name"].values
-
-    return sorted(wellbore_names)
-
-
-def get_mother_wells(metadata_df, well_name):
-    mother_wells = [well_name]
-
-    wellbores = get_wellbores(metadata_df, well_name)
-    # print('wellbores ',wellbores)
-
-    mother_well = well_name
-    for wellbore in wellbores:
-        if not wellbore == mother_well and not wellbore[-2] == "T":
-            if wellbore[-1] in "123456789":
-                l = len(wellbore) - 1
-            else:
-                l = len(wellbore)
-            name = wellbore[:l]
-
-            if not name == mother_well:
-                mother_well = name
-                mother_wells.append(mother_well)
 
-    list_set = set(mother_wells)
-    unique_list = sorted(list(list_set))
-
-    return unique_list
-
-
-def get_branches(well_info_df, mother_well):
-    branches = []
-    i = mother_well.rfind(" ")
-
-    possible_branches = well_info_df[
-        well_info_df["wellbore.name"].str.contains(mother_well, regex=False)
-    ]["wellbore.name"].values
-
-    for branch in possible_branches:
-        ib = branch.rfind(" ")
-        l = len(branch)
-
-        if (
-            branch == mother_well or branch[: l - 1] == mother_well + " T"
-        ):  # Sidetracked mother wells
-            branches.append(branch)
-
-        elif mother_well[:i] == branch[:ib] and not i == 2:  # Avoid ii == i
-            # print(i,mother_well[:i],branch[:ib])
-            branches.append(branch)
-
-    return sorted(branches)
-
-
-def get_wellname(metadata_df, wellbore):
-    # print(wellbore)
-    well_name = get_well_metadata(well_info_df, wellbore, "wellbore.slot_name")
-    # print('wellbore,well_name ',wellbore,well_name)
-    mother_wells = get_mother_wells(metadata_df, well_name)
-    # print(mother_wells)
-
-    for mother_well in mother_wells:
-        branches = get_branches(well_info_df, mother_well)
-        # print(branches)
-
-        for branch in branches:
-            if branch == wellbore:
-                return mother_well
-
-    return None
-
-
-def sort_wellbores(well_names):
-    block_names = []
-    slot_names = []
-    slot_numbers = []
-    branch_names = []
-
-    for well_name in well_names:
-        # print(well_name)
-        slot_number = ""
-        branch_name = ""
-
-        index1 = well_name.find("-")
-        index2 = well_name[index1 + 1 :].find("-") + index1 + 1
-
-        if index2 > index1 + 1:
-            slot_name = well_name[index1 + 1 : index2]
-            ind = well_name[3:].find(" ")
-
-            if ind > 0:
-                slot_number = int(well_name[index2 + 1 : ind + 4])
-            else:
-                slot_number = int(well_name[index2 + 1 :])
-        else:
-            ind = well_name[3:].find(" ")
-            if ind > 0:
-                slot_name = well_name[index1 + 1 : ind + 4]
-            else:
-                slot_name = well_name[index1 + 1 :]
-
-        if ind > 0:
-            branch_name = well_name[ind + 3 :]
-
-        block_name = well_name[:index1]
-
-        block_names.append(block_name)
-        slot_names.append(slot_name)
-        slot_numbers.append(slot_number)
-        branch_names.append(branch_name)
-
-    df = pd.DataFrame(
-        zip(well_names, block_names, slot_names, slot_numbers, branch_names),
-        columns=["Well_name", "Block_name", "Slot_name", "Slot_number", "Branch_name"],
-    )
-
-    # pd.set_option('display.max_rows', None)
-    df.sort_values(
-        by=["Block_name", "Slot_name", "Slot_number", "Branch_name"], inplace=True
-    )
-    sorted_wellbores = df["Well_name"].values
-
-    return sorted_wellbores
+    return extract_well_metadata(directory)
 
 
 def get_dates(well_df, txt):
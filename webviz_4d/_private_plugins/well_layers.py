@@ -0,0 +1,309 @@
+import os
+from uuid import uuid4
+
+import pandas as pd
+from dash.dependencies import Input, Output
+import dash_html_components as html
+import dash_core_components as dcc
+
+from webviz_4d._datainput.well import (
+    load_all_wells,
+    make_new_well_layer,
+    select_wells,
+    filter_well_layer,
+    get_layer_fluid,
+)
+from webviz_4d._datainput.production_layers import (
+    ProductionLayerCache,
+    PRODUCTION_LAYERS,
+    WELL_LAYER_SOURCES,
+)
+from webviz_4d.wells.well_spatial_index import WellSpatialIndex
+from webviz_4d.wells.well_layer_archive import WellLayerCache
+
+
+# Insert the well base layers between the surface layer and the interval layers,
+# keeping only the wells found within the surface extent
+MERGE_WELL_BASE_LAYERS = """
+function(surface_layers, visible_wells, well_base_layers) {
+    if (!surface_layers || surface_layers.length === 0) {
+        return [];
+    }
+    if (!well_base_layers) {
+        return surface_layers;
+    }
+    var base_layers = well_base_layers;
+    if (visible_wells) {
+        var visible = new Set(visible_wells);
+        base_layers = well_base_layers.map(function(layer) {
+            return Object.assign({}, layer, {
+                data: layer.data.filter(function(item) {
+                    return !item.wellbore || visible.has(item.wellbore);
+                }),
+            });
+        });
+    }
+    return surface_layers.slice(0, 1).concat(base_layers, surface_layers.slice(1));
+}
+"""
+
+
+class WellLayers:
+    # pylint: disable=too-many-instance-attributes
+    """### Well layers
+
+Loads the wells in a well folder and adds them to the maps in the surface viewers.
+The static base layers (drilled wells, reservoir sections and planned wells) are
+sent once per session through a dcc.Store and merged with the surface layer and the
+production/injection layers of each map on the client side. Only the wells within
+the surface extent are shown. The producers can be filtered by volume (kSm3) and/or
+the number of wells with the largest volumes, shown as an extra layer.
+
+* `map_ids`: The ids of the LayeredMap components
+* `wellfolder`: Folder with the well files and the well layer archive
+* `interval`: The 4D interval used for the base layers
+* `colors`: Well colors (see get_well_colors)
+* `production_data`: Folder with the production files and the production cube
+* `well_layers`: Source of the production and injection layers, "archive" (stored
+  by create_well_lists) or "production_cube" (made when an interval is selected)
+* `screens`: Show each screen in the completed layers (production_cube only)
+"""
+
+    def __init__(
+        self,
+        app,
+        map_ids,
+        wellfolder,
+        interval,
+        colors,
+        wellsuffix=".w",
+        production_data=None,
+        well_layers="archive",
+        screens=False,
+    ):
+        self.map_ids = map_ids
+        self.colors = colors
+        self.base_layers = []
+        self.well_index = None
+        self.well_layer_cache = None
+        self.drilled_well_df = None
+        self.drilled_well_info = None
+        self.interval_df = None
+        self.set_ids()
+
+        if wellfolder and os.path.isdir(wellfolder):
+            self.load_wells(wellfolder, wellsuffix, interval)
+            self.load_interval_layers(wellfolder, production_data, well_layers, screens)
+
+        self.set_callbacks(app)
+
+    def set_ids(self):
+        uuid = str(uuid4())
+        self.base_layers_id = f"{uuid}-well-base-layers"
+        self.filter_limit_id = f"{uuid}-filter-limit"
+        self.filter_top_id = f"{uuid}-filter-top"
+        self.map_layers_ids = [
+            f"{uuid}-map-layers{i + 1}" for i in range(len(self.map_ids))
+        ]
+        self.visible_wells_ids = [
+            f"{uuid}-visible-wells{i + 1}" for i in range(len(self.map_ids))
+        ]
+
+    def load_wells(self, wellfolder, wellsuffix, interval):
+        """ Load the drilled and planned wells, make the base layers and index
+        the trajectories """
+        (
+            self.drilled_well_df,
+            self.drilled_well_info,
+            self.interval_df,
+        ) = load_all_wells(wellfolder, wellsuffix)
+        well_dfs = [self.drilled_well_df]
+
+        if self.drilled_well_df is not None:
+            self.base_layers.append(
+                make_new_well_layer(
+                    interval,
+                    self.drilled_well_df,
+                    self.drilled_well_info,
+                )
+            )
+
+            self.base_layers.append(
+                make_new_well_layer(
+                    interval,
+                    self.drilled_well_df,
+                    self.drilled_well_info,
+                    self.colors,
+                    selection="reservoir_section",
+                    label="Reservoir sections",
+                )
+            )
+
+        planned_wells_dir = [f.path for f in os.scandir(wellfolder) if f.is_dir()]
+
+        for folder in planned_wells_dir:
+            planned_well_df, planned_well_info, dummy_df = load_all_wells(
+                folder, wellsuffix
+            )
+
+            if planned_well_df is not None:
+                well_dfs.append(planned_well_df)
+                self.base_layers.append(
+                    make_new_well_layer(
+                        interval,
+                        planned_well_df,
+                        planned_well_info,
+                        self.colors,
+                        selection="planned",
+                        label=os.path.basename(folder),
+                    )
+                )
+
+        well_dfs = [well_df for well_df in well_dfs if well_df is not None]
+
+        if well_dfs:
+            self.well_index = WellSpatialIndex(pd.concat(well_dfs))
+
+    def load_interval_layers(self, wellfolder, production_data, well_layers, screens):
+        """ Production and injection layers, read from the archive stored by
+        create_well_lists or made from the production data when an interval is
+        selected """
+        if well_layers not in WELL_LAYER_SOURCES:
+            print("ERROR: Unknown well_layers", well_layers, "- using archive")
+            well_layers = "archive"
+
+        if well_layers == "production_cube":
+            if production_data and self.drilled_well_df is not None:
+                self.well_layer_cache = ProductionLayerCache(
+                    production_data,
+                    self.drilled_well_df,
+                    self.drilled_well_info,
+                    self.interval_df,
+                    self.colors,
+                    screens=screens,
+                )
+            else:
+                print("ERROR: well_layers production_cube needs production_data")
+        else:
+            self.well_layer_cache = WellLayerCache(
+                wellfolder, [selection for selection, _label in PRODUCTION_LAYERS]
+            )
+
+    @property
+    def layout(self):
+        """ The stores with the base layers, and the surface/interval layers and
+        visible wells for each map """
+        stores = [dcc.Store(id=self.base_layers_id, data=self.base_layers)]
+
+        for map_layers_id, visible_wells_id in zip(
+            self.map_layers_ids, self.visible_wells_ids
+        ):
+            stores.append(dcc.Store(id=map_layers_id))
+            stores.append(dcc.Store(id=visible_wells_id))
+
+        return stores
+
+    @property
+    def filter_layout(self):
+        """ Volume limit and number of wells for the filtered producers """
+        return html.Div(
+            children=[
+                html.Label(
+                    "Producers filter (volume limit [kSm3] / top wells)",
+                    style={"fontSize": 15, "fontWeight": "bold"},
+                ),
+                html.Div(
+                    style={"display": "grid", "gridTemplateColumns": "1fr 1fr"},
+                    children=[
+                        dcc.Input(
+                            id=self.filter_limit_id,
+                            type="number",
+                            min=0,
+                            placeholder="Volume limit",
+                            debounce=True,
+                        ),
+                        dcc.Input(
+                            id=self.filter_top_id,
+                            type="number",
+                            min=1,
+                            step=1,
+                            placeholder="Top wells",
+                            debounce=True,
+                        ),
+                    ],
+                ),
+            ]
+        )
+
+    @property
+    def filter_inputs(self):
+        """ The filter values, used as inputs in the map callbacks """
+        return [
+            Input(self.filter_limit_id, "value"),
+            Input(self.filter_top_id, "value"),
+        ]
+
+    @staticmethod
+    def add_filtered_layer(well_layers, limit=None, top=None):
+        """ Insert the filtered producers after the producers layer, if a volume
+        limit or a number of wells is selected. The wells are filtered by the
+        volumes of the main fluid in the layer. """
+        if limit is None and not top:
+            return well_layers
+
+        producers = PRODUCTION_LAYERS[0][1]
+        filtered_layers = []
+
+        for well_layer in well_layers:
+            filtered_layers.append(well_layer)
+
+            if well_layer["name"] == producers:
+                filtered_layers.append(
+                    filter_well_layer(
+                        well_layer,
+                        limit=limit,
+                        top=int(top) if top else None,
+                        fluid=get_layer_fluid(well_layer),
+                    )
+                )
+
+        return filtered_layers
+
+    def get_map_layers(self, surface_layers, interval, limit=None, top=None):
+        """ Return the surface layers followed by the production and injection
+        layers for an interval (and the filtered producers), and the wellbores
+        within the surface extent """
+        # The static well base layers are sent once through the base layers
+        # store and merged in on the client side
+        if self.base_layers and self.well_layer_cache is not None:
+            surface_layers = surface_layers + self.add_filtered_layer(
+                self.well_layer_cache.get_layers(interval), limit, top
+            )
+
+        # Only keep the wells within the surface extent
+        visible_wells = None
+
+        if self.well_index is not None:
+            bounds = surface_layers[0]["data"][0]["bounds"]
+            visible_wells = self.well_index.query(bounds)
+            surface_layers = surface_layers[:1] + [
+                select_wells(well_layer, visible_wells)
+                for well_layer in surface_layers[1:]
+            ]
+
+        return surface_layers, visible_wells
+
+    def set_callbacks(self, app):
+        # Merge the surface and interval layers with the static well base layers
+        for map_id, map_layers_id, visible_wells_id in zip(
+            self.map_ids, self.map_layers_ids, self.visible_wells_ids
+        ):
+            app.clientside_callback(
+                MERGE_WELL_BASE_LAYERS,
+                Output(map_id, "layers"),
+                [
+                    Input(map_layers_id, "data"),
+                    Input(visible_wells_id, "data"),
+                    Input(self.base_layers_id, "data"),
+                ],
+            )
@@ -7,8 +7,6 @@ import numpy as np
 import pandas as pd
 import xtgeo
 import dash
-import pickle
-import glob
 
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
@@ -30,11 +28,8 @@ from webviz_4d._datainput.common import (
     get_update_dates,
     get_plot_label,
 )
-from webviz_4d._datainput.well import (
-    load_all_wells,
-    make_new_well_layer,
-)
 from webviz_4d._private_plugins.surface_selector import SurfaceSelector
+from webviz_4d._private_plugins.well_layers import WellLayers
 from webviz_4d._datainput._colormaps import load_custom_colormaps
 
 from webviz_4d._datainput._metadata import (
@@ -64,6 +59,8 @@ class SurfaceViewer4D(WebvizPluginABC):
         settings: Path = None,
         delimiter: str = "--",
         surface_metadata: str = "surface_metadata.csv",
+        well_layers: str = "archive",
+        screens: bool = False,
     ):
 
         super().__init__()
@@ -78,7 +75,7 @@ class SurfaceViewer4D(WebvizPluginABC):
         self.config = None
         self.attribute_settings = {}
         self.surface_metadata = None
-        self.well_base_layers = None
+        self.wells = None
 
         #print("default_interval", default_interval)
 
@@ -175,7 +172,6 @@ class SurfaceViewer4D(WebvizPluginABC):
         self.selected_realizations = [None, None, None]
         self.wellsuffix = ".w"
 
-        self.well_base_layers = []
         self.colors = get_well_colors(self.config)
 
         if wellfolder and os.path.isdir(wellfolder):
@@ -183,55 +179,21 @@ class SurfaceViewer4D(WebvizPluginABC):
             update_dates = get_update_dates(wellfolder)
             self.well_update = update_dates["well_update_date"]
             self.production_update = update_dates["production_last_date"]
-
-            (
-                self.drilled_well_df,
-                self.drilled_well_info,
-                self.interval_df,
-            ) = load_all_wells(wellfolder, self.wellsuffix)
-
-            if self.drilled_well_df is not None:
-
-                self.well_base_layers.append(
-                    make_new_well_layer(
-                        self.selected_intervals[0],
-                        self.drilled_well_df,
-                        self.drilled_well_info,
-                    )
-                )
-
-                self.well_base_layers.append(
-                    make_new_well_layer(
-                        self.selected_intervals[0],
-                        self.drilled_well_df,
-                        self.drilled_well_info,
-                        self.colors,
-                        selection="reservoir_section",
-                        label="Reservoir sections",
-                    )
-                )
-
-            planned_wells_dir = [f.path for f in os.scandir(wellfolder) if f.is_dir()]
-
-            for folder in planned_wells_dir:
-                planned_well_df, planned_well_info, dummy_df = load_all_wells(
-                    folder, self.wellsuffix
-                )
-
-                if planned_well_df is not None:
-                    self.well_base_layers.append(
-                        make_new_well_layer(
-                            self.selected_intervals[0],
-                            planned_well_df,
-                            planned_well_info,
-                            self.colors,
-                            selection="planned",
-                            label=os.path.basename(folder),
-                        )
-                    )
         elif wellfolder and not os.path.isdir(wellfolder):
             print("ERROR: Folder", wellfolder, "doesn't exist. No wells loaded")
 
+        self.wells = WellLayers(
+            app,
+            [self.uuid("map"), self.uuid("map2"), self.uuid("map3")],
+            wellfolder,
+            self.selected_intervals[0],
+            self.colors,
+            wellsuffix=self.wellsuffix,
+            production_data=production_data,
+            well_layers=well_layers,
+            screens=screens,
+        )
+
         self.selector = SurfaceSelector(
             app, self.metadata, self.intervals, self.map_defaults[0]
         )
@@ -392,6 +354,7 @@ class SurfaceViewer4D(WebvizPluginABC):
                 html.H3("WebViz-4D " + self.fmu_info),
                 html.H6("Well data update: " + self.well_update),
                 html.H6("Production data update: " + self.production_update),
+                self.wells.filter_layout,
                 wcc.FlexBox(
                     style={"fontSize": "1rem"},
                     children=[
@@ -560,6 +523,7 @@ class SurfaceViewer4D(WebvizPluginABC):
                             id=self.uuid("attribute-settings"),
                             data=json.dumps(self.attribute_settings),
                         ),
+                        *self.wells.layout,
                     ],
                 ),
             ],
@@ -606,7 +570,16 @@ class SurfaceViewer4D(WebvizPluginABC):
 
         return heading, sim_info, label
 
-    def make_map(self, data, ensemble, real, attribute_settings, map_idx):
+    def make_map(
+        self,
+        data,
+        ensemble,
+        real,
+        attribute_settings,
+        map_idx,
+        filter_limit=None,
+        filter_top=None,
+    ):
         # print(data, ensemble, real, attribute_settings, map_idx)
         start = timer()
         data = json.loads(data)
@@ -665,81 +638,12 @@ class SurfaceViewer4D(WebvizPluginABC):
             # print(f"make surface layer {timer()-start}")
             self.selected_intervals[map_idx] = data["date"]
 
-            if self.well_base_layers:
-                for well_layer in self.well_base_layers:
-                    # print(well_layer["name"])
-                    surface_layers.append(well_layer)
-
-                try:
-                    interval_file = os.path.join(
-                        self.wellfolder,
-                        "production_well_layer_"
-                        + self.selected_intervals[map_idx]
-                        + ".pkl",
-                    )
-                    interval_layer = pickle.load(open(interval_file, "rb"))
-                    surface_layers.append(interval_layer)
-                    
-                    #filtered_well_layer = filter_well_layer(interval_layer,84)
-                    #surface_layers.append(filtered_well_layer)
-                    
-                    prod_start_file = os.path.join(
-                        self.wellfolder,
-                        "production_start_well_layer_"
-                        + self.selected_intervals[map_idx]
-                        + ".pkl",
-                    )
-                    prod_start_layer = pickle.load(open(prod_start_file, "rb"))
-                    surface_layers.append(prod_start_layer)
-                    
-                    prod_completed_file = os.path.join(
-                        self.wellfolder,
-                        "production_completed_well_layer_"
-                        + self.selected_intervals[map_idx]
-                        + ".pkl",
-                    )
-                    prod_completed_layer = pickle.load(open(prod_completed_file, "rb"))
-                    surface_layers.append(prod_completed_layer)
-
-                    interval_file = os.path.join(
-                        self.wellfolder,
-                        "injection_well_layer_"
-                        + self.selected_intervals[map_idx]
-                        + ".pkl",
-                    )
-                    interval_layer = pickle.load(open(interval_file, "rb"))
-                    surface_layers.append(interval_layer)
-                    
-                    inject_start_file = os.path.join(
-                        self.wellfolder,
-                        "injection_start_well_layer_"
-                        + self.selected_intervals[map_idx]
-                        + ".pkl",
-                    )
-                    inject_start_layer = pickle.load(open(inject_start_file, "rb"))
-                    surface_layers.append(inject_start_layer)
-                    
-                    inject_completed_file = os.path.join(
-                        self.wellfolder,
-                        "injection_completed_well_layer_"
-                        + self.selected_intervals[map_idx]
-                        + ".pkl",
-                    )
-                    inject_completed_layer = pickle.load(open(inject_completed_file, "rb"))
-                    surface_layers.append(inject_completed_layer)
-                    
-                    search_txt = os.path.join(
-                        self.wellfolder,
-                        "active_well_layer_*")   
-                    search = glob.glob(search_txt)  
-                    active_file = search[0]   
-                    active_layer = pickle.load(open(active_file, "rb"))
-                    surface_layers.append(active_layer)
-                except Exception as e:
-                    if hasattr(e, 'message'):
-                        print(e.message)
-                    else:
-                        print(e)
+            surface_layers, visible_wells = self.wells.get_map_layers(
+                surface_layers,
+                self.selected_intervals[map_idx],
+                filter_limit,
+                filter_top,
+            )
 
             self.selected_names[map_idx] = data["name"]
             self.selected_attributes[map_idx] = data["attr"]
@@ -752,12 +656,14 @@ class SurfaceViewer4D(WebvizPluginABC):
             heading = "Selected map doesn't exist"
             sim_info = "-"
             surface_layers = []
+            visible_wells = None
             label = "-"
 
         return (
             heading,
             sim_info,
             surface_layers,
+            visible_wells,
             label,
         )
 
@@ -767,7 +673,8 @@ class SurfaceViewer4D(WebvizPluginABC):
             [
                 Output(self.uuid("heading1"), "children"),
                 Output(self.uuid("sim_info1"), "children"),
-                Output(self.uuid("map"), "layers"),
+                Output(self.wells.map_layers_ids[0], "data"),
+                Output(self.wells.visible_wells_ids[0], "data"),
                 Output(self.uuid("interval-label1"), "children"),
             ],
             [
@@ -775,21 +682,31 @@ class SurfaceViewer4D(WebvizPluginABC):
                 Input(self.uuid("ensemble"), "value"),
                 Input(self.uuid("realization"), "value"),
                 Input(self.uuid("attribute-settings"), "data"),
-            ],
+            ]
+            + self.wells.filter_inputs,
         )
         # pylint: disable=too-many-arguments, too-many-locals
         def _set_base_layer(
-            data, ensemble, real, attribute_settings,
+            data, ensemble, real, attribute_settings, filter_limit, filter_top,
         ):
 
-            return self.make_map(data, ensemble, real, attribute_settings, 0)
+            return self.make_map(
+                data,
+                ensemble,
+                real,
+                attribute_settings,
+                0,
+                filter_limit=filter_limit,
+                filter_top=filter_top,
+            )
 
         # Second map
         @app.callback(
             [
                 Output(self.uuid("heading2"), "children"),
                 Output(self.uuid("sim_info2"), "children"),
-                Output(self.uuid("map2"), "layers"),
+                Output(self.wells.map_layers_ids[1], "data"),
+                Output(self.wells.visible_wells_ids[1], "data"),
                 Output(self.uuid("interval-label2"), "children"),
             ],
             [
@@ -797,21 +714,31 @@ class SurfaceViewer4D(WebvizPluginABC):
                 Input(self.uuid("ensemble2"), "value"),
                 Input(self.uuid("realization2"), "value"),
                 Input(self.uuid("attribute-settings"), "data"),
-            ],
+            ]
+            + self.wells.filter_inputs,
         )
         # pylint: disable=too-many-arguments, too-many-locals
         def _set_base_layer(
-            data, ensemble, real, attribute_settings,
+            data, ensemble, real, attribute_settings, filter_limit, filter_top,
         ):
 
-            return self.make_map(data, ensemble, real, attribute_settings, 1)
+            return self.make_map(
+                data,
+                ensemble,
+                real,
+                attribute_settings,
+                1,
+                filter_limit=filter_limit,
+                filter_top=filter_top,
+            )
 
         # Third map
         @app.callback(
             [
                 Output(self.uuid("heading3"), "children"),
                 Output(self.uuid("sim_info3"), "children"),
-                Output(self.uuid("map3"), "layers"),
+                Output(self.wells.map_layers_ids[2], "data"),
+                Output(self.wells.visible_wells_ids[2], "data"),
                 Output(self.uuid("interval-label3"), "children"),
             ],
             [
@@ -819,14 +746,23 @@ class SurfaceViewer4D(WebvizPluginABC):
                 Input(self.uuid("ensemble3"), "value"),
                 Input(self.uuid("realization3"), "value"),
                 Input(self.uuid("attribute-settings"), "data"),
-            ],
+            ]
+            + self.wells.filter_inputs,
         )
         # pylint: disable=too-many-arguments, too-many-locals
         def _set_base_layer(
-            data, ensemble, real, attribute_settings,
+            data, ensemble, real, attribute_settings, filter_limit, filter_top,
         ):
             # print("data3", data)
-            return self.make_map(data, ensemble, real, attribute_settings, 2)
+            return self.make_map(
+                data,
+                ensemble,
+                real,
+                attribute_settings,
+                2,
+                filter_limit=filter_limit,
+                filter_top=filter_top,
+            )
 
         def _update_from_btn(_n_prev, _n_next, current_value, options):
             """Updates dropdown value if previous/next btn is clicked"""
@@ -0,0 +1,92 @@
+""" Local stand-in for the REP database with synthetic wellbores, used to test
+and benchmark the REP extraction (see rep_wellbores) without access to REP """
+
+import math
+import time
+import threading
+import numpy as np
+
+
+class FakeRepClient(object):
+    """ Local stand-in for the REP database with synthetic wellbores. Each
+    request waits for the given latency (seconds), to emulate the round trip
+    to the REP server, and the number of requests is counted. """
+
+    def __init__(self, field, n_wellbores=10, n_points=100, latency=0.0):
+        self.field = field
+        self.n_points = n_points
+        self.latency = latency
+        self.requests = 0
+        self.wellbores = [
+            "NO 25/11-G-" + str(i + 1) + (" H" if i % 3 == 0 else "")
+            for i in range(n_wellbores)
+        ]
+        self._lock = threading.Lock()
+
+    def request(self, value):
+        """ Return a value after waiting for the latency """
+        with self._lock:
+            self.requests = self.requests + 1
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        return value
+
+    def get_wellbore_names(self):
+        """ Return the names of all wellbores in the field """
+        return self.request(list(self.wellbores))
+
+    def get_wellbore(self, wellbore):
+        """ Return a handle used to fetch the data for a wellbore """
+        return self.request(FakeWellbore(self, self.wellbores.index(wellbore)))
+
+
+class FakeWellbore(object):
+    """ Synthetic wellbore with the getters used from reper.wrappers.Wellbore """
+
+    def __init__(self, client, number):
+        self.client = client
+        self.number = number
+
+    def get_wellbore_pos_log(self):
+        md = np.linspace(0.0, 3000.0, self.client.n_points)
+        angle = self.number * 0.5
+
+        return self.client.request(
+            [
+                {
+                    "md": value,
+                    "tvd": value * 0.8,
+                    "easting": 456000.0 + value * 0.5 * math.cos(angle),
+                    "northing": 6785000.0 + value * 0.5 * math.sin(angle),
+                }
+                for value in md
+            ]
+        )
+
+    def get_depth_reference_elevation(self):
+        return self.client.request(30.0 + self.number % 5)
+
+    def get_wellbore_end_date(self):
+        return self.client.request("20{:02d}-05-18T00:00:00".format(self.number % 20))
+
+    def get_wellbore_type(self):
+        return self.client.request(
+            "injection" if self.number % 4 == 3 else "production"
+        )
+
+    def get_well_identifier(self):
+        return self.client.request(self.client.wellbores[self.number])
+
+    def get_wellbore_fluids(self):
+        return self.client.request("water" if self.number % 4 == 3 else "oil")
+
+    def get_wellbore_completion_data(self):
+        return self.client.request(
+            [
+                {"symbolName": "Screen", "mdTop": 2000.0, "mdBottom": 2400.0},
+                {"symbolName": "Casing", "mdTop": 0.0, "mdBottom": 1900.0},
+                {"symbolName": "Screen", "mdTop": 2500.0, "mdBottom": 2900.0},
+            ]
+        )
@@ -0,0 +1,60 @@
+from webviz_4d._datainput.well import (
+    filter_well_layer,
+    get_layer_fluid,
+    get_well_properties,
+)
+
+
+def make_item(name, volume, structured=True):
+    item = {
+        "type": "polyline",
+        "color": "green",
+        "positions": [[0.0, 0.0], [1.0, 1.0]],
+        "tooltip": name
+        + " : production (oil {:.0f} [kSm3] Start: 2019-01 Stop: ---)".format(volume),
+        "wellbore": name,
+    }
+
+    if structured:
+        item.update(get_well_properties("oil", volume, "kSm3", "2019-01-01", "---"))
+
+    return item
+
+
+def test_filter_well_layer():
+    well_layer = {
+        "name": "Producers",
+        "checked": False,
+        "base_layer": False,
+        "data": [make_item("A-1", 100), make_item("A-2", 300), make_item("A-3", 200)],
+    }
+
+    assert well_layer["data"][0]["stop_date"] is None
+    filtered = filter_well_layer(well_layer)
+    assert filtered["name"] == "Producers - filtered (200kSm3)"
+    assert [item["wellbore"] for item in filtered["data"]] == ["A-2"]
+
+    filtered = filter_well_layer(well_layer, limit=150, top=1)
+    assert filtered["name"] == "Producers - filtered (150kSm3, top 1)"
+    assert [item["wellbore"] for item in filtered["data"]] == ["A-2"]
+
+    filtered = filter_well_layer(well_layer, top=2, fluid="oil")
+    assert filtered["name"] == "Producers - filtered (oil top 2)"
+    assert [item["wellbore"] for item in filtered["data"]] == ["A-2", "A-3"]
+
+    injectors = dict(well_layer, name="Injectors")
+    filtered = filter_well_layer(injectors, limit=250, fluid=get_layer_fluid(injectors))
+    assert filtered["name"] == "Injectors - filtered (oil 250kSm3)"
+
+
+def test_filter_legacy_well_layer():
+    well_layer = {
+        "name": "Producers",
+        "data": [make_item("A-1", 100, False), make_item("A-2", 300, False)],
+    }
+
+    filtered = filter_well_layer(well_layer, limit=150)
+    assert [item["wellbore"] for item in filtered["data"]] == ["A-2"]
+    assert filter_well_layer(well_layer, fluid="gas")["data"] == []
+    assert get_layer_fluid(well_layer) == "oil"
+    assert get_layer_fluid(dict(well_layer, data=[])) is None
@@ -0,0 +1,92 @@
+import sqlite3
+import pandas as pd
+from webviz_4d._datainput import omnia_pdm, production_data
+
+
+PDM_DATA = pd.DataFrame(
+    {
+        "npd_field_name": ["GRANE", "GRANE", "GRANE", "OTHER"],
+        "WELL_BORE_CODE": ["A", "A", "B", "C"],
+        "DATEPRD": [
+            "2020-01-01 00:00:00",
+            "2020-01-02 00:00:00",
+            "2020-01-02 00:00:00",
+            "2020-01-01 00:00:00",
+        ],
+        "BORE_OIL_VOL": [1.0, 2.0, None, 4.0],
+        "BORE_GAS_VOL": [1.0, 2.0, None, 4.0],
+        "BORE_WAT_VOL": [1.0, 2.0, None, 4.0],
+        "BORE_GI_VOL": [None, None, 3.0, None],
+        "BORE_WI_VOL": [None, None, 3.0, None],
+    }
+)
+
+
+def test_extract_production_data(tmp_path):
+    database_file = str(tmp_path / "pdm.db")
+
+    with sqlite3.connect(database_file) as connection:
+        PDM_DATA.to_sql("DAILY_PROD_W", connection, index=False)
+
+    connection = omnia_pdm.sqlite_connection(database_file)
+    prod_data = omnia_pdm.extract_production_data(
+        connection, "Grane", str(tmp_path), chunksize=2
+    )
+    connection.close()
+
+    assert prod_data["WELL_BORE_CODE"].tolist() == ["A", "A", "B"]
+    assert prod_data["BORE_GI_VOL"].fillna(0).tolist() == [0.0, 0.0, 3.0]
+
+    production_file = str(tmp_path / omnia_pdm.PRODUCTION_FILE)
+    assert len(pd.read_csv(production_file)) == 3
+
+    loaded = production_data.load_production_data(production_file)
+    pd.testing.assert_frame_equal(loaded, prod_data, check_categorical=False)
+
+
+def test_extract_production_data_from_date(tmp_path):
+    database_file = str(tmp_path / "pdm.db")
+
+    with sqlite3.connect(database_file) as connection:
+        PDM_DATA.to_sql("DAILY_PROD_W", connection, index=False)
+
+    connection = omnia_pdm.sqlite_connection(database_file)
+    omnia_pdm.extract_production_data(connection, "Grane", str(tmp_path))
+
+    # The new rows follow the column order of the existing production file
+    production_file = str(tmp_path / omnia_pdm.PRODUCTION_FILE)
+    production = pd.read_csv(production_file)
+    production[production.columns[::-1]].to_csv(production_file, index=False)
+
+    # An update of the last day and a new day
+    new_data = pd.DataFrame(
+        {
+            "npd_field_name": ["GRANE"],
+            "WELL_BORE_CODE": ["A"],
+            "DATEPRD": ["2020-01-03 00:00:00"],
+            "BORE_OIL_VOL": [6.0],
+        }
+    )
+    connection.execute(
+        "update DAILY_PROD_W set BORE_OIL_VOL = 5.0 where DATEPRD = "
+        "'2020-01-02 00:00:00' and WELL_BORE_CODE = 'A'"
+    )
+    new_data.to_sql("DAILY_PROD_W", connection, index=False, if_exists="append")
+    connection.commit()
+
+    prod_data = omnia_pdm.extract_production_data(
+        connection, "Grane", str(tmp_path), start_date="2020-01-02", chunksize=1
+    )
+    connection.close()
+
+    assert prod_data["WELL_BORE_CODE"].tolist() == ["A", "A", "B", "A"]
+    assert prod_data["BORE_OIL_VOL"].fillna(0).tolist() == [1.0, 5.0, 0.0, 6.0]
+
+    # The earlier rows are kept in the production file, and the rows
+    # already in the file are not repeated
+    production = pd.read_csv(production_file)
+    assert len(production) == 4
+    assert production["BORE_OIL_VOL"].tolist()[-1] == 6.0
+
+    loaded = production_data.load_production_data(production_file)
+    pd.testing.assert_frame_equal(loaded, prod_data, check_categorical=False)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from webviz_4d._datainput import production_layers
+
+
+INTERVALS = ["2020-01-01-2020-02-01", "2020-02-01-2020-03-01"]
+
+WELLS_DF = pd.DataFrame(
+    {
+        "X_UTME": np.tile([0.0, 10.0, 20.0, 30.0], 2),
+        "Y_UTMN": np.repeat([0.0, 100.0], 4),
+        "Z_TVDSS": np.tile([0.0, 1000.0, 2000.0, 3000.0], 2),
+        "MD": np.tile([0.0, 1000.0, 2000.0, 3000.0], 2),
+        "WELLBORE_NAME": np.repeat(["A-1", "A-2"], 4),
+    }
+)
+
+WELL_INFO = pd.DataFrame(
+    {
+        "wellbore.rms_name": ["A-1", "A-2"],
+        "wellbore.name": ["NO A-1", "NO A-2"],
+        "wellbore.well_name": ["NO A-1", "NO A-2"],
+        "wellbore.short_name": ["A-1", "A-2"],
+        "wellbore.pick_md": [1000.0, 1500.0],
+        "wellbore.type": ["production", "injection"],
+    }
+)
+
+COMPLETIONS = pd.DataFrame(
+    {
+        "interval.wellbore": ["NO A-1"],
+        "interval.mdTop": [2000.0],
+        "interval.mdBottom": [2500.0],
+    }
+)
+
+COLORS = {
+    "default": "black",
+    "oil_production": "green",
+    "gas_injection": "red",
+    "water_injection": "blue",
+}
+
+
+def write_production_files(prod_info_dir):
+    volumes = {
+        production_layers.OIL_PRODUCTION_FILE: ("NO A-1", [1000.0, 2000.0], None),
+        production_layers.GAS_INJECTION_FILE: ("NO A-2", [0.0, 0.0], "2020-01-15"),
+        production_layers.WATER_INJECTION_FILE: ("NO A-2", [0.0, 3000.0], None),
+    }
+
+    for prod_file, (well_name, well_volumes, stop_date) in volumes.items():
+        prod_info = pd.DataFrame(
+            {
+                "PDM well name": [well_name],
+                "Well name": [well_name],
+                "Start date": ["2020-01-01"],
+                "Stop date": [stop_date],
+            }
+        )
+
+        for interval, volume in zip(INTERVALS, well_volumes):
+            prod_info[interval] = [volume]
+
+        prod_info.to_csv(str(prod_info_dir / prod_file), index=False)
+
+
+def test_production_layer_cache(tmp_path):
+    write_production_files(tmp_path)
+    cache = production_layers.ProductionLayerCache(
+        str(tmp_path), WELLS_DF, WELL_INFO, COMPLETIONS, COLORS, max_intervals=1
+    )
+
+    layers = cache.get_layers("2020-03-01-2020-01-01")
+    labels = [label for _selection, label in production_layers.PRODUCTION_LAYERS]
+    wells = {
+        layer["name"]: [item["wellbore"] for item in layer["data"]] for layer in layers
+    }
+
+    assert [layer["name"] for layer in layers] == labels + ["Active wells"]
+    assert wells["Producers"] == ["A-1"]
+    assert wells["Producers - completed"] == ["A-1"]
+    assert wells["Injectors"] == ["A-2"]
+    assert wells["Active wells"] == ["A-1"]
+
+    # Only the last interval is kept
+    cache.get_layers("2020-02-01-2020-01-01")
+    assert list(cache._layers) == ["2020-02-01-2020-01-01"]
+
+    # No volumes for an interval not made from the production files, as there
+    # are no cumulative volumes
+    layers = cache.get_layers("2020-03-01-2020-01-15")
+    assert layers[0]["data"] == []
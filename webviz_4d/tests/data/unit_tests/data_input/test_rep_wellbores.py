@@ -0,0 +1,32 @@
+import os
+import yaml
+from webviz_4d._datainput.rep_wellbores import extract_wellbores
+from webviz_4d.tests.data.unit_tests.data_input.fake_rep_client import FakeRepClient
+
+
+def test_extract_wellbores(tmp_path):
+    export_dir = str(tmp_path) + "/"
+    client = FakeRepClient("Grane", n_wellbores=5, n_points=20)
+
+    assert extract_wellbores(client, "Grane", export_dir, md_inc=0, workers=2) == 5
+
+    # One wellbore handle and seven requests per wellbore
+    assert client.requests == 1 + 5 * 8
+
+    well_files = sorted(name for name in os.listdir(export_dir) if name.endswith(".w"))
+
+    assert well_files == [
+        "25_11-G-1_H.w",
+        "25_11-G-2.w",
+        "25_11-G-3.w",
+        "25_11-G-4_H.w",
+        "25_11-G-5.w",
+    ]
+
+    with open(os.path.join(export_dir, ".25_11-G-1_H.w.yaml")) as stream:
+        metadata = yaml.safe_load(stream)
+
+    assert metadata[0]["wellbore"]["name"] == "NO 25/11-G-1 H"
+    assert metadata[0]["wellbore"]["short_name"] == "G-1H"
+    assert metadata[0]["wellbore"]["rkb"] == 30.0
+    assert [item["interval"]["mdTop"] for item in metadata[1:]] == [2030.0, 2530.0]
@@ -0,0 +1,29 @@
+import datetime
+import os
+from webviz_4d._datainput.well import extract_well_metadata, WELL_METADATA_CACHE
+
+
+METADATA = """
+- wellbore.name: NO A-1
+  wellbore.drilling_end_date: 2019-10-01
+  wellbore.updated: 2020-01-01 12:30:00
+- interval.wellbore: NO A-1
+  interval.mdTop: 2000.0
+"""
+
+
+def test_extract_well_metadata(tmp_path):
+    with open(str(tmp_path / ".A-1.yaml"), "w") as stream:
+        stream.write(METADATA)
+
+    well_info, depth_df = extract_well_metadata(str(tmp_path), update_cache=True)
+    assert os.path.isfile(str(tmp_path / WELL_METADATA_CACHE))
+
+    # The dates are kept as dates, also when read from the cache
+    cached_info, cached_depth_df = extract_well_metadata(str(tmp_path))
+
+    for info in [well_info, cached_info]:
+        assert info["wellbore.drilling_end_date"][0] == datetime.date(2019, 10, 1)
+        assert info["wellbore.updated"][0] == datetime.datetime(2020, 1, 1, 12, 30)
+
+    assert cached_depth_df.to_dict() == depth_df.to_dict()
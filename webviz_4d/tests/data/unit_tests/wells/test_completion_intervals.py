@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from webviz_4d.wells.completion_intervals import CompletionIntervals
+
+
+COMPLETION_DF = pd.DataFrame(
+    {
+        "interval.wellbore": ["B", "A", "B", None, "A"],
+        "interval.mdTop": [1000.0, 2000.0, 1500.0, 500.0, 2200.0],
+        "interval.mdBottom": [1100.0, 2100.0, 1600.0, 600.0, 2300.0],
+    }
+)
+
+
+def test_get_segments():
+    completions = CompletionIntervals(COMPLETION_DF)
+
+    assert np.array_equal(
+        completions.get_segments("B"), [[1000.0, 1100.0], [1500.0, 1600.0]]
+    )
+    assert len(completions.get_segments("C")) == 0
+    assert "A" in completions
+    assert "C" not in completions
+
+
+def test_get_interval():
+    completions = CompletionIntervals(COMPLETION_DF)
+
+    assert completions.get_interval("A") == (2000.0, 2300.0)
+    assert completions.get_interval("C") == (None, None)
+    assert CompletionIntervals().get_interval("A") == (None, None)
+
+
+def test_get_table():
+    table = CompletionIntervals(COMPLETION_DF).get_table(["B", "C", "A"])
+
+    assert np.array_equal(table["top_md"].values, [1000.0, np.nan, 2000.0], True)
+    assert np.array_equal(table["base_md"].values, [1600.0, np.nan, 2300.0], True)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from webviz_4d.wells.production_cube import ProductionCube
+
+
+PROD_DATA = pd.DataFrame(
+    {
+        "WELL_BORE_CODE": ["A", "A", "A", "B", "B"],
+        "DATEPRD": [
+            "2020-01-01 00:00:00",
+            "2020-01-03 00:00:00",
+            "2020-01-05 00:00:00",
+            "2020-01-02 00:00:00",
+            "2020-01-04 00:00:00",
+        ],
+        "BORE_OIL_VOL": [1.0, 0.0, 3.0, np.nan, 5.0],
+    }
+)
+
+
+def test_interval_volumes(tmp_path):
+    cube = ProductionCube.from_daily(PROD_DATA, ["BORE_OIL_VOL"], well_names=["a", "b"])
+    cube.save(tmp_path / "cube.npz")
+    cube = ProductionCube.load(tmp_path / "cube.npz")
+
+    volumes = cube.get_interval_volumes("2020-01-01-2020-01-05", "BORE_OIL_VOL")
+
+    assert np.array_equal(volumes, [1.0, 5.0])
+    assert cube.get_volume("a", "2020-01-05", None, "BORE_OIL_VOL") == 3.0
+    assert cube.get_volume("B", "1990-01-01", "2030-01-01", "BORE_OIL_VOL") == 5.0
+    assert np.isnan(cube.get_volume("C", None, None, "BORE_OIL_VOL"))
+
+
+def test_production_dates():
+    cube = ProductionCube.from_daily(PROD_DATA, ["BORE_OIL_VOL"], ["A", "B", "C"])
+    start_dates, stop_dates = cube.get_production_dates("BORE_OIL_VOL")
+
+    assert start_dates.astype(str).tolist() == ["2020-01-01", "2020-01-04", "NaT"]
+    assert stop_dates.astype(str).tolist() == ["2020-01-05", "2020-01-04", "NaT"]
+
+
+def test_update():
+    cube = ProductionCube.from_daily(PROD_DATA, ["BORE_OIL_VOL"], well_names=["a", "b"])
+    old_data = PROD_DATA[PROD_DATA["DATEPRD"] < "2020-01-04"]
+    new_data = pd.concat(
+        [
+            PROD_DATA[PROD_DATA["DATEPRD"] >= "2020-01-04"],
+            pd.DataFrame(
+                {
+                    "WELL_BORE_CODE": ["C"],
+                    "DATEPRD": ["2020-01-06 00:00:00"],
+                    "BORE_OIL_VOL": [2.0],
+                }
+            ),
+        ]
+    )
+
+    new_cube = ProductionCube.from_daily(
+        old_data, ["BORE_OIL_VOL"], well_names=["a", "b"]
+    )
+    new_cube.update(new_data, "2020-01-04", {"C": "c"})
+
+    assert new_cube.wells.tolist() == ["A", "B", "C"]
+    assert new_cube.get_well_name("C") == "c"
+    assert str(new_cube.last_date) == "2020-01-06"
+    assert np.allclose(new_cube.cumulative[:2, : cube.n_days + 1], cube.cumulative)
+    assert new_cube.get_volume("c", "2020-01-01", None, "BORE_OIL_VOL") == 2.0
+
+
+def test_update_last_day():
+    cube = ProductionCube.from_daily(PROD_DATA, ["BORE_OIL_VOL"])
+    cumulative = cube.cumulative
+
+    # The last day is read again, with a new volume
+    cube.update(PROD_DATA.iloc[2:3].assign(BORE_OIL_VOL=4.0), "2020-01-05")
+
+    assert cube.cumulative is cumulative
+    assert cube.get_volume("A", None, None, "BORE_OIL_VOL") == 5.0
+    assert cube.get_volume("B", None, None, "BORE_OIL_VOL") == 5.0
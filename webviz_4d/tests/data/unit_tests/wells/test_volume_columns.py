@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from webviz_4d.wells.volume_columns import VolumeColumns
+
+
+PROD_FILE = "BORE_OIL_VOL.csv"
+
+WELL_INFO = pd.DataFrame(
+    {
+        "wellbore.name": ["A", "B"],
+        PROD_FILE + "_Start date": ["2000-01-01", "2001-01-01"],
+        PROD_FILE + "_2002-01-01-2003-01-01": [3.0, 30.0],
+        PROD_FILE + "_2000-01-01-2001-01-01": [1.0, np.nan],
+        PROD_FILE + "_2001-01-01-2002-01-01": [2.0, 20.0],
+        PROD_FILE + "_2004-01-01-2005-01-01": [5.0, 50.0],
+        "BORE_GI_VOL.csv_2000-01-01-2001-01-01": [100.0, 100.0],
+    }
+)
+
+
+def test_get_slice():
+    volume_columns = VolumeColumns(WELL_INFO, PROD_FILE)
+
+    assert list(volume_columns.first_dates) == [
+        "2000-01-01",
+        "2001-01-01",
+        "2002-01-01",
+        "2004-01-01",
+    ]
+    assert volume_columns.get_slice("2001-01-01-2003-01-01") == (1, 3)
+    assert volume_columns.get_slice("2002-01-01-2005-01-01") is None
+    assert volume_columns.get_slice("2000-06-01-2003-01-01") is None
+
+
+def test_get_volumes():
+    volume_columns = VolumeColumns(WELL_INFO, PROD_FILE)
+
+    assert np.array_equal(
+        volume_columns.get_volumes("2000-01-01-2003-01-01"), [6.0, 50.0]
+    )
+    assert volume_columns.get_volumes("2000-01-01-2005-01-01") is None
@@ -0,0 +1,47 @@
+import pandas as pd
+from webviz_4d.wells.well_hierarchy import WellHierarchy
+
+
+WELL_INFO_DF = pd.DataFrame(
+    {
+        "wellbore.name": [
+            "NO 25/11-G-5",
+            "NO 25/11-G-5 AH",
+            "NO 25/11-G-5 AY1",
+            "NO 25/11-G-5 T2",
+            "NO 25/11-G-15",
+            "NO 25/11-G-15 H",
+        ],
+        "wellbore.slot_name": [
+            "NO 25/11-G-5",
+            "NO 25/11-G-5",
+            "NO 25/11-G-5",
+            "NO 25/11-G-5",
+            "NO 25/11-G-15",
+            "NO 25/11-G-15",
+        ],
+    }
+)
+
+
+def test_get_wellname():
+    well_hierarchy = WellHierarchy(WELL_INFO_DF)
+
+    assert well_hierarchy.get_wellname("NO 25/11-G-5 T2") == "NO 25/11-G-5"
+    assert well_hierarchy.get_wellname("NO 25/11-G-5 AY1") == "NO 25/11-G-5 AY"
+    assert well_hierarchy.get_wellname("NO 25/11-G-15 H") == "NO 25/11-G-15 H"
+    assert well_hierarchy.get_wellname("NO 25/11-G-7") is None
+
+
+def test_get_branches():
+    well_hierarchy = WellHierarchy(WELL_INFO_DF)
+
+    assert well_hierarchy.get_mother_wells("NO 25/11-G-5") == [
+        "NO 25/11-G-5",
+        "NO 25/11-G-5 AH",
+        "NO 25/11-G-5 AY",
+    ]
+    assert well_hierarchy.get_branches("NO 25/11-G-5") == [
+        "NO 25/11-G-5",
+        "NO 25/11-G-5 T2",
+    ]
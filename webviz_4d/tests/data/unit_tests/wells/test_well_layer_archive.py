@@ -0,0 +1,132 @@
+import os
+import pickle
+import numpy as np
+from webviz_4d.wells.well_layer_archive import (
+    WellLayerArchive,
+    WellLayerCache,
+    WELL_LAYER_ARCHIVE,
+    PICKLE_FILE,
+    get_layers_size,
+)
+
+
+INTERVAL = "2020-10-01-2019-10-01"
+
+WELL_LAYER = {
+    "name": "Producers",
+    "checked": False,
+    "base_layer": False,
+    "data": [
+        {
+            "type": "polyline",
+            "color": "green",
+            "positions": np.array([[456000.25, 6785000.5], [456010.0, 6785020.75]]),
+            "tooltip": "A-1 : production (oil 10 [kSm3])",
+            "wellbore": "25_11-A-1",
+        },
+        {
+            "type": "polyline",
+            "color": "red",
+            "positions": np.array([[457000.0, 6786000.0]]),
+            "tooltip": "A-2 : production (oil 2 [kSm3])",
+            "wellbore": "25_11-A-2",
+        },
+    ],
+}
+
+
+def test_well_layer_archive(tmp_path):
+    archive_file = str(tmp_path / "well_layers.bin")
+    empty_layer = dict(WELL_LAYER, name="Active wells", data=[])
+    WellLayerArchive.write(
+        archive_file,
+        {("production", INTERVAL): WELL_LAYER, ("active", INTERVAL): empty_layer},
+    )
+
+    archive = WellLayerArchive(archive_file)
+    well_layer = archive.get_layer("production", INTERVAL)
+
+    assert archive.keys() == [("production", INTERVAL), ("active", INTERVAL)]
+    assert archive.get_intervals("active") == [INTERVAL]
+    assert archive.get_layer("injection", INTERVAL) is None
+    assert well_layer["name"] == "Producers"
+    assert [item["tooltip"] for item in well_layer["data"]] == [
+        item["tooltip"] for item in WELL_LAYER["data"]
+    ]
+
+    for item, original in zip(well_layer["data"], WELL_LAYER["data"]):
+        assert np.allclose(item["positions"], original["positions"], atol=0.01)
+
+    assert archive.get_layers(["active", "injection"], INTERVAL) == [empty_layer]
+
+
+def test_well_layer_cache(tmp_path):
+    archive_file = str(tmp_path / WELL_LAYER_ARCHIVE)
+    active_layer = dict(WELL_LAYER, name="Active wells")
+    WellLayerArchive.write(
+        archive_file,
+        {("production", INTERVAL): WELL_LAYER, ("active", INTERVAL): active_layer},
+    )
+
+    cache = WellLayerCache(str(tmp_path), ["production", "injection"], max_intervals=1)
+    layers = cache.get_layers(INTERVAL)
+
+    assert [layer["name"] for layer in layers] == ["Producers", "Active wells"]
+    assert cache.get_layers(INTERVAL)[0] is layers[0]
+    assert cache.get_layers("2019-10-01-2018-10-01") == [cache.active_layer]
+    assert cache.get_layers(INTERVAL)[0] is not layers[0]
+
+    # The cached layers are read again when the archive is updated
+    WellLayerArchive.write(archive_file, {("injection", INTERVAL): WELL_LAYER})
+    os.utime(archive_file, (0, 0))
+
+    assert cache.get_layers(INTERVAL)[0]["name"] == "Producers"
+    assert cache.active_layer is None
+    assert len(cache.get_layers(INTERVAL)) == 1
+
+
+def test_well_layer_cache_size(tmp_path):
+    intervals = [INTERVAL, "2019-10-01-2018-10-01", "2018-10-01-2017-10-01"]
+    WellLayerArchive.write(
+        str(tmp_path / WELL_LAYER_ARCHIVE),
+        {("production", interval): WELL_LAYER for interval in intervals},
+    )
+
+    # Room for the layers of two intervals
+    max_bytes = 2 * get_layers_size([WELL_LAYER])
+    cache = WellLayerCache(str(tmp_path), ["production"], max_bytes=max_bytes)
+
+    for interval in intervals:
+        cache.get_layers(interval)
+
+    assert list(cache._layers) == intervals[1:]
+
+    # The last interval is kept even if it is too large
+    cache.max_bytes = 0
+    cache.get_layers(INTERVAL)
+    assert list(cache._layers) == [INTERVAL]
+
+
+def test_well_layer_cache_pickle_files(tmp_path):
+    def write_pickle_file(layer_type, well_layer):
+        pickle_file = str(tmp_path / PICKLE_FILE.format(layer_type, INTERVAL))
+
+        with open(pickle_file, "wb") as stream:
+            pickle.dump(well_layer, stream)
+
+        return pickle_file
+
+    write_pickle_file("production", WELL_LAYER)
+    cache = WellLayerCache(str(tmp_path), ["production", "injection"])
+
+    assert [layer["name"] for layer in cache.get_layers(INTERVAL)] == ["Producers"]
+
+    # The layers are read again when any of the pickle files are added or updated
+    injection_file = write_pickle_file("injection", dict(WELL_LAYER, name="Injectors"))
+    layers = cache.get_layers(INTERVAL)
+    assert [layer["name"] for layer in layers] == ["Producers", "Injectors"]
+    assert cache.get_layers(INTERVAL)[0] is layers[0]
+
+    write_pickle_file("injection", dict(WELL_LAYER, name="Injectors - updated"))
+    os.utime(injection_file, (0, 0))
+    assert cache.get_layers(INTERVAL)[1]["name"] == "Injectors - updated"
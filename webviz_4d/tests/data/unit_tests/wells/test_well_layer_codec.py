@@ -0,0 +1,57 @@
+import json
+import numpy as np
+from webviz_4d.wells.well_layer_codec import encode_well_layer, decode_well_layer
+
+
+WELL_LAYER = {
+    "name": "Producers",
+    "checked": False,
+    "base_layer": False,
+    "data": [
+        {
+            "type": "polyline",
+            "color": "green",
+            "positions": np.array([[456000.25, 6785000.5], [456010.0, 6785020.75]]),
+            "tooltip": "A-1 : production (oil 10 [kSm3])",
+            "volume": np.float64(10.0),
+        },
+        {
+            "type": "polyline",
+            "color": "red",
+            "positions": np.array([[457000.0, 6786000.0]]),
+            "tooltip": "A-2 : production (oil 2 [kSm3])",
+        },
+    ],
+}
+
+
+def test_encode_well_layer():
+    header, positions = encode_well_layer(WELL_LAYER)
+
+    # The header must be stored as JSON
+    header = json.loads(json.dumps(header))
+
+    assert positions.dtype == np.dtype("<f8")
+    assert header["offsets"] == [0, 2, 3]
+    assert header["constants"] == {"type": "polyline"}
+    assert header["columns"]["volume"] == [10.0, None]
+    assert header["missing"] == {"volume": [1]}
+
+    well_layer = decode_well_layer(header, positions)
+
+    assert well_layer["name"] == "Producers"
+    assert well_layer["checked"] is False
+
+    for item, original in zip(well_layer["data"], WELL_LAYER["data"]):
+        assert set(item) == set(original)
+        assert item["color"] == original["color"]
+        assert np.array_equal(item["positions"], original["positions"])
+
+    assert well_layer["data"][0]["volume"] == 10.0
+
+
+def test_encode_empty_well_layer():
+    header, positions = encode_well_layer(dict(WELL_LAYER, data=[]))
+
+    assert positions.shape == (0, 2)
+    assert decode_well_layer(header, positions)["data"] == []
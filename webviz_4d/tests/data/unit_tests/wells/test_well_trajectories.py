@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from webviz_4d.wells.well_trajectories import WellTrajectories
+
+
+WELLS_DF = pd.DataFrame(
+    {
+        "X_UTME": [1.0, 2.0, 3.0, 4.0, 10.0, 20.0, 30.0],
+        "Y_UTMN": [5.0, 6.0, 7.0, 8.0, 50.0, 60.0, 70.0],
+        "Z_TVDSS": [100.0, 200.0, 300.0, 400.0, 150.0, 250.0, 350.0],
+        "MD": [100.0, 200.0, 300.0, 400.0, 150.0, 250.0, 350.0],
+        "WELLBORE_NAME": ["A", "A", "A", "A", "B", "B", "B"],
+    }
+)
+
+
+def test_clip():
+    trajectories = WellTrajectories(WELLS_DF)
+    positions = trajectories.clip(["B", "A"], [200, 200], [None, 300])
+
+    assert np.array_equal(positions[0], [[20.0, 60.0], [30.0, 70.0]])
+    assert np.array_equal(positions[1], [[2.0, 6.0], [3.0, 7.0]])
+
+
+def test_clip_outside_wellbore():
+    trajectories = WellTrajectories(WELLS_DF)
+    positions = trajectories.clip(["A", "B"], [500, np.nan])
+
+    assert len(positions[0]) == 0
+    assert len(positions[1]) == 0
+
+
+def test_get_crossings():
+    trajectories = WellTrajectories(WELLS_DF)
+    crossings = trajectories.get_crossings(np.full(len(WELLS_DF), 225.0))
+
+    assert crossings == {"A": 225.0, "B": 225.0}
+
+
+def test_get_crossings_on_depth_level():
+    # Two consecutive points of A exactly on the depth level
+    depths = np.array([150.0, 200.0, 300.0, 350.0, 200.0, 200.0, 200.0])
+
+    with np.errstate(all="raise"):
+        crossings = WellTrajectories(WELLS_DF).get_crossings(depths)
+
+    assert crossings["A"] == 200.0
+    assert not np.isnan(crossings["B"])
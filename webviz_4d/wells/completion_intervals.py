@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+
+class CompletionIntervals(object):
+    """ Completion intervals (screens) for a set of wellbores, stored as one
+    array of (top MD, base MD) sorted by wellbore with the start offset of each
+    wellbore. The screens of a wellbore keep the order of the completion data,
+    and the completed interval goes from the top of the first to the base of
+    the last screen. """
+
+    def __init__(self, completion_df=None):
+        if completion_df is None or completion_df.empty:
+            completion_df = pd.DataFrame(
+                columns=["interval.wellbore", "interval.mdTop", "interval.mdBottom"]
+            )
+
+        completion_df = completion_df.dropna(subset=["interval.wellbore"])
+        codes, self.wellbores = pd.factorize(
+            completion_df["interval.wellbore"].values, sort=False
+        )
+        order = np.argsort(codes, kind="stable")
+
+        self.segments = np.column_stack(
+            [
+                completion_df["interval.mdTop"].values[order],
+                completion_df["interval.mdBottom"].values[order],
+            ]
+        ).astype(np.float64)
+
+        counts = np.bincount(codes, minlength=len(self.wellbores))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(int)
+        self._index = {name: i for i, name in enumerate(self.wellbores)}
+
+    def __contains__(self, wellbore):
+        return wellbore in self._index
+
+    def get_segments(self, wellbore):
+        """ Return the (top MD, base MD) of all screens in a wellbore, an empty
+        array if the wellbore is not completed """
+        i = self._index.get(wellbore)
+
+        if i is None:
+            return self.segments[0:0]
+
+        return self.segments[self.offsets[i] : self.offsets[i + 1]]
+
+    def get_interval(self, wellbore):
+        """ Return the top of the first and the base of the last screen in a
+        wellbore, None if not found """
+        segments = self.get_segments(wellbore)
+
+        if len(segments) == 0:
+            return None, None
+
+        return segments[0, 0], segments[-1, 1]
+
+    def get_table(self, wellbores):
+        """ Return the completed interval (top_md and base_md) for a list of
+        wellbores, NaN if not found """
+        rows = np.array([self._index.get(name, -1) for name in wellbores], dtype=int)
+        found = rows >= 0
+        top_md = np.full(len(rows), np.nan)
+        base_md = np.full(len(rows), np.nan)
+
+        top_md[found] = self.segments[self.offsets[rows[found]], 0]
+        base_md[found] = self.segments[self.offsets[rows[found] + 1] - 1, 1]
+
+        return pd.DataFrame({"top_md": top_md, "base_md": base_md})
+
+
+def get_completion_intervals(completion_df):
+    """ Return the completion intervals indexed by wellbore, given as a
+    dataframe or already indexed """
+    if isinstance(completion_df, CompletionIntervals):
+        return completion_df
+
+    return CompletionIntervals(completion_df)
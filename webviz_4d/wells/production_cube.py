@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+
+PRODUCTION_CUBE_FILE = "production_cube.npz"
+
+
+class ProductionCube(object):
+    """ Cumulative daily volumes for a set of wells, stored as an array with
+    dimensions wells x (days + 1) x volume codes. The volume produced between
+    two dates is the difference between two cumulative values. """
+
+    def __init__(self, wells, first_date, volume_codes, cumulative, well_names=None):
+        self.wells = np.asarray(wells).astype(str)
+        self.first_date = np.datetime64(first_date, "D")
+        self.volume_codes = list(volume_codes)
+        self.cumulative = cumulative
+        self.n_days = cumulative.shape[1] - 1
+
+        # Wells without a (REP) well name get an empty name
+        if well_names is None:
+            well_names = self.wells
+        self.well_names = np.array(
+            ["" if pd.isna(well_name) else str(well_name) for well_name in well_names]
+        )
+
+        self._well_index = {well: i for i, well in enumerate(self.wells)}
+        self._name_index = {}
+        for i, well_name in enumerate(self.well_names):
+            if well_name:
+                self._name_index.setdefault(well_name, i)
+        self._code_index = {code: i for i, code in enumerate(self.volume_codes)}
+
+    @classmethod
+    def from_daily(cls, prod_data, volume_codes, wells=None, well_names=None):
+        """ Create the cube from daily production data with the columns
+        WELL_BORE_CODE, DATEPRD and the volume codes """
+        days = pd.to_datetime(prod_data["DATEPRD"]).values.astype("datetime64[D]")
+
+        if wells is None:
+            wells = np.unique(prod_data["WELL_BORE_CODE"].values.astype(str))
+        wells = np.asarray(wells).astype(str)
+
+        if len(days) == 0:
+            cumulative = np.zeros((len(wells), 1, len(volume_codes)))
+            return cls(wells, "1970-01-01", volume_codes, cumulative, well_names)
+
+        first_date = days.min()
+        day_index = (days - first_date).astype(np.int64)
+        n_days = day_index.max() + 1
+
+        well_index = pd.Index(wells).get_indexer(
+            prod_data["WELL_BORE_CODE"].values.astype(str)
+        )
+        selected = well_index >= 0
+
+        daily = np.zeros((len(wells), n_days + 1, len(volume_codes)))
+        volumes = np.nan_to_num(prod_data[volume_codes].values.astype(np.float64))
+        np.add.at(
+            daily,
+            (well_index[selected], day_index[selected] + 1),
+            volumes[selected],
+        )
+
+        return cls(
+            wells, first_date, volume_codes, np.cumsum(daily, axis=1), well_names
+        )
+
+    def update(self, prod_data, from_date, new_well_names=None):
+        """ Replace the volumes from from_date (inclusive) by the given daily
+        production data, which should only contain dates from from_date. The
+        cube is updated in place: the cumulative volumes before from_date are
+        kept and only the following days are summed again. New wells are
+        added, with (REP) well names from the new_well_names dict. """
+        from_date = np.datetime64(str(from_date)[0:10], "D")
+
+        if from_date < self.first_date:
+            raise ValueError("Updates before the first production date")
+
+        new_wells = [
+            well
+            for well in pd.unique(prod_data["WELL_BORE_CODE"].values.astype(str))
+            if well not in self._well_index
+        ]
+
+        if new_well_names is None:
+            new_well_names = {}
+
+        wells = np.concatenate([self.wells, np.asarray(new_wells, dtype=str)])
+        well_names = list(self.well_names) + [
+            new_well_names.get(well) for well in new_wells
+        ]
+
+        days = pd.to_datetime(prod_data["DATEPRD"]).values.astype("datetime64[D]")
+        day_index = (days - self.first_date).astype(np.int64)
+        from_index = int((from_date - self.first_date).astype(np.int64))
+        n_days = max(from_index, int(day_index.max()) + 1 if len(days) else 0)
+        kept = min(from_index, self.n_days)
+
+        # The array is only reallocated for new wells or days, keeping the
+        # cumulative volumes before from_date
+        cumulative = self.cumulative
+        shape = (len(wells), n_days + 1, len(self.volume_codes))
+
+        if cumulative.shape != shape:
+            cumulative = np.zeros(shape)
+            cumulative[: len(self.wells), : kept + 1] = self.cumulative[:, : kept + 1]
+
+        well_index = pd.Index(wells).get_indexer(
+            prod_data["WELL_BORE_CODE"].values.astype(str)
+        )
+        daily = np.zeros((len(wells), n_days - kept, len(self.volume_codes)))
+        volumes = prod_data[self.volume_codes].values.astype(np.float64)
+        np.add.at(daily, (well_index, day_index - kept), np.nan_to_num(volumes))
+        cumulative[:, kept + 1 :] = cumulative[:, kept : kept + 1] + np.cumsum(
+            daily, axis=1
+        )
+
+        self.__init__(wells, self.first_date, self.volume_codes, cumulative, well_names)
+
+    @classmethod
+    def load(cls, filename):
+        """ Load a cube stored with save """
+        with np.load(filename) as data:
+            return cls(
+                data["wells"],
+                data["first_date"],
+                data["volume_codes"].tolist(),
+                data["cumulative"],
+                data["well_names"],
+            )
+
+    def save(self, filename):
+        """ Store the cube in a numpy (.npz) file """
+        np.savez(
+            filename,
+            wells=self.wells,
+            well_names=self.well_names,
+            first_date=self.first_date,
+            volume_codes=np.array(self.volume_codes),
+            cumulative=self.cumulative,
+        )
+
+    @property
+    def last_date(self):
+        return self.first_date + np.timedelta64(self.n_days - 1, "D")
+
+    def date_index(self, date):
+        """ Return the index of the cumulative volumes before a date """
+        if date is None:
+            return self.n_days
+
+        days = (np.datetime64(str(date)[0:10], "D") - self.first_date).astype(int)
+
+        return int(np.clip(days, 0, self.n_days))
+
+    def get_volumes(self, date1=None, date2=None, volume_code=None):
+        """ Return the volumes for all wells from date1 (inclusive) to date2
+        (exclusive). A missing date means no limit. """
+        volumes = (
+            self.cumulative[:, self.date_index(date2)]
+            - self.cumulative[:, self.date_index(date1) if date1 else 0]
+        )
+
+        if volume_code is None:
+            return volumes
+
+        return volumes[:, self._code_index[volume_code]]
+
+    def get_interval_volumes(self, interval, volume_code=None):
+        """ Return the volumes for all wells in a 4D interval (date1-date2) """
+        return self.get_volumes(interval[0:10], interval[11:21], volume_code)
+
+    def get_well_index(self, well):
+        """ Return the index of a well, given the PDM or the REP well name """
+        index = self._well_index.get(well)
+
+        if index is None:
+            index = self._name_index.get(well)
+
+        return index
+
+    def get_well_name(self, well):
+        """ Return the (REP) well name for a (PDM) well, None if unknown """
+        index = self._well_index.get(well)
+
+        if index is None or not self.well_names[index]:
+            return None
+
+        return self.well_names[index]
+
+    def get_volume(self, well, date1=None, date2=None, volume_code=None):
+        """ Return the volume for one well, NaN if the well is not found """
+        index = self.get_well_index(well)
+
+        if index is None:
+            return np.nan
+
+        code = self._code_index[volume_code]
+        lower = self.date_index(date1) if date1 else 0
+
+        return (
+            self.cumulative[index, self.date_index(date2), code]
+            - self.cumulative[index, lower, code]
+        )
+
+    def get_production_dates(self, volume_code):
+        """ Return the first and last date with volumes > 0 for all wells,
+        NaT for wells without volumes """
+        cumulative = self.cumulative[:, :, self._code_index[volume_code]]
+        producing = np.diff(cumulative, axis=1) > 0
+
+        found = producing.any(axis=1)
+        first = producing.argmax(axis=1)
+        last = self.n_days - 1 - producing[:, ::-1].argmax(axis=1)
+
+        start_dates = np.where(
+            found, self.first_date + first, np.datetime64("NaT")
+        ).astype("datetime64[D]")
+        stop_dates = np.where(
+            found, self.first_date + last, np.datetime64("NaT")
+        ).astype("datetime64[D]")
+
+        return start_dates, stop_dates
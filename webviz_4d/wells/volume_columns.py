@@ -0,0 +1,84 @@
+import re
+import numpy as np
+
+
+INTERVAL_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})-(\d{4}-\d{2}-\d{2})$")
+
+
+class VolumeColumns(object):
+    """ Index of the incremental interval volumes from one production file in
+    the wellbore information (see add_production_volumes), i.e. the columns
+    named <production file>_<first date>-<last date>. The intervals are sorted
+    by date, and the volumes for an interval made up of consecutive
+    incremental intervals are summed over a contiguous slice of the columns
+    for all wells at once. """
+
+    def __init__(self, well_info, prod_file):
+        prefix = prod_file + "_"
+        intervals = []
+
+        for position, column in enumerate(well_info.columns):
+            if isinstance(column, str) and column.startswith(prefix):
+                match = INTERVAL_PATTERN.match(column[len(prefix) :])
+
+                if match and match.group(1) < match.group(2):
+                    intervals.append((match.group(1), match.group(2), position))
+
+        # Intervals overlapping the previous ones (not incremental) are skipped
+        incremental = []
+
+        for first, last, position in sorted(intervals):
+            if not incremental or first >= incremental[-1][1]:
+                incremental.append((first, last, position))
+
+        intervals = incremental
+
+        self.prod_file = prod_file
+        self.first_dates = np.array([interval[0] for interval in intervals], dtype=str)
+        self.last_dates = np.array([interval[1] for interval in intervals], dtype=str)
+        self.positions = np.array([interval[2] for interval in intervals], dtype=int)
+        self.values = well_info.iloc[:, self.positions].to_numpy(dtype=np.float64)
+
+        # Consecutive intervals share the end and start dates
+        self._gaps = np.flatnonzero(self.last_dates[:-1] != self.first_dates[1:])
+        self._volumes = {}
+
+    def get_slice(self, interval):
+        """ Return the start and stop index of the incremental intervals that
+        make up an interval (YYYY-MM-DD-YYYY-MM-DD, increasing dates), None if
+        the interval can't be made from consecutive incremental intervals """
+        first_date = interval[0:10]
+        last_date = interval[11:21]
+        start = np.searchsorted(self.first_dates, first_date)
+        stop = np.searchsorted(self.last_dates, last_date, side="right")
+
+        if (
+            start >= len(self.first_dates)
+            or stop == 0
+            or stop <= start
+            or self.first_dates[start] != first_date
+            or self.last_dates[stop - 1] != last_date
+        ):
+            return None
+
+        # No gaps between the selected intervals
+        gaps = self._gaps[(self._gaps >= start) & (self._gaps < stop - 1)]
+
+        if len(gaps) > 0:
+            return None
+
+        return start, stop
+
+    def get_volumes(self, interval):
+        """ Return the volumes for all wells in an interval, None if it can't
+        be made from the incremental intervals. Missing values are skipped. """
+        if interval not in self._volumes:
+            limits = self.get_slice(interval)
+            volumes = None
+
+            if limits is not None:
+                volumes = np.nansum(self.values[:, limits[0] : limits[1]], axis=1)
+
+            self._volumes[interval] = volumes
+
+        return self._volumes[interval]
@@ -0,0 +1,115 @@
+class WellHierarchy(object):
+    """ Index of the wellbores in a wellbore info dataframe (wellbore_info.csv),
+    used to look up slot, mother wells, branches and well name for a
+    wellbore without filtering the whole dataframe """
+
+    def __init__(self, well_info_df):
+        self.well_info_df = well_info_df
+        self.names = [str(name) for name in well_info_df["wellbore.name"].values]
+        slots = well_info_df["wellbore.slot_name"].values
+
+        self._rows = {}
+        self._wellbores = {}
+        self._by_name = {}
+        self._by_name_start = {}
+        self._by_prefix = {}
+
+        for row, (name, slot) in enumerate(zip(self.names, slots)):
+            self._rows.setdefault(name, row)
+            self._wellbores.setdefault(slot, []).append(name)
+            self._by_name.setdefault(name, []).append(row)
+            self._by_name_start.setdefault(name[:-1], []).append(row)
+            self._by_prefix.setdefault(name[: name.rfind(" ")], []).append(row)
+
+        self._mother_wells = {}
+        self._well_names = {}
+
+    def get_well_metadata(self, wellbore_name, item):
+        """ Return selected metadata for a wellbore (first match) """
+        row = self._rows.get(wellbore_name)
+
+        if row is None:
+            return None
+
+        return self.well_info_df[item].values[row]
+
+    def get_wellbores(self, slot_name):
+        """ Return all wellbores with the same slot """
+        return sorted(self._wellbores.get(slot_name, []))
+
+    def get_mother_wells(self, slot_name):
+        """ Return a list of possible mother wells - excluding sidetracks """
+        if slot_name in self._mother_wells:
+            return list(self._mother_wells[slot_name])
+
+        mother_well = slot_name
+        mother_wells = [slot_name]
+
+        for wellbore in self.get_wellbores(slot_name):
+            if not wellbore == mother_well and not wellbore[-2] == "T":
+                if wellbore[-1] in "123456789":
+                    last = len(wellbore) - 1
+                else:
+                    last = len(wellbore)
+                name = wellbore[:last]
+
+                if not name == mother_well:
+                    mother_well = name
+                    mother_wells.append(mother_well)
+
+        self._mother_wells[slot_name] = sorted(set(mother_wells))
+
+        return list(self._mother_wells[slot_name])
+
+    def get_branches(self, mother_well):
+        """ Return all branches for a well """
+        i = mother_well.rfind(" ")
+
+        # Only wellbores with the same name, a sidetrack of the same name or
+        # the same prefix can be branches
+        rows = set(self._by_name.get(mother_well, []))
+        rows.update(self._by_name_start.get(mother_well + " T", []))
+
+        if not i == 2:
+            rows.update(self._by_prefix.get(mother_well[:i], []))
+
+        branches = [
+            self.names[row]
+            for row in rows
+            if is_branch(self.names[row], mother_well)
+        ]
+
+        return sorted(branches)
+
+    def get_wellname(self, wellbore):
+        """ Return the well name for a wellbore """
+        if wellbore in self._well_names:
+            return self._well_names[wellbore]
+
+        well_name = None
+        slot_name = self.get_well_metadata(wellbore, "wellbore.slot_name")
+
+        if slot_name and isinstance(slot_name, str):
+            for mother_well in self.get_mother_wells(slot_name):
+                if is_branch(wellbore, mother_well):
+                    well_name = mother_well
+                    break
+
+        self._well_names[wellbore] = well_name
+
+        return well_name
+
+
+def is_branch(branch, mother_well):
+    """ Return True if a wellbore is a branch of a (mother) well """
+    if mother_well not in branch:
+        return False
+
+    i = mother_well.rfind(" ")
+    i_branch = branch.rfind(" ")
+    last = len(branch)
+
+    if branch == mother_well or branch[: last - 1] == mother_well + " T":
+        return True  # Sidetracked mother wells
+
+    return mother_well[:i] == branch[:i_branch] and not i == 2
@@ -0,0 +1,287 @@
+import os
+import glob
+import json
+import pickle
+from collections import OrderedDict
+import numpy as np
+from webviz_4d.wells.well_layer_codec import encode_well_layer, decode_well_layer
+
+
+WELL_LAYER_ARCHIVE = "well_layers.bin"
+MAGIC = b"WV4DWLA3"
+
+# Well layers stored as pickle files by older versions of create_well_lists
+PICKLE_FILE = "{}_well_layer_{}.pkl"
+
+MAX_INTERVALS = 32
+MAX_BYTES = 256 * 1024 ** 2
+
+# Estimated size of a well (the dict and its properties) in addition to the
+# positions and strings
+WELL_OVERHEAD = 500
+
+
+class WellLayerArchive(object):
+    """ All the well layers for a well folder in one file: a JSON index with
+    the encoded layers (see encode_well_layer), followed by the well positions
+    as float64 (x, y) values. The positions are memory mapped, and the layers
+    read from the archive refer to them without copying (read-only). """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.mtime = os.path.getmtime(filename)
+
+        with open(filename, "rb") as stream:
+            if stream.read(len(MAGIC)) != MAGIC:
+                raise ValueError(
+                    filename + " is not a well layer archive (or an older version)"
+                )
+
+            index_size = int(np.frombuffer(stream.read(8), dtype="<u8")[0])
+            index = json.loads(stream.read(index_size).decode("utf-8"))
+
+        self._layers = {
+            (entry["layer_type"], entry["interval"]): entry
+            for entry in index["layers"]
+        }
+
+        if index["n_positions"] > 0:
+            self._positions = np.memmap(
+                filename,
+                dtype="<f8",
+                mode="r",
+                offset=len(MAGIC) + 8 + index_size,
+                shape=(index["n_positions"], 2),
+            )
+        else:
+            self._positions = np.empty((0, 2), dtype="<f8")
+
+    @staticmethod
+    def write(filename, well_layers):
+        """ Write well layers to an archive. The well layers are given as a dict
+        with (layer type, interval) as keys. """
+        entries = []
+        positions = []
+        n_positions = 0
+
+        for (layer_type, interval), well_layer in well_layers.items():
+            header, layer_positions = encode_well_layer(well_layer)
+            header["layer_type"] = layer_type
+            header["interval"] = interval
+            header["start"] = n_positions
+            entries.append(header)
+            positions.append(layer_positions)
+            n_positions = n_positions + len(layer_positions)
+
+        index = {
+            "n_positions": n_positions,
+            "layers": entries,
+        }
+
+        # The positions follow the index, which is padded to align them to
+        # 8 bytes
+        index_bytes = json.dumps(index).encode("utf-8")
+        padding = -(len(MAGIC) + 8 + len(index_bytes)) % 8
+        index_bytes = index_bytes + b" " * padding
+
+        # Write to a temporary file first, so that a viewer never reads a
+        # partly written archive
+        tmp_file = filename + ".tmp"
+
+        with open(tmp_file, "wb") as stream:
+            stream.write(MAGIC)
+            stream.write(np.array([len(index_bytes)], dtype="<u8").tobytes())
+            stream.write(index_bytes)
+
+            for layer_positions in positions:
+                stream.write(layer_positions.tobytes())
+
+        os.replace(tmp_file, filename)
+
+    def keys(self):
+        """ Return the (layer type, interval) of all layers """
+        return list(self._layers)
+
+    def get_intervals(self, layer_type):
+        """ Return the intervals with a layer of the given type """
+        return [interval for key, interval in self._layers if key == layer_type]
+
+    def get_layer(self, layer_type, interval):
+        """ Return a well layer, None if not found """
+        entry = self._layers.get((layer_type, interval))
+
+        if entry is None:
+            return None
+
+        start = entry["start"]
+        positions = self._positions[start : start + entry["offsets"][-1]]
+
+        return decode_well_layer(entry, positions)
+
+    def get_layers(self, layer_types, interval):
+        """ Return the layers of the given types for an interval, the layers
+        not found are skipped """
+        layers = [self.get_layer(layer_type, interval) for layer_type in layer_types]
+
+        return [layer for layer in layers if layer is not None]
+
+
+class WellLayerCache(object):
+    """ Least recently used cache of the production and injection layers for
+    the 4D intervals in a well folder, read from the well layer archive (or
+    the pickle files from older versions). The layers for an interval are
+    read the first time the interval is selected, and all layers are read
+    again when the archive has been updated. The cache keeps at most
+    max_intervals intervals, and the least recently used intervals are dropped
+    when the estimated size of the layers (see get_layers_size) is larger than
+    max_bytes. The last interval is always kept. """
+
+    def __init__(
+        self,
+        wellfolder,
+        layer_types,
+        max_intervals=MAX_INTERVALS,
+        max_bytes=MAX_BYTES,
+    ):
+        self.wellfolder = wellfolder
+        self.layer_types = list(layer_types)
+        self.max_intervals = max_intervals
+        self.max_bytes = max_bytes
+        self.archive_file = os.path.join(wellfolder, WELL_LAYER_ARCHIVE)
+        self.archive = None
+        self.active_layer = None
+
+        self._layers = OrderedDict()
+        self._size = 0
+        self._mtime = None
+        self._open()
+
+    def _open(self):
+        """ Open the archive and resolve the active wells layer """
+        self._layers.clear()
+        self._size = 0
+        self.archive = None
+        self.active_layer = None
+        self._mtime = get_mtime(self.archive_file)
+
+        if self._mtime is not None:
+            print("Reading well layers from file", self.archive_file)
+
+            try:
+                self.archive = WellLayerArchive(self.archive_file)
+            except ValueError as error:
+                print("WARNING:", error)
+
+        if self.archive is not None:
+            for interval in self.archive.get_intervals("active"):
+                self.active_layer = self.archive.get_layer("active", interval)
+                break
+        else:
+            active_files = glob.glob(
+                os.path.join(self.wellfolder, PICKLE_FILE.format("active", "*"))
+            )
+
+            if active_files:
+                self.active_layer = read_pickle_file(active_files[0])
+
+    def _get_pickle_files(self, interval):
+        """ Return the pickle files with the layers for an interval """
+        return [
+            os.path.join(self.wellfolder, PICKLE_FILE.format(layer_type, interval))
+            for layer_type in self.layer_types
+        ]
+
+    def _read_layers(self, interval):
+        """ Return the layers for an interval and the time they were stored
+        (the modification time of each pickle file) """
+        if self.archive is not None:
+            return self.archive.get_layers(self.layer_types, interval), self._mtime
+
+        layers = []
+        mtimes = []
+
+        for pickle_file in self._get_pickle_files(interval):
+            mtime = get_mtime(pickle_file)
+            mtimes.append(mtime)
+
+            if mtime is not None:
+                layers.append(read_pickle_file(pickle_file))
+
+        return layers, mtimes
+
+    def _is_valid(self, interval, mtime):
+        """ Return True if the cached layers for an interval are up to date,
+        i.e. none of the pickle files have been added, removed or updated """
+        if self.archive is not None:
+            return True
+
+        return [
+            get_mtime(pickle_file) for pickle_file in self._get_pickle_files(interval)
+        ] == mtime
+
+    def get_layers(self, interval):
+        """ Return the layers for an interval, followed by the active wells """
+        if get_mtime(self.archive_file) != self._mtime:
+            self._open()
+
+        cached = self._layers.get(interval)
+
+        if cached is not None and self._is_valid(interval, cached[1]):
+            self._layers.move_to_end(interval)
+        else:
+            if cached is not None:
+                self._size = self._size - cached[2]
+
+            layers, mtime = self._read_layers(interval)
+            cached = (layers, mtime, get_layers_size(layers))
+            self._layers[interval] = cached
+            self._layers.move_to_end(interval)
+            self._size = self._size + cached[2]
+
+            while len(self._layers) > 1 and (
+                len(self._layers) > self.max_intervals or self._size > self.max_bytes
+            ):
+                _interval, dropped = self._layers.popitem(last=False)
+                self._size = self._size - dropped[2]
+
+        layers = list(cached[0])
+
+        if self.active_layer is not None:
+            layers.append(self.active_layer)
+
+        return layers
+
+
+def get_mtime(filename):
+    """ Return the modification time of a file, None if it doesn't exist """
+    try:
+        return os.path.getmtime(filename)
+    except OSError:
+        return None
+
+
+def get_layers_size(well_layers):
+    """ Return the estimated size (bytes) of well layers: the positions (as
+    float64 pairs), the string properties and an overhead for each well """
+    size = 0
+
+    for well_layer in well_layers:
+        for item in well_layer["data"]:
+            size = size + WELL_OVERHEAD
+
+            for value in item.values():
+                if isinstance(value, np.ndarray):
+                    size = size + value.nbytes
+                elif isinstance(value, (list, tuple)):
+                    size = size + 16 * len(value)
+                elif isinstance(value, str):
+                    size = size + len(value)
+
+    return size
+
+
+def read_pickle_file(pickle_file):
+    """ Return a well layer stored as a pickle file """
+    with open(pickle_file, "rb") as stream:
+        return pickle.load(stream)
+
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+def encode_well_layer(well_layer):
+    """ Encode a well layer as a JSON compatible header and the positions of
+    all wells as one float64 array. The well properties
+    (color, tooltip, ...) are stored as one list per property, or as one value
+    if it is the same for all wells. The positions of each well are found from
+    the offsets. """
+    data = well_layer["data"]
+    keys = []
+
+    for item in data:
+        for key in item:
+            if key not in keys and key != "positions":
+                keys.append(key)
+
+    columns = {key: [] for key in keys}
+    missing = {}
+    offsets = [0]
+    positions = []
+
+    for i, item in enumerate(data):
+        for key in keys:
+            if key in item:
+                columns[key].append(to_json_value(item[key]))
+            else:
+                columns[key].append(None)
+                missing.setdefault(key, []).append(i)
+
+        item_positions = np.asarray(item.get("positions", []), dtype=np.float64)
+        positions.append(item_positions.reshape(-1, 2))
+        offsets.append(offsets[-1] + len(positions[-1]))
+
+    if positions:
+        positions = np.concatenate(positions)
+    else:
+        positions = np.empty((0, 2))
+
+    # Properties with the same value for all wells are only stored once
+    constants = {}
+
+    for key in keys:
+        values = columns[key]
+
+        if key not in missing and all(value == values[0] for value in values):
+            constants[key] = values[0]
+            del columns[key]
+
+    header = {
+        "layer": {
+            key: to_json_value(value)
+            for key, value in well_layer.items()
+            if key != "data"
+        },
+        "offsets": offsets,
+        "constants": constants,
+        "columns": columns,
+        "missing": missing,
+    }
+
+    return header, positions.astype("<f8")
+
+
+def decode_well_layer(header, positions):
+    """ Return the well layer (the dict expected by LayeredMap) from an encoded
+    header and positions. The positions of the wells are views into the given
+    positions, which are not copied. """
+    offsets = header["offsets"]
+    columns = header["columns"]
+    positions = np.asarray(positions, dtype=np.float64)
+
+    # The wells are filled one property at a time
+    constants = header.get("constants", {})
+    data = [constants.copy() for _i in range(len(offsets) - 1)]
+
+    for key, values in columns.items():
+        for item, value in zip(data, values):
+            item[key] = value
+
+    for item, lower, upper in zip(data, offsets[:-1], offsets[1:]):
+        item["positions"] = positions[lower:upper]
+
+    # Properties that are not defined for all wells
+    for key, rows in header.get("missing", {}).items():
+        for i in rows:
+            del data[i][key]
+
+    return dict(header["layer"], data=data)
+
+
+def to_json_value(value):
+    """ Convert numpy values to values supported by json """
+    if isinstance(value, np.generic):
+        return value.item()
+
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+
+    return value
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+class WellSpatialIndex(object):
+    """ Uniform grid index over the trajectory segments of a set of wells.
+    Used to find the wells that are located within a given map extent. """
+
+    def __init__(self, wells_df, n_cells=128):
+        wells_df = wells_df[["WELLBORE_NAME", "X_UTME", "Y_UTMN"]].dropna()
+        x = wells_df["X_UTME"].values.astype(np.float64)
+        y = wells_df["Y_UTMN"].values.astype(np.float64)
+
+        self.wellbores, codes = np.unique(
+            wells_df["WELLBORE_NAME"].values.astype(str), return_inverse=True
+        )
+        self.n_cells = n_cells
+        self._seg_well = np.empty(0, dtype=int)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._segs = np.empty(0, dtype=np.int64)
+
+        if len(codes) == 0:
+            return
+
+        # One segment between two consecutive points of the same well,
+        # wells with only one point get a segment of zero length
+        index = np.arange(len(codes))
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = codes[1:] != codes[:-1]
+        last = np.ones(len(codes), dtype=bool)
+        last[:-1] = codes[:-1] != codes[1:]
+
+        starts = index[~last | first]
+        ends = np.where(last[starts], starts, starts + 1)
+
+        self._seg_well = codes[starts]
+        self._xmin = np.minimum(x[starts], x[ends])
+        self._xmax = np.maximum(x[starts], x[ends])
+        self._ymin = np.minimum(y[starts], y[ends])
+        self._ymax = np.maximum(y[starts], y[ends])
+
+        self.xori = self._xmin.min()
+        self.yori = self._ymin.min()
+        width = max(self._xmax.max() - self.xori, self._ymax.max() - self.yori)
+        self.cell_size = width / n_cells if width > 0 else 1.0
+
+        # Register each segment in all the cells covered by its bounding box
+        i_0 = self._cell(self._xmin - self.xori)
+        i_1 = self._cell(self._xmax - self.xori)
+        j_0 = self._cell(self._ymin - self.yori)
+        j_1 = self._cell(self._ymax - self.yori)
+
+        n_j = j_1 - j_0 + 1
+        counts = (i_1 - i_0 + 1) * n_j
+        segments = np.repeat(np.arange(len(starts)), counts)
+        position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        cell_i = i_0[segments] + position // n_j[segments]
+        cell_j = j_0[segments] + position % n_j[segments]
+        keys = cell_i.astype(np.int64) * (n_cells + 1) + cell_j
+
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._segs = segments[order]
+
+    def _cell(self, distance):
+        """ Return the cell number(s) for distance(s) from the grid origin """
+        cells = np.floor(np.asarray(distance) / self.cell_size).astype(np.int64)
+
+        return np.clip(cells, 0, self.n_cells)
+
+    def query(self, bounds):
+        """ Return the names of all wells with trajectory segments intersecting
+        the given bounds [[xmin, ymin], [xmax, ymax]]. Segments are tested
+        with their bounding boxes. """
+        (xmin, ymin), (xmax, ymax) = bounds
+
+        if len(self._keys) == 0 or xmax < self.xori or ymax < self.yori:
+            return []
+
+        i_0, i_1 = self._cell([xmin - self.xori, xmax - self.xori])
+        j_0, j_1 = self._cell([ymin - self.yori, ymax - self.yori])
+
+        rows = np.arange(i_0, i_1 + 1, dtype=np.int64) * (self.n_cells + 1)
+        lower = np.searchsorted(self._keys, rows + j_0, side="left")
+        upper = np.searchsorted(self._keys, rows + j_1, side="right")
+
+        candidates = [self._segs[lo:hi] for lo, hi in zip(lower, upper) if hi > lo]
+
+        if not candidates:
+            return []
+
+        segments = np.unique(np.concatenate(candidates))
+        inside = (
+            (self._xmax[segments] >= xmin)
+            & (self._xmin[segments] <= xmax)
+            & (self._ymax[segments] >= ymin)
+            & (self._ymin[segments] <= ymax)
+        )
+        wells = np.unique(self._seg_well[segments[inside]])
+
+        return list(self.wellbores[wells])
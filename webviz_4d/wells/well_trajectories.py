@@ -0,0 +1,126 @@
+import numpy as np
+
+
+class WellTrajectories(object):
+    """ Trajectories for a set of wells, stored as one array sorted by wellbore
+    and measured depth (MD) with the start offset of each wellbore """
+
+    def __init__(self, wells_df):
+        wells_df = wells_df.dropna(subset=["MD"])
+        codes, self.wellbores = _factorize(wells_df["WELLBORE_NAME"].values)
+        md = wells_df["MD"].values.astype(np.float64)
+        order = np.lexsort((md, codes))
+
+        self.md = md[order]
+        self.xy = np.ascontiguousarray(
+            wells_df[["X_UTME", "Y_UTMN"]].values[order], dtype=np.float64
+        )
+        self.z = wells_df["Z_TVDSS"].values[order].astype(np.float64)
+
+        counts = np.bincount(codes, minlength=len(self.wellbores))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.codes = codes[order]
+        self._index = {name: i for i, name in enumerate(self.wellbores)}
+
+        # Shift the MD values of each wellbore into its own range,
+        # which makes the MD values sorted over all wellbores
+        if len(self.md) > 0:
+            self._md_min = self.md.min()
+            self._md_span = self.md.max() - self._md_min + 1
+        else:
+            self._md_min = 0.0
+            self._md_span = 1.0
+
+        self._keys = (self.md - self._md_min) + self.codes * self._md_span
+
+    def __contains__(self, wellbore):
+        return wellbore in self._index
+
+    def get_wellbore(self, wellbore):
+        """ Return the (x, y) positions for one wellbore """
+        i = self._index[wellbore]
+
+        return self.xy[self.offsets[i] : self.offsets[i + 1]]
+
+    def get_slices(self, wellbores, md_start=None, md_end=None):
+        """ Return start and stop indices for the wellbores between the given
+        depths (inclusive). The depths can be given per wellbore, None means
+        no limit and NaN gives an empty selection. """
+        wells = np.array([self._index[wellbore] for wellbore in wellbores], dtype=int)
+        starts = _get_limits(md_start, len(wells), -np.inf)
+        ends = _get_limits(md_end, len(wells), np.inf)
+
+        # Keep the shifted depths inside the range of each wellbore
+        upper = self._md_span - 0.5
+        starts = np.clip(starts - self._md_min, -0.5, upper) + wells * self._md_span
+        ends = np.clip(ends - self._md_min, -0.5, upper) + wells * self._md_span
+
+        lower_index = np.searchsorted(self._keys, starts, side="left")
+        upper_index = np.searchsorted(self._keys, ends, side="right")
+        upper_index = np.maximum(upper_index, lower_index)
+
+        missing = np.isnan(starts) | np.isnan(ends)
+        upper_index[missing] = lower_index[missing]
+
+        return lower_index, upper_index
+
+    def clip(self, wellbores, md_start=None, md_end=None):
+        """ Return the (x, y) positions for the wellbores between the given
+        depths. The returned arrays are views into the trajectory store. """
+        lower_index, upper_index = self.get_slices(wellbores, md_start, md_end)
+
+        return [self.xy[lower:upper] for lower, upper in zip(lower_index, upper_index)]
+
+    def get_crossings(self, depths):
+        """ Return the MD where each wellbore first crosses a depth level, given
+        the depth level (e.g. a surface) at all trajectory points """
+        difference = self.z - np.asarray(depths, dtype=np.float64)
+        sign = np.sign(difference)
+
+        # Crossings between two consecutive points of the same wellbore
+        crossing = (
+            (self.codes[1:] == self.codes[:-1])
+            & (sign[1:] != sign[:-1])
+            & ~np.isnan(difference[1:])
+            & ~np.isnan(difference[:-1])
+        )
+        index = np.flatnonzero(crossing)
+
+        # Keep the first crossing (smallest MD) for each wellbore
+        wells, first = np.unique(self.codes[index], return_index=True)
+        index = index[first]
+
+        d_0 = difference[index]
+        d_1 = difference[index + 1]
+        md_0 = self.md[index]
+        md_1 = self.md[index + 1]
+        step = d_0 - d_1
+
+        # Points on the depth level (no difference between the two points)
+        # are picked at the first point, instead of dividing by zero
+        flat = step == 0
+        fraction = np.divide(d_0, step, out=np.zeros_like(d_0), where=~flat)
+        picks = md_0 + (md_1 - md_0) * fraction
+
+        return dict(zip(self.wellbores[wells].tolist(), picks.tolist()))
+
+
+def _factorize(names):
+    """ Return integer codes and the sorted unique names """
+    wellbores, codes = np.unique(np.asarray(names).astype(str), return_inverse=True)
+
+    return codes.ravel(), wellbores
+
+
+def _get_limits(values, length, default):
+    """ Return an array of depth limits, replacing None values by default """
+    if values is None:
+        return np.full(length, default)
+
+    limits = np.array(
+        np.broadcast_to(np.asarray(values, dtype=object), (length,)), dtype=object
+    )
+    missing = np.array([value is None for value in limits], dtype=bool)
+    limits[missing] = default
+
+    return limits.astype(np.float64)